@@ -1,4 +1,8 @@
-import os
+import json
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
 import pandas as pd
 import numpy as np
 import streamlit as st
@@ -6,6 +10,27 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 
+# Raíz del proyecto en el path para importar src/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.load_dataset import dataset_exists, dataset_columns
+from src.data.prepared_cache import load_prepared
+from src.data.shared_store import DatasetRegistry
+from src.data.filter_engine import FilterEngine, sort_by_date
+from src.data.aggregates import OlapCube, FrameAggregates
+from src.models.rfm import RfmState, compute_rfm, assign_segments, segment_summary
+from src.models.forecasting import ForecastStore
+from src.data.versioning import data_version
+from src.data.yoy_matrix import YoyMatrix
+from src.data.export import EXPORT_FORMATS, BACKGROUND_ROWS, ExportJob, export_bytes, export_file_name
+from src.visualization.binning import histogram_bins, histogram_figure
+from src.visualization.timeseries import GRAINS, trend_series
+from src.visualization.figure_cache import FigureCache, fingerprint
+from src.visualization.report import ReportEngine
+
+# Inicio de la ejecución completa del script (panel de profiling)
+SCRIPT_START = time.perf_counter()
+PROFILE_HISTORY = 50
+
 # Page Configuration
 st.set_page_config(
     page_title="Executive E-commerce Dashboard",
@@ -365,37 +390,114 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Data Loading
-@st.cache_data(ttl=3600)
-def load_data():
-    dataset_parquet = "data/processed/ecommerce_dataset_10000_cleaned.parquet"
-    dataset_csv = "data/processed/ecommerce_dataset_10000_cleaned.csv"
-    
+# Profiling: tiempo de pared de la ejecución completa y de cada fragmento re-ejecutado
+def record_timing(section, seconds):
+    log = st.session_state.setdefault('profile_log', [])
+    log.append({'section': section, 'ms': round(seconds * 1000, 1), 'at': datetime.now().strftime('%H:%M:%S')})
+    del log[:-PROFILE_HISTORY]
+
+@contextmanager
+def profiled(section):
+    """Record the wall time of ``section`` in the profiling panel log."""
+    start = time.perf_counter()
     try:
-        if os.path.exists(dataset_parquet):
-            df = pd.read_parquet(dataset_parquet)
-        elif os.path.exists(dataset_csv):
-            df = pd.read_csv(dataset_csv)
-        else:
-            return None
-        
-        df['order_date'] = pd.to_datetime(df['order_date'])
-        df['year_month'] = df['order_date'].dt.to_period('M')
+        yield
+    finally:
+        record_timing(section, time.perf_counter() - start)
+
+# Columnas que usa el dashboard (review_text y el resto nunca se decodifican)
+DASHBOARD_COLUMNS = [
+    'order_date', 'country', 'customer_id', 'order_id', 'product_name', 'category',
+    'unit_price', 'quantity', 'total_price', 'order_status', 'payment_method', 'rating',
+    'year', 'month', 'day_of_week'
+]
+
+def prepare_frame(df):
+    """Derived columns of the dashboard frame (year/month/day_of_week only if the dataset lacks them), sorted by order_date."""
+    df['order_date'] = pd.to_datetime(df['order_date'])
+    # Ordenado por fecha: los rangos se resuelven con búsqueda binaria (FilterEngine)
+    df = sort_by_date(df)
+    df['year_month'] = df['order_date'].dt.to_period('M')
+    if 'year' not in df.columns:
         df['year'] = df['order_date'].dt.year
+    if 'month' not in df.columns:
         df['month'] = df['order_date'].dt.month
+    if 'day_of_week' not in df.columns:
         df['day_of_week'] = df['order_date'].dt.day_name()
-        
-        return df
+    return df
+
+# Data Loading
+def load_data():
+    try:
+        # Fichero único, directorio incremental, dataset particionado year=/month= o CSV
+        if not dataset_exists():
+            return None
+        available = dataset_columns()
+        # Frame ya derivado, mapeado en memoria desde la caché Arrow IPC (data/interim)
+        return load_prepared(prepare_frame, columns=[c for c in DASHBOARD_COLUMNS if c in available])
     except Exception as e:
         st.error(f"⚠️ Error loading data: {e}")
         return None
 
-df = load_data()
+@st.cache_resource
+def get_dataset_registry():
+    """One registry per server process: every session leases the same read-only frame."""
+    return DatasetRegistry()
+
+def acquire_dataset():
+    """
+    Frame and version for this session. The lease lives in session_state, so it is
+    released when the version changes or when the session is garbage collected.
+    """
+    if not dataset_exists():
+        return None, None
+    # Token del manifiesto (hash de contenido): cambia sólo cuando cambian los datos
+    version = data_version()
+    lease = st.session_state.get('dataset_lease')
+    if lease is None or not lease.active or lease.version != version:
+        new_lease = get_dataset_registry().lease(version, load_data)
+        if new_lease is None:
+            return None, version
+        if lease is not None:
+            lease.release()
+        st.session_state.dataset_lease = lease = new_lease
+    return lease.frame, lease.version
+
+df, dataset_version = acquire_dataset()
+
+def derived(name, build):
+    """
+    ``build()`` for this session's data version, held on the registry entry and
+    shared by all sessions; it is released together with the version's frame.
+    """
+    return st.session_state.dataset_lease.derived(name, build)
+
+def get_filter_engine():
+    """Sorted-date / per-country position index, built once per data version and shared by all sessions."""
+    return derived('filter_engine', lambda: FilterEngine(df))
 
 if df is None or df.empty:
     st.error("❌ No dataset found or dataset is empty.")
     st.stop()
 
+engine = get_filter_engine()
+
+def get_olap_cube():
+    """Aggregate cube written by the pipeline for this version; built in-process if missing or stale."""
+    return derived('olap_cube', lambda: OlapCube.load(dataset_version) or OlapCube.from_frame(df, dataset_version))
+
+cube = get_olap_cube()
+
+def get_rfm_state():
+    """Customer activity table kept up to date by the pipeline; rebuilt in-process if stale."""
+    def build():
+        state = RfmState.load()
+        return state if state is not None and state.source_version == dataset_version \
+            else RfmState.from_frame(df, dataset_version)
+    return derived('rfm_state', build)
+
+rfm_state = get_rfm_state()
+
 # Header
 st.markdown("""
     <div style='text-align:center; padding: 40px 0 30px 0; background: linear-gradient(135deg, rgba(31, 41, 55, 0.8) 0%, rgba(17, 24, 39, 0.9) 100%); border-radius: 16px; margin-bottom: 30px; border: 1px solid rgb(55, 65, 81);'>
@@ -451,14 +553,22 @@ with st.sidebar:
         else:
             selected_countries = st.multiselect("Choose Countries", countries, default=countries[:3])
     
+    with st.expander("🧩 SEGMENT FILTERS", expanded=False):
+        segment_selection = {
+            'category': st.multiselect("Category", engine.bitmaps.values('category')),
+            'payment_method': st.multiselect("Payment Method", engine.bitmaps.values('payment_method')),
+            'order_status': st.multiselect("Order Status", engine.bitmaps.values('order_status')),
+            'rating': st.multiselect("Rating", engine.bitmaps.values('rating')),
+        }
+        st.caption("Empty selection = all values")
+    
     with st.expander("⚙️ DISPLAY SETTINGS", expanded=False):
-        top_n = st.slider("Top N Items", 5, 50, 10, 5)
-        chart_theme = st.selectbox("Chart Theme", ["plotly_dark", "plotly_white", "seaborn", "ggplot2"])
-        
-        if 'selected_theme' not in st.session_state:
-            st.session_state.selected_theme = chart_theme
-        else:
-            st.session_state.selected_theme = chart_theme
+        st.caption("Top N and chart theme are set above the tabs")
+        approx_distinct = st.toggle(
+            "≈ Approximate distinct counts", value=True,
+            help="Orders/customers from pre-aggregated sketches (HyperLogLog / KMV) and unit-price quartiles "
+                 "from quantile summaries. Off = exact counts over raw rows and exact price histograms."
+        )
     
     st.markdown("---")
     st.markdown("**💾 PREFERENCES**")
@@ -468,7 +578,7 @@ with st.sidebar:
             'start_date': start_date,
             'end_date': end_date,
             'countries': selected_countries,
-            'top_n': top_n
+            'top_n': st.session_state.get('top_n', 10)
         }
         st.success("✅ Filters saved!")
     
@@ -480,37 +590,55 @@ with st.sidebar:
 # Filter data
 start_date_dt = pd.to_datetime(start_date)
 end_date_dt = pd.to_datetime(end_date)
-df_filtered = df[
-    (df['country'].isin(selected_countries)) &
-    (df['order_date'] >= start_date_dt) &
-    (df['order_date'] <= end_date_dt)
-].copy()
+# Filtros de segmento vacíos = sin filtro; se resuelven con los bitmaps del FilterEngine
+segment_filters = {column: values for column, values in segment_selection.items() if values}
+df_filtered = engine.filter(start_date_dt, end_date_dt, selected_countries, filters=segment_filters)
 
 if df_filtered.empty:
     st.warning("⚠️ No data available for selected filters.")
     st.stop()
 
+# Rollups desde el cubo (día × país × categoría × producto); pago/estado/rating no son
+# dimensiones del cubo, así que con esos filtros se agrega sobre las filas filtradas
+# Conteos exactos de distintos (toggle desactivado) = agregación sobre filas
+country_key = None if engine.covers_all(selected_countries) else list(selected_countries)
+cube_filters = approx_distinct and set(segment_filters) <= {'category'}
+if cube_filters:
+    agg = cube.slice(start_date_dt, end_date_dt, country_key, segment_filters.get('category'))
+else:
+    agg = FrameAggregates(df_filtered)
+
+def period_aggregates(start, end):
+    """KPI source for [start, end] with the current filters: prefix sums + HLL, cube slice or filtered rows."""
+    if cube_filters and not segment_filters:
+        return cube.period(start, end, country_key)
+    if cube_filters:
+        return cube.slice(start, end, country_key, segment_filters.get('category'))
+    return FrameAggregates(engine.filter(start, end, selected_countries, filters=segment_filters))
+
 # Calculate Metrics
+# Clave pequeña (versión + filtros); los frames compartidos no se hashean ni se copian
 @st.cache_data
-def calculate_metrics(df_current, df_all):
-    total_revenue = df_current['total_price'].sum()
-    total_orders = df_current['order_id'].nunique()
-    unique_customers = df_current['customer_id'].nunique()
-    total_quantity = df_current['quantity'].sum()
+def calculate_metrics(version, start, end, countries, segments, approx, _period):
+    current_period = _period(start, end)
+    current = current_period.totals()
+    total_revenue = current['revenue']
+    total_orders = current['orders']
+    unique_customers = current['customers']
+    total_quantity = current['quantity']
     avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
     
-    date_diff = (df_current['order_date'].max() - df_current['order_date'].min()).days
-    prev_start = df_current['order_date'].min() - timedelta(days=date_diff)
-    prev_end = df_current['order_date'].min()
+    span_start, span_end = current_period.date_span()
+    date_diff = (span_end - span_start).days
+    prev_start = span_start - timedelta(days=date_diff)
+    prev_end = span_start
     
-    df_prev = df_all[
-        (df_all['order_date'] >= prev_start) &
-        (df_all['order_date'] < prev_end)
-    ]
+    # Periodo anterior [prev_start, prev_end) con los mismos filtros: días completos
+    prev = _period(prev_start, prev_end - timedelta(days=1)).totals()
     
-    prev_revenue = df_prev['total_price'].sum()
-    prev_orders = df_prev['order_id'].nunique()
-    prev_customers = df_prev['customer_id'].nunique()
+    prev_revenue = prev['revenue']
+    prev_orders = prev['orders']
+    prev_customers = prev['customers']
     
     revenue_delta = ((total_revenue - prev_revenue) / prev_revenue * 100) if prev_revenue > 0 else 0
     orders_delta = ((total_orders - prev_orders) / prev_orders * 100) if prev_orders > 0 else 0
@@ -527,25 +655,38 @@ def calculate_metrics(df_current, df_all):
         'customers_delta': customers_delta
     }
 
-metrics = calculate_metrics(df_filtered, df)
+segment_key = tuple((c, tuple(v)) for c, v in segment_filters.items())
+metrics = calculate_metrics(dataset_version, start_date, end_date, tuple(selected_countries),
+                            segment_key, cube_filters, period_aggregates)
 
 # KPI Cards
-st.markdown("### 🎯 KEY PERFORMANCE INDICATORS")
-kpi1, kpi2, kpi3, kpi4, kpi5 = st.columns(5)
-
-with kpi1:
-    st.metric("💰 REVENUE", f"${metrics['total_revenue']:,.0f}", f"{metrics['revenue_delta']:.1f}%")
-with kpi2:
-    st.metric("🛒 ORDERS", f"{metrics['total_orders']:,}", f"{metrics['orders_delta']:.1f}%")
-with kpi3:
-    st.metric("👥 CUSTOMERS", f"{metrics['unique_customers']:,}", f"{metrics['customers_delta']:.1f}%")
-with kpi4:
-    st.metric("📦 UNITS", f"{metrics['total_quantity']:,}")
-with kpi5:
-    st.metric("💵 AVG ORDER", f"${metrics['avg_order_value']:.2f}")
+@st.fragment
+def kpi_row(metrics, distinct_error=None):
+    """KPI cards from the memoized metrics; ``distinct_error`` is set when orders/customers are sketch estimates."""
+    with profiled('kpi_row'):
+        st.markdown("### 🎯 KEY PERFORMANCE INDICATORS")
+        kpi1, kpi2, kpi3, kpi4, kpi5 = st.columns(5)
+
+        with kpi1:
+            st.metric("💰 REVENUE", f"${metrics['total_revenue']:,.0f}", f"{metrics['revenue_delta']:.1f}%")
+        with kpi2:
+            st.metric("🛒 ORDERS", f"{metrics['total_orders']:,}", f"{metrics['orders_delta']:.1f}%")
+        with kpi3:
+            st.metric("👥 CUSTOMERS", f"{metrics['unique_customers']:,}", f"{metrics['customers_delta']:.1f}%")
+        with kpi4:
+            st.metric("📦 UNITS", f"{metrics['total_quantity']:,}")
+        with kpi5:
+            st.metric("💵 AVG ORDER", f"${metrics['avg_order_value']:.2f}")
+
+        if distinct_error is not None:
+            st.caption(f"≈ Orders and customers are sketch estimates: ±{distinct_error:.1%} standard error "
+                       f"(±{2 * distinct_error:.1%} at 95%). Turn off approximate counts in Display Settings for exact values.")
+
+kpi_row(metrics, cube.distinct_error(segment_filters.get('category')) if cube_filters else None)
 
 st.markdown("---")
 
+
 # Plotly Helper con mejor contraste
 def style_fig(fig, title=""):
     theme = st.session_state.get('selected_theme', 'plotly_dark')
@@ -601,6 +742,40 @@ def style_fig(fig, title=""):
     
     return fig
 
+@st.cache_resource
+def get_figure_cache():
+    """Figure JSON specs shared by every session, bounded by FIGURE_CACHE_BYTES."""
+    return FigureCache()
+
+figure_cache = get_figure_cache()
+
+def plot_cached(name, data, build, title="", styled=True):
+    """
+    Draw the figure from ``build()`` through the figure cache.
+
+    The traces are cached under the fingerprint of ``data`` (the aggregate the
+    chart is built from) and the chart name; the styled spec adds title and
+    theme, so a theme change restyles the cached traces without rebuilding them.
+    """
+    theme = st.session_state.get('selected_theme', 'plotly_dark')
+    base_key = fingerprint(name, data)
+    styled_key = fingerprint(base_key, title, theme, styled)
+    spec = figure_cache.get(styled_key)
+    if spec is None:
+        fig = figure_cache.figure(base_key, build)
+        if styled:
+            fig = style_fig(fig, title)
+        spec = fig.to_json()
+        figure_cache.put(styled_key, spec)
+    st.plotly_chart(json.loads(spec), use_container_width=True)
+
+@st.cache_resource
+def get_report_engine():
+    """Background report builder shared by all sessions; keeps the latest reports per filter signature."""
+    return ReportEngine()
+
+report_engine = get_report_engine()
+
 colors = ['rgb(96, 165, 250)', 'rgb(129, 140, 248)', 'rgb(167, 139, 250)', 'rgb(236, 72, 153)', 'rgb(251, 146, 60)']
 
 # Función para obtener color de texto según tema
@@ -608,614 +783,803 @@ def get_text_color():
     theme = st.session_state.get('selected_theme', 'plotly_dark')
     return "rgb(31, 41, 55)" if theme in ['plotly_white', 'seaborn', 'ggplot2'] else "rgb(209, 213, 219)"
 
-# Dashboard Tabs
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 REVENUE", "👥 CUSTOMERS", "📦 PRODUCTS", "🌍 GEOGRAPHY", "🔬 ADVANCED"])
+# Rollups y tablas de las pestañas: se calculan al abrir la sección que los usa y se
+# memorizan por (versión de datos, firma de filtros)
+filter_signature = (dataset_version, start_date, end_date, tuple(selected_countries), segment_key,
+                    approx_distinct)
 
-# TAB 1: Revenue
-with tab1:
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
-        st.markdown("### 📈 REVENUE TREND")
-        monthly_revenue = df_filtered.groupby(df_filtered['order_date'].dt.to_period('M'))['total_price'].sum().reset_index()
-        monthly_revenue['order_date'] = monthly_revenue['order_date'].dt.to_timestamp()
-        
-        fig_trend = go.Figure()
-        fig_trend.add_trace(go.Scatter(
-            x=monthly_revenue['order_date'], y=monthly_revenue['total_price'],
-            mode='lines+markers', name='Revenue',
-            line=dict(color='rgb(96, 165, 250)', width=3),
-            marker=dict(size=8, color='rgb(96, 165, 250)'),
-            fill='tozeroy', fillcolor='rgba(96, 165, 250, 0.1)',
-            textfont=dict(color=get_text_color())
-        ))
-        
-        z = np.polyfit(range(len(monthly_revenue)), monthly_revenue['total_price'], 1)
-        p = np.poly1d(z)
-        fig_trend.add_trace(go.Scatter(
-            x=monthly_revenue['order_date'], y=p(range(len(monthly_revenue))),
-            mode='lines', name='Trend',
-            line=dict(color='rgb(251, 146, 60)', width=2.5, dash='dash')
-        ))
-        
-        st.plotly_chart(style_fig(fig_trend, "Monthly Performance"), use_container_width=True)
-    
-    with col2:
-        st.markdown("### 🏆 TOP COUNTRIES")
-        country_revenue = df_filtered.groupby('country')['total_price'].sum().nlargest(5).reset_index()
-        
-        fig_pie = px.pie(country_revenue, values='total_price', names='country', hole=0.45, color_discrete_sequence=colors)
-        fig_pie.update_traces(
-            textposition='inside', 
-            textinfo='percent+label',
-            textfont=dict(size=12, color='white', weight=600)
-        )
-        fig_pie.update_layout(
-            paper_bgcolor='rgba(0, 0, 0, 0)', 
-            showlegend=True,
-            legend=dict(font=dict(color=get_text_color()))
-        )
-        st.plotly_chart(fig_pie, use_container_width=True)
-    
-    st.markdown("### 📅 WEEKLY PATTERN")
-    dow_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    dow_revenue = df_filtered.groupby('day_of_week')['total_price'].sum().reindex(dow_order).reset_index()
-    
-    fig_dow = go.Figure(data=[go.Bar(
-        x=dow_revenue['day_of_week'], y=dow_revenue['total_price'],
-        marker=dict(color=dow_revenue['total_price'], colorscale='Viridis'),
-        text=[f"${val:,.0f}" for val in dow_revenue['total_price']], 
-        textposition='outside',
-        textfont=dict(color=get_text_color(), size=12, weight=600)
-    )])
-    st.plotly_chart(style_fig(fig_dow, "Revenue by Day"), use_container_width=True)
-
-# TAB 2: Customers
-with tab2:
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown(f"### 🌟 TOP {top_n} CUSTOMERS")
-        top_customers = df_filtered.groupby('customer_id').agg({
+@st.cache_data(max_entries=64)
+def section_data(name, signature, _compute):
+    """Result of ``_compute()`` memoized per section name and (data version, filter signature)."""
+    return _compute()
+
+def get_monthly_revenue():
+    return section_data('monthly_revenue', filter_signature, agg.monthly_revenue)
+
+def get_daily_revenue():
+    return section_data('daily_revenue', filter_signature, agg.daily_revenue)
+
+def get_country_analysis():
+    return section_data('country_analysis', filter_signature, agg.country_summary)
+
+def get_product_summary():
+    return section_data('product_summary', filter_signature, agg.product_summary)
+
+def top_items(summary, column, measures, n, exact):
+    """
+    Top-n from the cube's heavy-hitter summaries, or ``exact()`` when n exceeds
+    the tracked items, the filters are not cube dimensions or an untracked item
+    could outrank the summary's top-n (not guaranteed). Returns (frame, max_error).
+    """
+    result = agg.top(summary, n) if cube_filters else None
+    if result is None or not result[2]:
+        return exact(), 0.0
+    top, max_error, _ = result
+    return top.rename(columns={'item': column, **measures})[[column] + list(measures.values())], max_error
+
+def top_error_caption(max_error, unit="$"):
+    if max_error > 0:
+        st.caption(f"≈ Heavy-hitter summary: values may be under-counted by at most {unit}{max_error:,.0f}")
+
+def get_top_customers(top_n):
+    return section_data('top_customers', (filter_signature, top_n), lambda: top_items(
+        'customers', 'customer_id', {'revenue': 'total_revenue', 'orders': 'order_count'}, top_n,
+        lambda: df_filtered.groupby('customer_id').agg({
             'total_price': 'sum', 'order_id': 'nunique'
-        }).nlargest(top_n, 'total_price').reset_index()
-        top_customers.columns = ['customer_id', 'total_revenue', 'order_count']
-        
-        fig_cust = go.Figure(data=[go.Bar(
-            x=top_customers['total_revenue'], y=top_customers['customer_id'], orientation='h',
-            marker=dict(color=top_customers['total_revenue'], colorscale='Plasma'),
-            text=[f"${val:,.0f}" for val in top_customers['total_revenue']], 
-            textposition='outside',
-            textfont=dict(color=get_text_color(), size=11, weight=600)
-        )])
-        st.plotly_chart(style_fig(fig_cust, "Revenue Champions"), use_container_width=True)
-    
-    with col2:
-        st.markdown("### 🔄 RETENTION")
-        order_freq = df_filtered.groupby('customer_id')['order_id'].nunique().value_counts().sort_index().reset_index()
-        order_freq.columns = ['orders', 'customer_count']
-        
-        fig_freq = go.Figure(data=[go.Bar(
-            x=order_freq['orders'], y=order_freq['customer_count'],
-            marker=dict(color=order_freq['customer_count'], colorscale='Turbo'),
-            text=order_freq['customer_count'], 
-            textposition='outside',
-            textfont=dict(color=get_text_color(), size=12, weight=600)
-        )])
-        st.plotly_chart(style_fig(fig_freq, "Order Frequency"), use_container_width=True)
-    
-    st.markdown("### 🎯 CUSTOMER SEGMENTATION")
-    snapshot_date = df_filtered['order_date'].max() + timedelta(days=1)
-    rfm = df_filtered.groupby('customer_id').agg({
-        'order_date': lambda x: (snapshot_date - x.max()).days,
-        'order_id': 'nunique',
-        'total_price': 'sum'
-    }).reset_index()
-    rfm.columns = ['customer_id', 'recency', 'frequency', 'monetary']
-    
-    rfm['segment'] = 'Regular'
-    rfm.loc[(rfm['frequency'] >= rfm['frequency'].quantile(0.75)) & 
-            (rfm['monetary'] >= rfm['monetary'].quantile(0.75)), 'segment'] = '💎 VIP'
-    rfm.loc[(rfm['recency'] <= rfm['recency'].quantile(0.25)) & 
-            (rfm['frequency'] >= rfm['frequency'].quantile(0.5)), 'segment'] = '⚡ Active'
-    rfm.loc[rfm['recency'] >= rfm['recency'].quantile(0.75), 'segment'] = '⚠️ At Risk'
-    
-    segment_summary = rfm.groupby('segment').agg({
-        'customer_id': 'count', 'monetary': 'sum'
-    }).reset_index()
-    segment_summary.columns = ['segment', 'customer_count', 'total_revenue']
-    
-    sc1, sc2 = st.columns(2)
-    with sc1:
-        fig_seg = go.Figure(data=[go.Bar(
-            x=segment_summary['segment'], y=segment_summary['customer_count'],
-            marker=dict(color=colors[:len(segment_summary)]),
-            text=segment_summary['customer_count'], 
-            textposition='outside',
-            textfont=dict(color=get_text_color(), size=12, weight=600)
-        )])
-        st.plotly_chart(style_fig(fig_seg, "Customers by Segment"), use_container_width=True)
-    
-    with sc2:
-        fig_segrev = go.Figure(data=[go.Bar(
-            x=segment_summary['segment'], y=segment_summary['total_revenue'],
-            marker=dict(color=colors[:len(segment_summary)]),
-            text=[f"${val:,.0f}" for val in segment_summary['total_revenue']], 
-            textposition='outside',
-            textfont=dict(color=get_text_color(), size=12, weight=600)
-        )])
-        st.plotly_chart(style_fig(fig_segrev, "Revenue by Segment"), use_container_width=True)
-
-# TAB 3: Products
-with tab3:
-    pc1, pc2 = st.columns([3, 2])
-    
-    with pc1:
-        st.markdown(f"### 🎯 TOP {top_n} PRODUCTS")
-        top_prod = df_filtered.groupby('product_name').agg({
-            'total_price': 'sum', 'quantity': 'sum'
-        }).nlargest(top_n, 'total_price').reset_index()
-        
-        fig_prod = go.Figure(data=[go.Bar(
-            x=top_prod['total_price'], y=top_prod['product_name'], orientation='h',
-            marker=dict(color=top_prod['total_price'], colorscale='Rainbow'),
-            text=[f"${val:,.0f}" for val in top_prod['total_price']], 
-            textposition='outside',
-            textfont=dict(color=get_text_color(), size=11, weight=600)
-        )])
-        st.plotly_chart(style_fig(fig_prod, "Revenue Leaders"), use_container_width=True)
-    
-    with pc2:
-        st.markdown("### 📦 BY QUANTITY")
-        top_qty = df_filtered.groupby('product_name')['quantity'].sum().nlargest(top_n).reset_index()
-        
-        fig_qty = go.Figure(data=[go.Bar(
-            x=top_qty['quantity'], y=top_qty['product_name'], orientation='h',
-            marker=dict(color=top_qty['quantity'], colorscale='Teal'),
-            text=top_qty['quantity'], 
-            textposition='outside',
-            textfont=dict(color=get_text_color(), size=11, weight=600)
-        )])
-        st.plotly_chart(style_fig(fig_qty, "Volume Champions"), use_container_width=True)
-    
-    st.markdown("### 💲 PRICE DISTRIBUTION")
-    prc1, prc2 = st.columns([2, 1])
-    
-    with prc1:
-        fig_price = go.Figure()
-        fig_price.add_trace(go.Histogram(
-            x=df_filtered['unit_price'], nbinsx=50,
-            marker=dict(color='rgb(126, 87, 194)'), name='Distribution'
-        ))
-        st.plotly_chart(style_fig(fig_price, "Unit Price Analysis"), use_container_width=True)
-    
-    with prc2:
-        price_stats = df_filtered['unit_price'].describe()
-        st.markdown("**📈 STATISTICS**")
-        st.metric("Mean", f"${price_stats['mean']:.2f}")
-        st.metric("Median", f"${price_stats['50%']:.2f}")
-        st.metric("Std Dev", f"${price_stats['std']:.2f}")
-        st.metric("Max", f"${price_stats['max']:.2f}")
-
-# TAB 4: Geography
-with tab4:
-    st.markdown("### 🌍 REVENUE BY COUNTRY")
-    
-    country_analysis = df_filtered.groupby('country').agg({
-        'total_price': 'sum', 'order_id': 'nunique', 'customer_id': 'nunique'
-    }).reset_index()
-    country_analysis.columns = ['country', 'revenue', 'orders', 'customers']
-    country_analysis = country_analysis.sort_values('revenue', ascending=False)
-    
-    fig_country = go.Figure(data=[go.Bar(
-        x=country_analysis['country'], y=country_analysis['revenue'],
-        marker=dict(color=country_analysis['revenue'], colorscale='Viridis', showscale=True),
-        text=[f"${val:,.0f}" for val in country_analysis['revenue']], 
-        textposition='outside',
-        textfont=dict(color=get_text_color(), size=12, weight=600)
-    )])
-    st.plotly_chart(style_fig(fig_country, "Global Distribution"), use_container_width=True)
-    
-    st.markdown("### 📋 DETAILED PERFORMANCE")
-    country_analysis['avg_order_value'] = country_analysis['revenue'] / country_analysis['orders']
-    display_df = country_analysis.copy()
-    display_df['revenue'] = display_df['revenue'].apply(lambda x: f"${x:,.0f}")
-    display_df['avg_order_value'] = display_df['avg_order_value'].apply(lambda x: f"${x:.2f}")
-    st.dataframe(display_df, use_container_width=True, hide_index=True)
-
-# TAB 5: Advanced
-with tab5:
-    st.markdown("### 🔬 ADVANCED ANALYTICS")
-    
-    adv1, adv2 = st.columns(2)
-    
-    with adv1:
-        st.markdown("#### 💹 GROWTH RATE")
-        growth_data = monthly_revenue.copy()
-        growth_data['growth_rate'] = growth_data['total_price'].pct_change() * 100
-        
-        fig_growth = go.Figure()
-        colors_growth = ['rgb(16, 185, 129)' if x >= 0 else 'rgb(239, 68, 68)' for x in growth_data['growth_rate']]
-        fig_growth.add_trace(go.Bar(
-            x=growth_data['order_date'], y=growth_data['growth_rate'],
-            marker=dict(color=colors_growth),
-            text=[f"{val:.1f}%" if not pd.isna(val) else "" for val in growth_data['growth_rate']],
-            textposition='outside',
-            textfont=dict(color=get_text_color(), size=11, weight=600)
-        ))
-        fig_growth.add_hline(y=0, line_dash="solid", line_color="rgba(255, 255, 255, 0.4)")
-        st.plotly_chart(style_fig(fig_growth, "MoM Growth %"), use_container_width=True)
-    
-    with adv2:
-        st.markdown("#### 📊 PARETO ANALYSIS")
-        prod_rev = df_filtered.groupby('product_name')['total_price'].sum().sort_values(ascending=False).reset_index()
-        prod_rev['cumulative_pct'] = (prod_rev['total_price'].cumsum() / prod_rev['total_price'].sum()) * 100
-        
-        fig_pareto = go.Figure()
-        fig_pareto.add_trace(go.Bar(
-            x=prod_rev.index[:20], y=prod_rev['total_price'][:20],
-            name='Revenue', marker=dict(color='rgb(129, 140, 248)')
-        ))
-        fig_pareto.add_trace(go.Scatter(
-            x=prod_rev.index[:20], y=prod_rev['cumulative_pct'][:20],
-            name='Cumulative %', mode='lines+markers',
-            marker=dict(color='rgb(96, 165, 250)', size=6),
-            line=dict(color='rgb(96, 165, 250)', width=2.5),
-            yaxis='y2'
-        ))
-        fig_pareto.update_layout(yaxis2=dict(overlaying='y', side='right', range=[0, 100]))
-        st.plotly_chart(style_fig(fig_pareto, "80/20 Rule"), use_container_width=True)
-    
-    top_5_revenue_pct = (top_customers['total_revenue'].head(5).sum() / metrics['total_revenue']) * 100
-    
-    st.markdown("### 🎯 EXECUTIVE SUMMARY")
-    sum1, sum2, sum3, sum4 = st.columns(4)
-    
-    with sum1:
-        top_country = country_analysis.iloc[0]
-        st.markdown(f"**TOP COUNTRY**")
-        st.metric("", top_country['country'], f"${top_country['revenue']:,.0f}")
-    
-    with sum2:
-        best_prod = top_prod.iloc[0]
-        st.markdown(f"**BEST PRODUCT**")
-        st.metric("", best_prod['product_name'][:15], f"${best_prod['total_price']:,.0f}")
-    
-    with sum3:
-        vip_count = rfm[rfm['segment'] == '💎 VIP'].shape[0]
-        st.markdown(f"**VIP CUSTOMERS**")
-        st.metric("", vip_count, "Top Tier")
-    
-    with sum4:
-        growth_avg = growth_data['growth_rate'].mean()
-        st.markdown(f"**AVG GROWTH**")
-        st.metric("", f"{growth_avg:.1f}%", "MoM")
-
-# Export Section
-st.markdown("---")
-st.markdown("## 📥 EXPORT CENTER")
+        }).nlargest(top_n, 'total_price').reset_index().set_axis(['customer_id', 'total_revenue', 'order_count'], axis=1)))
 
-exp1, exp2, exp3, exp4 = st.columns(4)
+def get_top_products(top_n):
+    return section_data('top_products', (filter_signature, top_n), lambda: top_items(
+        'products_revenue', 'product_name', {'revenue': 'total_price', 'quantity': 'quantity'}, top_n,
+        lambda: get_product_summary().nlargest(top_n, 'total_price').reset_index(drop=True)))
 
-with exp1:
-    st.download_button(
-        "📊 DATASET",
-        df_filtered.to_csv(index=False).encode('utf-8'),
-        file_name=f"data_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-        mime="text/csv",
-        use_container_width=True
-    )
+def get_top_quantity(top_n):
+    return section_data('top_quantity', (filter_signature, top_n), lambda: top_items(
+        'products_quantity', 'product_name', {'quantity': 'quantity'}, top_n,
+        lambda: get_product_summary().nlargest(top_n, 'quantity')[['product_name', 'quantity']].reset_index(drop=True)))
 
-with exp2:
-    st.download_button(
-        "🏆 CUSTOMERS",
-        top_customers.to_csv(index=False).encode('utf-8'),
-        file_name=f"customers_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-        mime="text/csv",
-        use_container_width=True
-    )
+def get_rfm():
+    """RFM from the incremental customer × day × country state; from the filtered rows with segment filters."""
+    if segment_filters:
+        return section_data('rfm', filter_signature, lambda: assign_segments(compute_rfm(df_filtered)))
+    return section_data('rfm', filter_signature,
+                        lambda: assign_segments(rfm_state.window(start_date_dt, end_date_dt, country_key)))
 
-with exp3:
-    st.download_button(
-        "📦 PRODUCTS",
-        top_prod.to_csv(index=False).encode('utf-8'),
-        file_name=f"products_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-        mime="text/csv",
-        use_container_width=True
-    )
+def get_country_table():
+    """Geography table with AOV, formatted for display and export."""
+    def compute():
+        country_analysis = get_country_analysis()
+        country_analysis['avg_order_value'] = country_analysis['revenue'] / country_analysis['orders']
+        display_df = country_analysis.copy()
+        display_df['revenue'] = display_df['revenue'].apply(lambda x: f"${x:,.0f}")
+        display_df['avg_order_value'] = display_df['avg_order_value'].apply(lambda x: f"${x:.2f}")
+        return display_df
+    return section_data('country_table', filter_signature, compute)
 
-with exp4:
-    st.download_button(
-        "🌍 COUNTRIES",
-        display_df.to_csv(index=False).encode('utf-8'),
-        file_name=f"countries_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-        mime="text/csv",
-        use_container_width=True
-    )
+def get_top_5_revenue_pct(top_n):
+    return (get_top_customers(top_n)[0]['total_revenue'].head(5).sum() / metrics['total_revenue']) * 100
 
-# Advanced Features
-st.markdown("---")
-st.markdown("## 🚀 ADVANCED FEATURES")
+# Secciones del dashboard como fragmentos: un cambio en sus widgets solo re-ejecuta la sección
 
-adv_tab1, adv_tab2, adv_tab3, adv_tab4 = st.tabs([
-    "🔔 SMART ALERTS", "📈 ML PREDICTIONS", "📊 YoY COMPARISON", "📄 PDF REPORT"
-])
+@st.fragment
+def revenue_tab():
+    """Revenue tab: revenue trend at an adaptive grain, top countries and weekly pattern."""
+    with profiled('revenue_tab'):
+        col1, col2 = st.columns([2, 1])
 
-# SMART ALERTS
-with adv_tab1:
-    st.markdown("### 🔔 INTELLIGENT ALERTS")
-    
-    alert1, alert2 = st.columns(2)
-    
-    with alert1:
-        st.markdown("#### 📉 Performance Alerts")
-        
-        if metrics['revenue_delta'] < -10:
-            st.error(f"🚨 Revenue dropped {abs(metrics['revenue_delta']):.1f}%")
-        elif metrics['revenue_delta'] < 0:
-            st.warning(f"⚠️ Revenue declined {abs(metrics['revenue_delta']):.1f}%")
-        else:
-            st.success(f"✅ Revenue grew {metrics['revenue_delta']:.1f}%")
-        
-        if metrics['customers_delta'] < -5:
-            st.error(f"🚨 Lost {abs(metrics['customers_delta']):.1f}% of customers")
-        elif metrics['customers_delta'] < 0:
-            st.warning(f"⚠️ Customer count decreased {abs(metrics['customers_delta']):.1f}%")
-        else:
-            st.success(f"✅ Customer base grew {metrics['customers_delta']:.1f}%")
-    
-    with alert2:
-        st.markdown("#### 📊 Threshold Monitoring")
-        
-        aov_threshold = 100
+        with col1:
+            st.markdown("### 📈 REVENUE TREND")
+            grain_choice = st.radio("Grain", ["Auto", "Day", "Week", "Month"], horizontal=True,
+                                    key="trend_grain", label_visibility="collapsed")
+            # Grano según el rango seleccionado (Auto) y LTTB si la serie supera el presupuesto de puntos
+            grain = None if grain_choice == "Auto" else grain_choice.lower()
+            trend, grain = section_data(f'trend_{grain_choice}', filter_signature, lambda: trend_series(
+                get_daily_revenue(), start_date_dt, end_date_dt, grain))
+            def build_trend():
+                fig_trend = go.Figure()
+                fig_trend.add_trace(go.Scatter(
+                    x=trend['order_date'], y=trend['total_price'],
+                    mode='lines+markers' if len(trend) <= 60 else 'lines', name='Revenue',
+                    line=dict(color='rgb(96, 165, 250)', width=3),
+                    marker=dict(size=8, color='rgb(96, 165, 250)'),
+                    fill='tozeroy', fillcolor='rgba(96, 165, 250, 0.1)',
+                    textfont=dict(color=get_text_color())
+                ))
+    
+                # Tendencia lineal sobre días transcurridos (los puntos pueden no ser equidistantes tras LTTB)
+                elapsed = (trend['order_date'] - trend['order_date'].iloc[0]).dt.days.to_numpy()
+                z = np.polyfit(elapsed, trend['total_price'], 1)
+                p = np.poly1d(z)
+                fig_trend.add_trace(go.Scatter(
+                    x=trend['order_date'], y=p(elapsed),
+                    mode='lines', name='Trend',
+                    line=dict(color='rgb(251, 146, 60)', width=2.5, dash='dash')
+                ))
+                return fig_trend
+            plot_cached('trend', trend, build_trend, f"{GRAINS[grain][1]} Performance")
+
+        with col2:
+            st.markdown("### 🏆 TOP COUNTRIES")
+            country_revenue = get_country_analysis().nlargest(5, 'revenue')[['country', 'revenue']].rename(columns={'revenue': 'total_price'})
+    
+            def build_pie():
+                fig_pie = px.pie(country_revenue, values='total_price', names='country', hole=0.45, color_discrete_sequence=colors)
+                fig_pie.update_traces(
+                    textposition='inside', 
+                    textinfo='percent+label',
+                    textfont=dict(size=12, color='white', weight=600)
+                )
+                fig_pie.update_layout(
+                    paper_bgcolor='rgba(0, 0, 0, 0)', 
+                    showlegend=True,
+                    legend=dict(font=dict(color=get_text_color()))
+                )
+                return fig_pie
+            plot_cached('pie', (country_revenue, st.session_state.get('selected_theme', 'plotly_dark')), build_pie, styled=False)
+
+        st.markdown("### 📅 WEEKLY PATTERN")
+        dow_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        dow_revenue = agg.dow_revenue().reindex(dow_order).rename_axis('day_of_week').reset_index(name='total_price')
+
+        def build_dow():
+            fig_dow = go.Figure(data=[go.Bar(
+                x=dow_revenue['day_of_week'], y=dow_revenue['total_price'],
+                marker=dict(color=dow_revenue['total_price'], colorscale='Viridis'),
+                text=[f"${val:,.0f}" for val in dow_revenue['total_price']], 
+                textposition='outside',
+                textfont=dict(color=get_text_color(), size=12, weight=600)
+            )])
+            return fig_dow
+        plot_cached('dow', dow_revenue, build_dow, "Revenue by Day")
+
+
+@st.fragment
+def customers_tab(top_n):
+    """Customers tab: Top-N customers, retention and RFM segments."""
+    with profiled('customers_tab'):
+        top_customers, top_customers_error = get_top_customers(top_n)
+        rfm = get_rfm()
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown(f"### 🌟 TOP {top_n} CUSTOMERS")
+            def build_cust():
+                fig_cust = go.Figure(data=[go.Bar(
+                    x=top_customers['total_revenue'], y=top_customers['customer_id'], orientation='h',
+                    marker=dict(color=top_customers['total_revenue'], colorscale='Plasma'),
+                    text=[f"${val:,.0f}" for val in top_customers['total_revenue']], 
+                    textposition='outside',
+                    textfont=dict(color=get_text_color(), size=11, weight=600)
+                )])
+                return fig_cust
+            plot_cached('cust', top_customers, build_cust, "Revenue Champions")
+            top_error_caption(top_customers_error)
+
+        with col2:
+            st.markdown("### 🔄 RETENTION")
+            order_freq = rfm['frequency'].value_counts().sort_index().reset_index()
+            order_freq.columns = ['orders', 'customer_count']
+    
+            def build_freq():
+                fig_freq = go.Figure(data=[go.Bar(
+                    x=order_freq['orders'], y=order_freq['customer_count'],
+                    marker=dict(color=order_freq['customer_count'], colorscale='Turbo'),
+                    text=order_freq['customer_count'], 
+                    textposition='outside',
+                    textfont=dict(color=get_text_color(), size=12, weight=600)
+                )])
+                return fig_freq
+            plot_cached('freq', order_freq, build_freq, "Order Frequency")
+
+        st.markdown("### 🎯 CUSTOMER SEGMENTATION")
+        segment_totals = segment_summary(rfm)
+
+        sc1, sc2 = st.columns(2)
+        with sc1:
+            def build_seg():
+                fig_seg = go.Figure(data=[go.Bar(
+                    x=segment_totals['segment'], y=segment_totals['customer_count'],
+                    marker=dict(color=colors[:len(segment_totals)]),
+                    text=segment_totals['customer_count'], 
+                    textposition='outside',
+                    textfont=dict(color=get_text_color(), size=12, weight=600)
+                )])
+                return fig_seg
+            plot_cached('seg', segment_totals, build_seg, "Customers by Segment")
+
+        with sc2:
+            def build_segrev():
+                fig_segrev = go.Figure(data=[go.Bar(
+                    x=segment_totals['segment'], y=segment_totals['total_revenue'],
+                    marker=dict(color=colors[:len(segment_totals)]),
+                    text=[f"${val:,.0f}" for val in segment_totals['total_revenue']], 
+                    textposition='outside',
+                    textfont=dict(color=get_text_color(), size=12, weight=600)
+                )])
+                return fig_segrev
+            plot_cached('segrev', segment_totals, build_segrev, "Revenue by Segment")
+
+
+@st.fragment
+def products_tab(top_n):
+    """Products tab: Top-N products and unit price distribution."""
+    with profiled('products_tab'):
+        top_prod, top_prod_error = get_top_products(top_n)
+        top_qty, top_qty_error = get_top_quantity(top_n)
+        pc1, pc2 = st.columns([3, 2])
+
+        with pc1:
+            st.markdown(f"### 🎯 TOP {top_n} PRODUCTS")
+            def build_prod():
+                fig_prod = go.Figure(data=[go.Bar(
+                    x=top_prod['total_price'], y=top_prod['product_name'], orientation='h',
+                    marker=dict(color=top_prod['total_price'], colorscale='Rainbow'),
+                    text=[f"${val:,.0f}" for val in top_prod['total_price']], 
+                    textposition='outside',
+                    textfont=dict(color=get_text_color(), size=11, weight=600)
+                )])
+                return fig_prod
+            plot_cached('prod', top_prod, build_prod, "Revenue Leaders")
+            top_error_caption(top_prod_error)
+
+        with pc2:
+            st.markdown("### 📦 BY QUANTITY")
+            def build_qty():
+                fig_qty = go.Figure(data=[go.Bar(
+                    x=top_qty['quantity'], y=top_qty['product_name'], orientation='h',
+                    marker=dict(color=top_qty['quantity'], colorscale='Teal'),
+                    text=top_qty['quantity'], 
+                    textposition='outside',
+                    textfont=dict(color=get_text_color(), size=11, weight=600)
+                )])
+                return fig_qty
+            plot_cached('qty', top_qty, build_qty, "Volume Champions")
+            top_error_caption(top_qty_error, unit="")
+
+        st.markdown("### 💲 PRICE DISTRIBUTION")
+        prc1, prc2 = st.columns([2, 1])
+
+        with prc1:
+            # Bins calculados en el servidor: histograma exacto del cubo, o filas filtradas si hay filtros fuera del cubo
+            if set(segment_filters) <= {'category'}:
+                def cube_price_bins():
+                    values, weights = cube.price_values(True, start_date_dt, end_date_dt, country_key,
+                                                        segment_filters.get('category'))
+                    return histogram_bins(values, weights=weights)
+                price_bins = section_data('price_bins', filter_signature, cube_price_bins)
+            else:
+                price_bins = section_data('price_bins', filter_signature,
+                                          lambda: histogram_bins(df_filtered['unit_price']))
+            def build_price():
+                fig_price = histogram_figure(price_bins)
+                return fig_price
+            plot_cached('price', price_bins, build_price, "Unit Price Analysis")
+
+        with prc2:
+            # Precios enteros: histograma exacto del cubo, o resúmenes de cuantiles con el toggle activo
+            if set(segment_filters) <= {'category'}:
+                price_stats = cube.price_stats(not approx_distinct, start_date_dt, end_date_dt,
+                                               country_key, segment_filters.get('category'))
+            else:
+                price_stats = FrameAggregates(df_filtered).price_stats()
+            st.markdown("**📈 STATISTICS**")
+            st.metric("Mean", f"${price_stats['mean']:.2f}")
+            st.metric("Median", f"${price_stats['50%']:.2f}")
+            st.metric("Std Dev", f"${price_stats['std']:.2f}")
+            st.metric("Max", f"${price_stats['max']:.2f}")
+            if approx_distinct and set(segment_filters) <= {'category'}:
+                st.caption(f"≈ Quantile summaries: median within ±{cube.price_error():.1%} of rank")
+
+
+@st.fragment
+def geography_tab():
+    """Geography tab: revenue and KPIs per country."""
+    with profiled('geography_tab'):
+        country_analysis = get_country_analysis()
+        st.markdown("### 🌍 REVENUE BY COUNTRY")
+
+        def build_country():
+            fig_country = go.Figure(data=[go.Bar(
+                x=country_analysis['country'], y=country_analysis['revenue'],
+                marker=dict(color=country_analysis['revenue'], colorscale='Viridis', showscale=True),
+                text=[f"${val:,.0f}" for val in country_analysis['revenue']], 
+                textposition='outside',
+                textfont=dict(color=get_text_color(), size=12, weight=600)
+            )])
+            return fig_country
+        plot_cached('country', country_analysis, build_country, "Global Distribution")
+
+        st.markdown("### 📋 DETAILED PERFORMANCE")
+        st.dataframe(get_country_table(), use_container_width=True, hide_index=True)
+
+
+@st.fragment
+def advanced_tab(top_n):
+    """Advanced tab: MoM growth, Pareto and executive summary."""
+    with profiled('advanced_tab'):
+        monthly_revenue = get_monthly_revenue()
+        st.markdown("### 🔬 ADVANCED ANALYTICS")
+
+        adv1, adv2 = st.columns(2)
+
+        with adv1:
+            st.markdown("#### 💹 GROWTH RATE")
+            growth_data = monthly_revenue.copy()
+            growth_data['growth_rate'] = growth_data['total_price'].pct_change() * 100
+    
+            def build_growth():
+                fig_growth = go.Figure()
+                colors_growth = ['rgb(16, 185, 129)' if x >= 0 else 'rgb(239, 68, 68)' for x in growth_data['growth_rate']]
+                fig_growth.add_trace(go.Bar(
+                    x=growth_data['order_date'], y=growth_data['growth_rate'],
+                    marker=dict(color=colors_growth),
+                    text=[f"{val:.1f}%" if not pd.isna(val) else "" for val in growth_data['growth_rate']],
+                    textposition='outside',
+                    textfont=dict(color=get_text_color(), size=11, weight=600)
+                ))
+                fig_growth.add_hline(y=0, line_dash="solid", line_color="rgba(255, 255, 255, 0.4)")
+                return fig_growth
+            plot_cached('growth', growth_data, build_growth, "MoM Growth %")
+
+        with adv2:
+            st.markdown("#### 📊 PARETO ANALYSIS")
+            prod_rev = get_product_summary()[['product_name', 'total_price']].sort_values('total_price', ascending=False).reset_index(drop=True)
+            prod_rev['cumulative_pct'] = (prod_rev['total_price'].cumsum() / prod_rev['total_price'].sum()) * 100
+    
+            def build_pareto():
+                fig_pareto = go.Figure()
+                fig_pareto.add_trace(go.Bar(
+                    x=prod_rev.index[:20], y=prod_rev['total_price'][:20],
+                    name='Revenue', marker=dict(color='rgb(129, 140, 248)')
+                ))
+                fig_pareto.add_trace(go.Scatter(
+                    x=prod_rev.index[:20], y=prod_rev['cumulative_pct'][:20],
+                    name='Cumulative %', mode='lines+markers',
+                    marker=dict(color='rgb(96, 165, 250)', size=6),
+                    line=dict(color='rgb(96, 165, 250)', width=2.5),
+                    yaxis='y2'
+                ))
+                fig_pareto.update_layout(yaxis2=dict(overlaying='y', side='right', range=[0, 100]))
+                return fig_pareto
+            plot_cached('pareto', prod_rev, build_pareto, "80/20 Rule")
+
+        st.markdown("### 🎯 EXECUTIVE SUMMARY")
+        sum1, sum2, sum3, sum4 = st.columns(4)
+
+        with sum1:
+            top_country = get_country_analysis().iloc[0]
+            st.markdown(f"**TOP COUNTRY**")
+            st.metric("", top_country['country'], f"${top_country['revenue']:,.0f}")
+
+        with sum2:
+            best_prod = get_top_products(top_n)[0].iloc[0]
+            st.markdown(f"**BEST PRODUCT**")
+            st.metric("", best_prod['product_name'][:15], f"${best_prod['total_price']:,.0f}")
+
+        with sum3:
+            rfm = get_rfm()
+            vip_count = rfm[rfm['segment'] == '💎 VIP'].shape[0]
+            st.markdown(f"**VIP CUSTOMERS**")
+            st.metric("", vip_count, "Top Tier")
+
+        with sum4:
+            growth_avg = growth_data['growth_rate'].mean()
+            st.markdown(f"**AVG GROWTH**")
+            st.metric("", f"{growth_avg:.1f}%", "MoM")
+
+
+@st.fragment(run_every=0.5)
+def export_progress(job):
+    """Polls a background export; the whole app reruns once to swap in the download button."""
+    st.progress(job.progress, text=f"Exporting {job.rows_written:,} / {job.total:,} rows...")
+    if job.done:
+        st.rerun()
+
+
+def dataset_export(fmt, stamp):
+    """Filtered dataset: downloaded directly, or prepared on a worker thread above BACKGROUND_ROWS."""
+    mime = EXPORT_FORMATS[fmt][2]
+    file_name = export_file_name('data', fmt, stamp)
+    if len(df_filtered) < BACKGROUND_ROWS:
+        st.download_button("📊 DATASET", lambda: export_bytes(df_filtered, fmt), file_name=file_name,
+                           mime=mime, use_container_width=True)
+        return
+
+    # Un trabajo por sesión; se descarta si cambian los filtros o el formato
+    job_key = (filter_signature, fmt)
+    job = st.session_state.get('export_job')
+    if job is not None and job.key != job_key:
+        job.discard()
+        del st.session_state['export_job']
+        job = None
+
+    if job is None:
+        if not st.button(f"📊 PREPARE DATASET ({len(df_filtered):,} rows)", use_container_width=True):
+            return
+        job = st.session_state['export_job'] = ExportJob(df_filtered, fmt, job_key)
+
+    if not job.done:
+        export_progress(job)
+    elif job.error is not None:
+        st.error(f"Export failed: {job.error}")
+    else:
+        st.download_button("📊 DATASET", job.read, file_name=file_name, mime=mime, use_container_width=True)
+
+
+@st.fragment
+def export_center(top_n):
+    """Export center; files are written in chunks when a button is clicked."""
+    with profiled('export_center'):
+        st.markdown("---")
+        st.markdown("## 📥 EXPORT CENTER")
+
+        fmt = st.selectbox("Format", list(EXPORT_FORMATS), format_func=lambda f: EXPORT_FORMATS[f][0],
+                           key="export_format")
+        mime = EXPORT_FORMATS[fmt][2]
+        stamp = datetime.now().strftime('%Y%m%d_%H%M')
+
+        # Los ficheros se generan al pulsar cada botón (en otro hilo), no en cada ejecución del script
+        exp1, exp2, exp3, exp4 = st.columns(4)
+
+        with exp1:
+            dataset_export(fmt, stamp)
+
+        with exp2:
+            st.download_button(
+                "🏆 CUSTOMERS",
+                lambda: export_bytes(get_top_customers(top_n)[0], fmt),
+                file_name=export_file_name('customers', fmt, stamp),
+                mime=mime,
+                use_container_width=True
+            )
+
+        with exp3:
+            st.download_button(
+                "📦 PRODUCTS",
+                lambda: export_bytes(get_top_products(top_n)[0], fmt),
+                file_name=export_file_name('products', fmt, stamp),
+                mime=mime,
+                use_container_width=True
+            )
+
+        with exp4:
+            st.download_button(
+                "🌍 COUNTRIES",
+                lambda: export_bytes(get_country_table(), fmt),
+                file_name=export_file_name('countries', fmt, stamp),
+                mime=mime,
+                use_container_width=True
+            )
+
+
+@st.fragment
+def alerts_panel(top_n):
+    """Smart alerts and recommendations."""
+    with profiled('alerts_panel'):
+        top_5_revenue_pct = get_top_5_revenue_pct(top_n)
+        st.markdown("### 🔔 INTELLIGENT ALERTS")
+
+        alert1, alert2 = st.columns(2)
+
+        with alert1:
+            st.markdown("#### 📉 Performance Alerts")
+    
+            if metrics['revenue_delta'] < -10:
+                st.error(f"🚨 Revenue dropped {abs(metrics['revenue_delta']):.1f}%")
+            elif metrics['revenue_delta'] < 0:
+                st.warning(f"⚠️ Revenue declined {abs(metrics['revenue_delta']):.1f}%")
+            else:
+                st.success(f"✅ Revenue grew {metrics['revenue_delta']:.1f}%")
+    
+            if metrics['customers_delta'] < -5:
+                st.error(f"🚨 Lost {abs(metrics['customers_delta']):.1f}% of customers")
+            elif metrics['customers_delta'] < 0:
+                st.warning(f"⚠️ Customer count decreased {abs(metrics['customers_delta']):.1f}%")
+            else:
+                st.success(f"✅ Customer base grew {metrics['customers_delta']:.1f}%")
+
+        with alert2:
+            st.markdown("#### 📊 Threshold Monitoring")
+    
+            aov_threshold = 100
+            if metrics['avg_order_value'] < aov_threshold:
+                st.warning(f"⚠️ AOV (${metrics['avg_order_value']:.2f}) below target (${aov_threshold})")
+            else:
+                st.success(f"✅ AOV (${metrics['avg_order_value']:.2f}) exceeds target")
+    
+            if top_5_revenue_pct > 50:
+                st.warning(f"⚠️ Top 5 customers: {top_5_revenue_pct:.1f}% - High risk")
+            else:
+                st.info(f"ℹ️ Top 5 customers: {top_5_revenue_pct:.1f}% of revenue")
+
+        st.markdown("#### 🎯 Recommendations")
+
+        recs = []
+        if metrics['revenue_delta'] < 0:
+            recs.append("💡 Focus on customer retention campaigns")
         if metrics['avg_order_value'] < aov_threshold:
-            st.warning(f"⚠️ AOV (${metrics['avg_order_value']:.2f}) below target (${aov_threshold})")
-        else:
-            st.success(f"✅ AOV (${metrics['avg_order_value']:.2f}) exceeds target")
-        
+            recs.append("💡 Implement upselling strategies")
         if top_5_revenue_pct > 50:
-            st.warning(f"⚠️ Top 5 customers: {top_5_revenue_pct:.1f}% - High risk")
+            recs.append("💡 Diversify customer base")
+        if metrics['customers_delta'] > 10:
+            recs.append("💡 Launch loyalty programs")
+
+        if recs:
+            for rec in recs:
+                st.info(rec)
         else:
-            st.info(f"ℹ️ Top 5 customers: {top_5_revenue_pct:.1f}% of revenue")
-    
-    st.markdown("#### 🎯 Recommendations")
-    
-    recs = []
-    if metrics['revenue_delta'] < 0:
-        recs.append("💡 Focus on customer retention campaigns")
-    if metrics['avg_order_value'] < aov_threshold:
-        recs.append("💡 Implement upselling strategies")
-    if top_5_revenue_pct > 50:
-        recs.append("💡 Diversify customer base")
-    if metrics['customers_delta'] > 10:
-        recs.append("💡 Launch loyalty programs")
-    
-    if recs:
-        for rec in recs:
-            st.info(rec)
-    else:
-        st.success("✅ All metrics performing well!")
+            st.success("✅ All metrics performing well!")
+
+
+def get_forecast_store():
+    """Forecasts written by the pipeline for this version; computed in-process if missing or stale."""
+    return derived('forecast_store',
+                   lambda: ForecastStore.load(dataset_version) or ForecastStore.from_frame(df, dataset_version))
+
+
+FORECAST_LABELS = {'total': 'Total', 'country': 'Country', 'category': 'Category', 'product_name': 'Product'}
+MODEL_LABELS = {'trend_seasonal': 'Trend + monthly seasonality (batch least squares)',
+                'seasonal_naive': 'Seasonal naive (same month last year)'}
+
+
+@st.fragment
+def forecast_panel():
+    """Precomputed forecasts of the total, countries, categories and top products."""
+    with profiled('forecast_panel'):
+        st.markdown("### 📈 REVENUE FORECASTING")
+        forecasts = get_forecast_store()
+
+        fs1, fs2 = st.columns(2)
+        with fs1:
+            dimension = st.selectbox("Series", list(FORECAST_LABELS), format_func=FORECAST_LABELS.get,
+                                     key="forecast_dimension")
+        with fs2:
+            keys = forecasts.keys(dimension)
+            # Con un único país filtrado se abre su serie
+            default = keys.index(selected_countries[0]) \
+                if dimension == 'country' and len(selected_countries) == 1 and selected_countries[0] in keys else 0
+            key = st.selectbox("Item", keys, index=default, key=f"forecast_key_{dimension}", disabled=len(keys) == 1)
+
+        series = forecasts.series(dimension, key)
+        hist = series[series['actual'].notna()]
+        fore = series[series['forecast'].notna()]
+        scores = forecasts.metrics(dimension, key)
+        chosen = scores[scores['selected']].iloc[0]
 
-# ML PREDICTIONS
-with adv_tab2:
-    st.markdown("### 📈 REVENUE FORECASTING")
-    
-    monthly_data = df_filtered.groupby(df_filtered['order_date'].dt.to_period('M'))['total_price'].sum().reset_index()
-    monthly_data['order_date'] = monthly_data['order_date'].dt.to_timestamp()
-    monthly_data['month_num'] = range(len(monthly_data))
-    
-    if len(monthly_data) >= 3:
-        z = np.polyfit(monthly_data['month_num'], monthly_data['total_price'], 2)
-        p = np.poly1d(z)
-        
-        future_months = 3
-        last_num = monthly_data['month_num'].max()
-        future_nums = range(last_num + 1, last_num + future_months + 1)
-        future_preds = [p(x) for x in future_nums]
-        
-        last_date = monthly_data['order_date'].max()
-        future_dates = [last_date + timedelta(days=30 * (i+1)) for i in range(future_months)]
-        
-        forecast_df = pd.DataFrame({
-            'date': list(monthly_data['order_date']) + future_dates,
-            'revenue': list(monthly_data['total_price']) + future_preds,
-            'type': ['Historical'] * len(monthly_data) + ['Forecast'] * future_months
-        })
-        
         fc1, fc2 = st.columns([2, 1])
-        
+
         with fc1:
-            fig_forecast = go.Figure()
-            
-            hist = forecast_df[forecast_df['type'] == 'Historical']
-            fig_forecast.add_trace(go.Scatter(
-                x=hist['date'], y=hist['revenue'],
-                mode='lines+markers', name='Historical',
-                line=dict(color='rgb(79, 195, 247)', width=3)
-            ))
-            
-            fore = forecast_df[forecast_df['type'] == 'Forecast']
-            fig_forecast.add_trace(go.Scatter(
-                x=fore['date'], y=fore['revenue'],
-                mode='lines+markers', name='Forecast',
-                line=dict(color='rgb(236, 64, 122)', width=3, dash='dash')
-            ))
-            
-            std_dev = monthly_data['total_price'].std()
-            fig_forecast.add_trace(go.Scatter(
-                x=fore['date'].tolist() + fore['date'].tolist()[::-1],
-                y=(fore['revenue'] + std_dev).tolist() + (fore['revenue'] - std_dev).tolist()[::-1],
-                fill='toself',
-                fillcolor='rgba(236, 64, 122, 0.2)',
-                line=dict(color='rgba(255,255,255,0)'),
-                name='Confidence Interval'
-            ))
-            
-            st.plotly_chart(style_fig(fig_forecast, "3-Month Forecast"), use_container_width=True)
-        
+            def build_forecast():
+                fig_forecast = go.Figure()
+                fig_forecast.add_trace(go.Scatter(
+                    x=hist['order_date'], y=hist['actual'],
+                    mode='lines+markers', name='Historical',
+                    line=dict(color='rgb(79, 195, 247)', width=3)
+                ))
+
+                # La previsión arranca en el último mes observado
+                x = [hist['order_date'].iloc[-1]] + fore['order_date'].tolist()
+                fig_forecast.add_trace(go.Scatter(
+                    x=x, y=[hist['actual'].iloc[-1]] + fore['forecast'].tolist(),
+                    mode='lines+markers', name='Forecast',
+                    line=dict(color='rgb(236, 64, 122)', width=3, dash='dash')
+                ))
+
+                fig_forecast.add_trace(go.Scatter(
+                    x=fore['order_date'].tolist() + fore['order_date'].tolist()[::-1],
+                    y=fore['upper'].tolist() + fore['lower'].tolist()[::-1],
+                    fill='toself',
+                    fillcolor='rgba(236, 64, 122, 0.2)',
+                    line=dict(color='rgba(255,255,255,0)'),
+                    name='95% Interval'
+                ))
+                return fig_forecast
+            plot_cached('forecast', series, build_forecast, f"{forecasts.horizon}-Month Forecast · {key}")
+
         with fc2:
             st.markdown("#### 🎯 Forecast")
-            for i, (date, pred) in enumerate(zip(future_dates, future_preds), 1):
-                delta = ((pred - monthly_data['total_price'].iloc[-1]) / monthly_data['total_price'].iloc[-1] * 100)
-                st.metric(f"Month +{i}", f"${pred:,.0f}", f"{delta:.1f}%")
-            
+            last = hist['actual'].iloc[-1]
+            for date, pred in zip(fore['order_date'], fore['forecast']):
+                delta = (pred - last) / last * 100 if last else 0.0
+                st.metric(date.strftime('%b %Y'), f"${pred:,.0f}", f"{delta:.1f}%")
+
             st.markdown("#### 📊 Model Info")
-            st.info(f"Method: Polynomial Regression\n\nData: {len(monthly_data)} months\n\nConfidence: ±${std_dev:,.0f}")
-    else:
-        st.warning("⚠️ Need at least 3 months of data")
+            backtest = (f"Backtest: {chosen['origins']} origins, MAE ${chosen['mae']:,.0f}, sMAPE {chosen['smape']:.1%}"
+                        if chosen['origins'] else "Backtest: history too short")
+            st.info(f"Method: {MODEL_LABELS[chosen['model']]}\n\nData: {len(hist)} months\n\n{backtest}")
 
-# YoY COMPARISON
-with adv_tab3:
-    st.markdown("### 📊 YEAR-OVER-YEAR ANALYSIS")
-    
-    years = sorted(df['order_date'].dt.year.unique())
-    
-    if len(years) >= 2:
-        yoy1, yoy2 = st.columns(2)
-        with yoy1:
-            year1 = st.selectbox("Compare Year", years[:-1], index=0)
-        with yoy2:
-            year2 = st.selectbox("With Year", [y for y in years if y > year1], index=0)
-        
-        df_y1 = df[df['order_date'].dt.year == year1]
-        df_y2 = df[df['order_date'].dt.year == year2]
-        
-        m_y1 = df_y1.groupby(df_y1['order_date'].dt.month)['total_price'].sum().reset_index()
-        m_y2 = df_y2.groupby(df_y2['order_date'].dt.month)['total_price'].sum().reset_index()
-        m_y1.columns = ['month', 'revenue']
-        m_y2.columns = ['month', 'revenue']
-        
-        months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        m_y1['month_name'] = m_y1['month'].apply(lambda x: months[x-1])
-        m_y2['month_name'] = m_y2['month'].apply(lambda x: months[x-1])
-        
-        fig_yoy = go.Figure()
-        fig_yoy.add_trace(go.Bar(
-            x=m_y1['month_name'], y=m_y1['revenue'], name=str(year1),
-            marker=dict(color='rgb(96, 165, 250)'),
-            text=[f"${v:,.0f}" for v in m_y1['revenue']], 
-            textposition='outside',
-            textfont=dict(color=get_text_color(), size=11, weight=600)
-        ))
-        fig_yoy.add_trace(go.Bar(
-            x=m_y2['month_name'], y=m_y2['revenue'], name=str(year2),
-            marker=dict(color='rgb(129, 140, 248)'),
-            text=[f"${v:,.0f}" for v in m_y2['revenue']], 
-            textposition='outside',
-            textfont=dict(color=get_text_color(), size=11, weight=600)
-        ))
-        
-        st.plotly_chart(style_fig(fig_yoy, f"{year1} vs {year2}"), use_container_width=True)
-        
-        st.markdown("#### 📈 YoY Metrics")
-        ym1, ym2, ym3, ym4 = st.columns(4)
-        
-        y1_rev = df_y1['total_price'].sum()
-        y2_rev = df_y2['total_price'].sum()
-        yoy_rev = ((y2_rev - y1_rev) / y1_rev * 100) if y1_rev > 0 else 0
-        
-        y1_ord = df_y1['order_id'].nunique()
-        y2_ord = df_y2['order_id'].nunique()
-        yoy_ord = ((y2_ord - y1_ord) / y1_ord * 100) if y1_ord > 0 else 0
-        
-        y1_cust = df_y1['customer_id'].nunique()
-        y2_cust = df_y2['customer_id'].nunique()
-        yoy_cust = ((y2_cust - y1_cust) / y1_cust * 100) if y1_cust > 0 else 0
-        
-        y1_aov = y1_rev / y1_ord if y1_ord > 0 else 0
-        y2_aov = y2_rev / y2_ord if y2_ord > 0 else 0
-        yoy_aov = ((y2_aov - y1_aov) / y1_aov * 100) if y1_aov > 0 else 0
-        
-        with ym1:
-            st.metric(f"Revenue {year2}", f"${y2_rev:,.0f}", f"{yoy_rev:+.1f}%")
-        with ym2:
-            st.metric(f"Orders {year2}", f"{y2_ord:,}", f"{yoy_ord:+.1f}%")
-        with ym3:
-            st.metric(f"Customers {year2}", f"{y2_cust:,}", f"{yoy_cust:+.1f}%")
-        with ym4:
-            st.metric(f"AOV {year2}", f"${y2_aov:.2f}", f"{yoy_aov:+.1f}%")
-    else:
-        st.info("ℹ️ Need data from at least 2 years")
-
-# PDF REPORT
-with adv_tab4:
-    st.markdown("### 📄 EXECUTIVE PDF REPORT")
-    
-    st.info("""
-    **📋 Report Contents:**
-    - Executive Summary with Key Metrics
-    - Performance Trends & Growth Analysis
-    - Top Customers & Products Tables
-    - Geographic Distribution
-    - Customer Segmentation (RFM)
-    - Smart Alerts & Recommendations
-    """)
-    
-    if st.button("📄 GENERATE REPORT", use_container_width=True, type="primary"):
-        with st.spinner("Generating report..."):
-            html = f"""
-            <html>
-            <head>
-                <style>
-                    body {{ font-family: Arial; margin: 40px; background: rgb(245, 245, 245); }}
-                    .header {{ background: linear-gradient(135deg, rgb(94, 53, 177), rgb(81, 45, 168)); color: white; padding: 30px; border-radius: 10px; text-align: center; }}
-                    .metric-card {{ background: white; padding: 20px; margin: 15px 0; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
-                    table {{ width: 100%; border-collapse: collapse; margin: 20px 0; background: white; }}
-                    th {{ background: rgb(94, 53, 177); color: white; padding: 12px; }}
-                    td {{ padding: 10px; border-bottom: 1px solid rgb(221, 221, 221); }}
-                    h2 {{ color: rgb(94, 53, 177); border-bottom: 2px solid rgb(79, 195, 247); padding-bottom: 10px; }}
-                </style>
-            </head>
-            <body>
-                <div class="header">
-                    <h1>📊 EXECUTIVE E-COMMERCE DASHBOARD</h1>
-                    <p>Period: {start_date.strftime('%B %d, %Y')} - {end_date.strftime('%B %d, %Y')}</p>
-                    <p>Generated: {datetime.now().strftime('%B %d, %Y at %H:%M')}</p>
-                </div>
-                
-                <h2>📈 Executive Summary</h2>
-                <div class="metric-card">
-                    <p><strong>Total Revenue:</strong> ${metrics['total_revenue']:,.0f} ({metrics['revenue_delta']:+.1f}%)</p>
-                    <p><strong>Total Orders:</strong> {metrics['total_orders']:,} ({metrics['orders_delta']:+.1f}%)</p>
-                    <p><strong>Unique Customers:</strong> {metrics['unique_customers']:,} ({metrics['customers_delta']:+.1f}%)</p>
-                </div>
-                
-                <h2>🏆 Top 10 Customers</h2>
-                <table>
-                    <tr><th>Customer ID</th><th>Revenue</th><th>Orders</th></tr>
-                    {''.join([f"<tr><td>{r['customer_id']}</td><td>${r['total_revenue']:,.0f}</td><td>{r['order_count']}</td></tr>" for _, r in top_customers.head(10).iterrows()])}
-                </table>
-                
-                <h2>📦 Top 10 Products</h2>
-                <table>
-                    <tr><th>Product</th><th>Revenue</th><th>Quantity</th></tr>
-                    {''.join([f"<tr><td>{r['product_name']}</td><td>${r['total_price']:,.0f}</td><td>{r['quantity']}</td></tr>" for _, r in top_prod.head(10).iterrows()])}
-                </table>
-                
-                <h2>🌍 Geographic Distribution</h2>
-                <table>
-                    <tr><th>Country</th><th>Revenue</th><th>Orders</th><th>Customers</th></tr>
-                    {''.join([f"<tr><td>{r['country']}</td><td>${r['revenue']:,.0f}</td><td>{r['orders']}</td><td>{r['customers']}</td></tr>" for _, r in country_analysis.head(10).iterrows()])}
-                </table>
-                
-                <div style="margin-top: 40px; text-align: center; color: rgb(102, 102, 102); border-top: 1px solid rgb(221, 221, 221); padding-top: 20px;">
-                    <p>Automated report - Executive E-commerce Dashboard</p>
-                    <p>© 2025 - Confidential Business Intelligence Report</p>
-                </div>
-            </body>
-            </html>
-            """
-            
-            st.download_button(
-                "📥 DOWNLOAD REPORT",
-                html,
-                file_name=f"report_{datetime.now().strftime('%Y%m%d_%H%M')}.html",
-                mime="text/html",
-                use_container_width=True
-            )
-            
-            st.success("✅ Report generated! Download above.")
-            st.info("💡 Open HTML in browser, then Print → Save as PDF")
+        with st.expander("🧪 Backtest metrics"):
+            st.dataframe(scores.drop(columns=['dimension', 'key']), use_container_width=True, hide_index=True)
+        st.caption("Forecasts are precomputed per data version from the full history (build_aggregates.py); "
+                   "date and segment filters do not apply.")
+
+
+def get_yoy_matrix():
+    """Year x month x country matrix written by the pipeline; built in-process if missing or stale."""
+    return derived('yoy_matrix', lambda: YoyMatrix.load(dataset_version) or YoyMatrix.from_frame(df, dataset_version))
+
+
+@st.fragment
+def yoy_panel():
+    """Year-over-year comparison sliced from the precomputed matrix; follows the sidebar country filter."""
+    with profiled('yoy_panel'):
+        st.markdown("### 📊 YEAR-OVER-YEAR ANALYSIS")
+
+        matrix = get_yoy_matrix()
+        years = matrix.years
+
+        if len(years) >= 2:
+            selected_years = sorted(st.multiselect("Years", years, default=years[-2:], key="yoy_years"))
+            if len(selected_years) < 2:
+                st.info("ℹ️ Select at least 2 years to compare")
+                return
+
+            monthly = matrix.monthly(selected_years, country_key)
+            totals = matrix.totals(selected_years, country_key)
+            # Solo los meses con ventas en alguno de los años elegidos
+            shown = monthly[monthly.groupby('month')['revenue'].transform('sum') > 0]
+
+            def build_yoy():
+                fig_yoy = go.Figure()
+                for i, (year, rows) in enumerate(shown.groupby('year')):
+                    fig_yoy.add_trace(go.Bar(
+                        x=rows['month_name'], y=rows['revenue'], name=str(year),
+                        marker=dict(color=colors[i % len(colors)]),
+                        text=[f"${v:,.0f}" for v in rows['revenue']],
+                        textposition='outside',
+                        textfont=dict(color=get_text_color(), size=11, weight=600)
+                    ))
+                return fig_yoy
+            plot_cached('yoy', shown, build_yoy, " vs ".join(map(str, selected_years)))
+
+            latest, previous = totals.iloc[-1], totals.iloc[-2]
+            st.markdown(f"#### 📈 YoY Metrics ({int(latest['year'])} vs {int(previous['year'])})")
+            ym1, ym2, ym3, ym4 = st.columns(4)
+
+            def change(column):
+                value = latest[f'{column}_yoy']
+                return None if pd.isna(value) else f"{value:+.1f}%"
+
+            with ym1:
+                st.metric(f"Revenue {int(latest['year'])}", f"${latest['revenue']:,.0f}", change('revenue'))
+            with ym2:
+                st.metric(f"Orders {int(latest['year'])}", f"{int(latest['orders']):,}", change('orders'))
+            with ym3:
+                st.metric(f"Customers {int(latest['year'])}", f"≈{int(latest['customers']):,}", change('customers'))
+            with ym4:
+                st.metric(f"AOV {int(latest['year'])}", f"${latest['aov']:.2f}", change('aov'))
+
+            if len(selected_years) > 2:
+                st.dataframe(totals.round(2), use_container_width=True, hide_index=True)
+            st.caption(f"≈ Customers are HyperLogLog estimates (±{matrix.customer_error():.1%} standard error); "
+                       f"revenue and orders are exact. Changes are vs. the previous selected year.")
+        else:
+            st.info("ℹ️ Need data from at least 2 years")
+
+
+def report_inputs(top_n):
+    """Aggregates behind the executive report (cached per filter signature by the getters)."""
+    return {
+        'period': f"{start_date.strftime('%B %d, %Y')} - {end_date.strftime('%B %d, %Y')}",
+        'metrics': metrics,
+        'monthly': get_monthly_revenue(),
+        'top_customers': get_top_customers(top_n)[0],
+        'top_products': get_top_products(top_n)[0],
+        'countries': get_country_analysis(),
+        'segments': segment_summary(get_rfm()),
+    }
+
+
+@st.fragment(run_every=0.5)
+def report_progress(future):
+    """Polls the report build; the whole app reruns once to show the downloads."""
+    if future.done():
+        st.rerun()
+    st.info("⏳ Generating report (HTML + PDF) in the background...")
+
+
+@st.fragment
+def report_panel(top_n):
+    """Executive report (HTML and PDF) built on a background worker and cached per filter signature."""
+    with profiled('report_panel'):
+        st.markdown("### 📄 EXECUTIVE PDF REPORT")
+
+        st.info("""
+        **📋 Report Contents:**
+        - Executive Summary with Key Metrics
+        - Performance Trends & Growth Analysis
+        - Top Customers & Products Tables
+        - Geographic Distribution
+        - Customer Segmentation (RFM)
+        - Smart Alerts & Recommendations
+        """)
+
+        # Un informe por (versión de datos, filtros, Top N): si ya existe se sirve al momento
+        report_key = (filter_signature, top_n)
+        future = report_engine.get(report_key)
+        if st.button("📄 GENERATE REPORT", use_container_width=True, type="primary"):
+            # Reintenta si el último intento falló; si no, devuelve el informe ya en curso o terminado
+            future = report_engine.submit(report_key, lambda: report_inputs(top_n))
+        if future is None:
+            return
+
+        if not future.done():
+            report_progress(future)
+            return
+        if future.exception() is not None:
+            # El error se muestra una vez y luego se olvida, para poder reintentar
+            st.error(f"Report failed: {future.exception()}")
+            report_engine.discard(report_key)
+            return
+
+        files = future.result()
+        stamp = datetime.now().strftime('%Y%m%d_%H%M')
+        rep1, rep2 = st.columns(2)
+        with rep1:
+            st.download_button("📥 DOWNLOAD PDF", files['pdf'], file_name=f"report_{stamp}.pdf",
+                               mime="application/pdf", use_container_width=True)
+        with rep2:
+            st.download_button("🌐 DOWNLOAD HTML", files['html'], file_name=f"report_{stamp}.html",
+                               mime="text/html", use_container_width=True)
+        st.success("✅ Report generated! Download above.")
+
+
+@st.fragment
+def dashboard_panels():
+    """
+    Display controls, tabs, export center and advanced features. Top N and the chart
+    theme live here, so changing them reruns only this fragment (not filtering or KPIs).
+    """
+    with profiled('dashboard_panels'):
+        ctl1, ctl2, _ = st.columns([1, 1, 2])
+        with ctl1:
+            top_n = st.slider("Top N Items", 5, 50, 10, 5, key='top_n')
+        with ctl2:
+            st.selectbox("Chart Theme", ["plotly_dark", "plotly_white", "seaborn", "ggplot2"], key='selected_theme')
+
+        # Pestañas con estado: solo se ejecuta el contenido de la pestaña abierta
+        tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 REVENUE", "👥 CUSTOMERS", "📦 PRODUCTS", "🌍 GEOGRAPHY", "🔬 ADVANCED"],
+                                               key="dashboard_tab", on_change="rerun")
+        with tab1:
+            if tab1.open:
+                revenue_tab()
+        with tab2:
+            if tab2.open:
+                customers_tab(top_n)
+        with tab3:
+            if tab3.open:
+                products_tab(top_n)
+        with tab4:
+            if tab4.open:
+                geography_tab()
+        with tab5:
+            if tab5.open:
+                advanced_tab(top_n)
+
+        export_center(top_n)
+
+        # Advanced Features
+        st.markdown("---")
+        st.markdown("## 🚀 ADVANCED FEATURES")
+
+        adv_tab1, adv_tab2, adv_tab3, adv_tab4 = st.tabs([
+            "🔔 SMART ALERTS", "📈 ML PREDICTIONS", "📊 YoY COMPARISON", "📄 PDF REPORT"
+        ], key="advanced_tab", on_change="rerun")
+        with adv_tab1:
+            if adv_tab1.open:
+                alerts_panel(top_n)
+        with adv_tab2:
+            if adv_tab2.open:
+                forecast_panel()
+        with adv_tab3:
+            if adv_tab3.open:
+                yoy_panel()
+        with adv_tab4:
+            if adv_tab4.open:
+                report_panel(top_n)
+
+
+dashboard_panels()
 
 # Footer
 st.markdown("---")
@@ -1231,10 +1595,30 @@ st.markdown(f"""
             <span style='background: rgba(16, 185, 129, 0.2); padding: 6px 14px; border-radius: 20px; font-size: 11px; color: rgb(110, 231, 183); font-weight: 600; border: 1px solid rgba(16, 185, 129, 0.3);'>📄 PDF Reports</span>
             <span style='background: rgba(236, 72, 153, 0.2); padding: 6px 14px; border-radius: 20px; font-size: 11px; color: rgb(244, 114, 182); font-weight: 600; border: 1px solid rgba(236, 72, 153, 0.3);'>💾 Save Configs</span>
         </div>
-        <p style='color: rgb(107, 114, 128); font-size: 11px; margin: 12px 0; font-weight: 500;'>📅 Last Updated: {datetime.now().strftime('%B %d, %Y - %H:%M')}</p>
+        <p style='color: rgb(107, 114, 128); font-size: 11px; margin: 12px 0; font-weight: 500;'>📅 Last Updated: {datetime.now().strftime('%B %d, %Y - %H:%M')} • 🔖 Data version: {dataset_version}</p>
         <div style='margin-top: 18px; padding-top: 18px; border-top: 1px solid rgb(55, 65, 81);'>
             <p style='color: rgb(156, 163, 175); font-size: 10px; margin: 0; font-weight: 500;'>💼 Data Analytics & Business Intelligence Portfolio</p>
             <p style='color: rgb(107, 114, 128); font-size: 9px; margin: 8px 0 0 0; font-weight: 400;'>🎯 RFM Segmentation • Pareto Analysis • Predictive Analytics • Interactive Visualizations</p>
         </div>
     </div>
 """, unsafe_allow_html=True)
+
+@st.fragment
+def profiling_panel():
+    """Latest section timings: a full run logs ``script``, a widget inside a fragment logs only that fragment."""
+    with st.expander("⏱️ PROFILING", expanded=False):
+        log = pd.DataFrame(st.session_state.get('profile_log', []))
+        if log.empty:
+            st.caption("No timings recorded yet")
+            return
+        st.button("🔄 Refresh", key="profiling_refresh")
+        summary = log.groupby('section')['ms'].agg(['count', 'median', 'max']).sort_values('median', ascending=False)
+        st.dataframe(summary, use_container_width=True)
+        cache_stats = figure_cache.stats()
+        st.caption(f"Figure cache: {cache_stats['entries']} specs, {cache_stats['bytes'] / 2**20:.1f} / "
+                   f"{cache_stats['max_bytes'] / 2**20:.0f} MiB, {cache_stats['hits']} hits, "
+                   f"{cache_stats['misses']} misses, {cache_stats['evictions']} evictions")
+        st.dataframe(log.iloc[::-1], use_container_width=True, hide_index=True)
+
+record_timing('script', time.perf_counter() - SCRIPT_START)
+profiling_panel()
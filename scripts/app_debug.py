@@ -4,12 +4,22 @@ Debug E-commerce Dashboard (Streamlit)
 Checks dataset and renders basic charts for troubleshooting.
 """
 
-import os
+import sys
+from pathlib import Path
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import subprocess
 
+# Project root on the path so src/ can be imported
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.load_dataset import load_dataset, dataset_exists, dataset_columns
+from src.data.versioning import data_version
+from src.visualization.binning import histogram_bins, histogram_figure
+
+# Columns used by the debug charts
+DEBUG_COLUMNS = ['country', 'order_date', 'customer_id', 'product_name', 'quantity', 'unit_price', 'total_price']
+
 # -----------------------
 # Page config
 # -----------------------
@@ -26,38 +36,44 @@ except subprocess.CalledProcessError:
     st.warning("⚠ Dataset may be missing required columns.")
 
 # -----------------------
-# Load dataset
+# Filter options (only country and order_date are read)
 # -----------------------
-dataset_parquet = "data/processed/ecommerce_dataset_10000_cleaned.parquet"
-dataset_csv = "data/processed/ecommerce_dataset_10000_cleaned.csv"
-
-df = None
-if os.path.exists(dataset_parquet):
-    df = pd.read_parquet(dataset_parquet)
-elif os.path.exists(dataset_csv):
-    df = pd.read_csv(dataset_csv)
+if not dataset_exists():
+    st.error("❌ No dataset found or dataset is empty.")
+    st.stop()
 
-if df is None or df.empty:
+options = load_dataset(columns=['country', 'order_date'])
+if options.empty:
     st.error("❌ No dataset found or dataset is empty.")
     st.stop()
 
-# Show first rows
-st.subheader("Dataset Preview")
-st.dataframe(df.head())
+st.caption(f"🔖 Data version: {data_version()}")
 
 # -----------------------
 # Sidebar Filters
 # -----------------------
 st.sidebar.header("Filters")
-countries = sorted(df['country'].dropna().unique())
+countries = sorted(options['country'].dropna().unique())
 selected_countries = st.sidebar.multiselect("Select Countries", countries, default=countries)
-df = df[df['country'].isin(selected_countries)]
 
-df['order_date'] = pd.to_datetime(df['order_date'])
-min_date = df['order_date'].min()
-max_date = df['order_date'].max()
+min_date = pd.to_datetime(options['order_date']).min()
+max_date = pd.to_datetime(options['order_date']).max()
 start_date, end_date = st.sidebar.date_input("Order Date Range", [min_date, max_date])
-df = df[(df['order_date'] >= pd.to_datetime(start_date)) & (df['order_date'] <= pd.to_datetime(end_date))]
+
+# -----------------------
+# Load dataset (filters pushed down to the Parquet reader)
+# -----------------------
+available = dataset_columns()
+df = load_dataset(
+    columns=[c for c in DEBUG_COLUMNS if c in available],
+    start_date=pd.to_datetime(start_date),
+    end_date=pd.to_datetime(end_date),
+    filters={'country': selected_countries}
+)
+
+# Show first rows
+st.subheader("Dataset Preview")
+st.dataframe(df.head())
 
 top_n = st.sidebar.slider("Top N", min_value=5, max_value=50, value=10, step=5)
 
@@ -78,7 +94,7 @@ def style_fig(fig):
 # -----------------------
 st.subheader("Revenue by Country")
 if 'country' in df.columns and 'total_price' in df.columns and not df.empty:
-    country_df = df.groupby('country')['total_price'].sum().reset_index()
+    country_df = df.groupby('country', observed=True)['total_price'].sum().reset_index()
     fig_country = px.bar(country_df, x='country', y='total_price', text_auto=True, title="Revenue by Country")
     st.plotly_chart(style_fig(fig_country), use_container_width=True)
 else:
@@ -123,7 +139,8 @@ else:
 # -----------------------
 st.subheader("Unit Price Distribution")
 if 'unit_price' in df.columns and not df.empty:
-    fig_price = px.histogram(df, x='unit_price', nbins=50, title="Unit Price Distribution")
+    # Bins calculados con NumPy: la figura lleva 50 barras, no todas las filas
+    fig_price = histogram_figure(histogram_bins(df['unit_price']), title="Unit Price Distribution")
     st.plotly_chart(style_fig(fig_price), use_container_width=True)
 else:
     st.warning("❌ Missing column 'unit_price' for Price Distribution chart.")
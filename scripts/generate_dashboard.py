@@ -5,22 +5,25 @@ Generates dashboard charts (PNG) from processed e-commerce dataset.
 
 import os
 import sys
+from pathlib import Path
 import pandas as pd
 import plotly.express as px
 
+# Project root on the path so src/ can be imported
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.load_dataset import load_dataset, dataset_exists, dataset_columns, default_dataset_path
+from src.visualization.binning import histogram_bins, histogram_figure
+
+# Columns used by the charts below
+CHART_COLUMNS = ['country', 'order_date', 'customer_id', 'product_name', 'quantity', 'unit_price', 'total_price']
+
 def main():
     try:
-        # Paths for processed dataset
-        dataset_csv = "data/processed/ecommerce_dataset_10000_cleaned.csv"
-        dataset_parquet = "data/processed/ecommerce_dataset_10000_cleaned.parquet"
-
-        # Load dataset
-        if os.path.exists(dataset_parquet):
-            df = pd.read_parquet(dataset_parquet)
-            print(f"✅ Loaded dataset from {dataset_parquet}")
-        elif os.path.exists(dataset_csv):
-            df = pd.read_csv(dataset_csv)
-            print(f"✅ Loaded dataset from {dataset_csv}")
+        # Load only the chart columns (single file, incremental/partitioned directory or CSV)
+        if dataset_exists():
+            available = dataset_columns()
+            df = load_dataset(columns=[c for c in CHART_COLUMNS if c in available])
+            print(f"✅ Loaded dataset from {default_dataset_path()}")
         else:
             print("❌ Processed dataset not found.")
             sys.exit(1)
@@ -38,7 +41,7 @@ def main():
         missing = has_columns(['country', 'total_price'])
         if not missing:
             fig_country = px.bar(
-                df.groupby('country')['total_price'].sum().reset_index(),
+                df.groupby('country', observed=True)['total_price'].sum().reset_index(),
                 x='country', y='total_price', title='Revenue by Country'
             )
             fig_country.write_image(os.path.join(figures_folder, "revenue_by_country.png"))
@@ -81,7 +84,8 @@ def main():
         # 5️⃣ Unit Price Distribution
         missing = has_columns(['unit_price'])
         if not missing:
-            fig_price = px.histogram(df, x='unit_price', nbins=50, title='Unit Price Distribution')
+            # Binned server-side: the figure carries 50 bars instead of every row
+            fig_price = histogram_figure(histogram_bins(df['unit_price']), title='Unit Price Distribution')
             fig_price.write_image(os.path.join(figures_folder, "unit_price_distribution.png"))
             print("✅ unit_price_distribution.png generated")
         else:
@@ -3,11 +3,16 @@
 Verify that the processed dataset contains all required columns
 """
 
-import pandas as pd
 import sys
 import os
+from pathlib import Path
 
-DATA_FILE = "data/processed/ecommerce_dataset_10000_cleaned.parquet"
+# Project root on the path so src/ can be imported
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.load_dataset import dataset_columns, default_dataset_path
+
+# Single file, incremental directory or year=/month= partitioned directory
+DATA_FILE = default_dataset_path()
 
 # Columns required by the dashboard
 REQUIRED_COLUMNS = [
@@ -25,15 +30,15 @@ if not os.path.exists(DATA_FILE):
     print(f"❌ Dataset not found: {DATA_FILE}")
     sys.exit(1)
 
-# Try reading the dataset
+# Try reading the dataset schema (no data is decoded)
 try:
-    df = pd.read_parquet(DATA_FILE)
+    columns = dataset_columns(DATA_FILE)
 except Exception as e:
     print(f"❌ Error loading dataset: {e}")
     sys.exit(1)
 
 # Check for missing columns
-missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+missing = [col for col in REQUIRED_COLUMNS if col not in columns]
 
 if missing:
     print(f"❌ Missing required columns: {missing}")
@@ -0,0 +1,388 @@
+# src/data/aggregates.py
+"""
+Materialized aggregate cube of the processed dataset.
+
+Grain: day x country x category x product. Additive measures (revenue,
+quantity, line count) are summed. Orders/customers are kept as mergeable
+distinct-count sketches: HyperLogLog at day x country grain and KMV at
+day x country x category grain (for category filters), next to a daily
+per-country prefix-sum series for range KPIs, heavy-hitter summaries
+for the Top-N panels and unit-price histograms / quantile summaries. The pipeline writes the cube
+with ``src/features/build_aggregates.py``; the dashboard rolls it up instead
+of grouping raw rows. ``FrameAggregates`` answers the same
+questions from raw rows for the filters the cube cannot express.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from src.data.sketches import (KMV_K, HLL_P, HH_CAPACITY, QUANTILE_K, kmv_table, kmv_count, kmv_error,
+                               hll_table, hll_count, hll_error, heavy_hitter_table, heavy_hitters,
+                               quantile_table, histogram_table, weighted_describe, quantile_error)
+from src.data.daily_series import DailySeries, build_daily_series
+
+AGGREGATES_DIR = "data/processed/aggregates"
+CUBE_META = "_cube.json"
+# Tablas del cubo -> fichero parquet en AGGREGATES_DIR
+CUBE_TABLES = {
+    'facts': "cube_facts.parquet",
+    'orders': "cube_orders.parquet",
+    'customers': "cube_customers.parquet",
+    'daily': "daily_series.parquet",
+    'hll_orders': "hll_orders.parquet",
+    'hll_customers': "hll_customers.parquet",
+    'hh_customers': "hh_customers.parquet",
+    'hh_products_revenue': "hh_products_revenue.parquet",
+    'hh_products_quantity': "hh_products_quantity.parquet",
+    'price_histogram': "price_histogram.parquet",
+    'price_quantiles': "price_quantiles.parquet",
+}
+
+# Dimensiones del cubo (y de los sketches de distintos)
+FACT_DIMENSIONS = ['order_day', 'country', 'category', 'product_name']
+SKETCH_DIMENSIONS = ['order_day', 'country', 'category']
+HLL_DIMENSIONS = ['order_day', 'country']
+# Columnas del dataset necesarias para construirlo
+CUBE_SOURCE_COLUMNS = ['order_date', 'country', 'category', 'product_name',
+                       'unit_price', 'total_price', 'quantity', 'order_id', 'customer_id']
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def build_cube(df, k=KMV_K, p=HLL_P, capacity=HH_CAPACITY, quantile_k=QUANTILE_K):
+    """
+    Build the cube tables (``CUBE_TABLES`` keys) from the cleaned rows, each sorted by day.
+    """
+    keys = pd.DataFrame({
+        'order_day': pd.to_datetime(df['order_date']).dt.normalize(),
+        'country': df['country'],
+        'category': df['category'],
+    })
+    facts = keys.assign(
+        product_name=df['product_name'],
+        revenue=df['total_price'],
+        quantity=df['quantity'].astype('int64'),
+    ).groupby(FACT_DIMENSIONS, observed=True, sort=True).agg(
+        revenue=('revenue', 'sum'),
+        quantity=('quantity', 'sum'),
+        lines=('revenue', 'size'),
+    ).reset_index()
+
+    return {
+        'facts': facts,
+        'orders': kmv_table(keys, df['order_id'].to_numpy(), k),
+        'customers': kmv_table(keys, df['customer_id'].to_numpy(), k),
+        'daily': build_daily_series(df),
+        'hll_orders': hll_table(keys[HLL_DIMENSIONS], df['order_id'].to_numpy(), p),
+        'hll_customers': hll_table(keys[HLL_DIMENSIONS], df['customer_id'].to_numpy(), p),
+        # orders: cada pedido cuenta una vez (en la celda de su primera línea), exacto sin filtro de categoría;
+        # cell_orders: pedidos distintos por celda, exacto con una sola categoría
+        'hh_customers': heavy_hitter_table(keys, df['customer_id'], {
+            'revenue': df['total_price'],
+            'orders': (~df['order_id'].duplicated()).astype('int64'),
+            'cell_orders': (~keys.assign(order_id=df['order_id']).duplicated()).astype('int64'),
+        }, 'revenue', capacity),
+        'hh_products_revenue': heavy_hitter_table(keys, df['product_name'], {
+            'revenue': df['total_price'], 'quantity': df['quantity'].astype('int64'),
+        }, 'revenue', capacity),
+        'hh_products_quantity': heavy_hitter_table(keys, df['product_name'], {
+            'quantity': df['quantity'].astype('int64'),
+        }, 'quantity', capacity),
+        'price_histogram': histogram_table(keys, df['unit_price'].to_numpy()),
+        'price_quantiles': quantile_table(keys, df['unit_price'].to_numpy(), quantile_k),
+    }
+
+
+def write_cube(tables, source_version, k=KMV_K, p=HLL_P, capacity=HH_CAPACITY, quantile_k=QUANTILE_K,
+               out_dir=AGGREGATES_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    for name, filename in CUBE_TABLES.items():
+        tables[name].to_parquet(os.path.join(out_dir, filename), index=False)
+    meta = {
+        "source_version": source_version,
+        "kmv_k": k,
+        "hll_p": p,
+        "hh_capacity": capacity,
+        "quantile_k": quantile_k,
+        "fact_rows": len(tables['facts']),
+        "built_at": datetime.now(timezone.utc).isoformat(),
+    }
+    # Metadatos al final: un cubo a medio escribir nunca se da por válido
+    with open(os.path.join(out_dir, CUBE_META), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def read_cube_meta(out_dir=AGGREGATES_DIR):
+    path = os.path.join(out_dir, CUBE_META)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class OlapCube:
+    """
+    Aggregate cube of one dataset version.
+
+    Args:
+        tables: ``{name: frame}`` produced by ``build_cube``.
+        k: KMV size the category-level sketches were built with.
+        p: HLL precision of the day x country sketches.
+        capacity: Items kept per cell by the heavy-hitter summaries.
+        quantile_k: Values kept per cell by the unit-price quantile summaries.
+        source_version: ``data_version()`` of the dataset the cube was built from.
+    """
+
+    def __init__(self, tables, k=KMV_K, p=HLL_P, capacity=HH_CAPACITY, quantile_k=QUANTILE_K,
+                 source_version=None):
+        self.tables = tables
+        self.facts = tables['facts']
+        self.series = DailySeries(tables['daily'])
+        self.k = k
+        self.p = p
+        self.capacity = capacity
+        self.quantile_k = quantile_k
+        self.source_version = source_version
+
+    @classmethod
+    def load(cls, version, out_dir=AGGREGATES_DIR):
+        """
+        Cube written by the pipeline for ``version``, or None if missing or stale.
+        """
+        meta = read_cube_meta(out_dir)
+        if not meta or meta.get("source_version") != version:
+            return None
+        paths = {name: os.path.join(out_dir, filename) for name, filename in CUBE_TABLES.items()}
+        if not all(os.path.exists(path) for path in paths.values()):
+            return None
+        tables = {name: pd.read_parquet(path) for name, path in paths.items()}
+        return cls(tables, k=meta.get("kmv_k", KMV_K), p=meta.get("hll_p", HLL_P),
+                   capacity=meta.get("hh_capacity", HH_CAPACITY),
+                   quantile_k=meta.get("quantile_k", QUANTILE_K), source_version=version)
+
+    @classmethod
+    def from_frame(cls, df, version=None, k=KMV_K, p=HLL_P, capacity=HH_CAPACITY, quantile_k=QUANTILE_K):
+        return cls(build_cube(df, k, p, capacity, quantile_k), k=k, p=p, capacity=capacity,
+                   quantile_k=quantile_k, source_version=version)
+
+    def slice(self, start=None, end=None, countries=None, categories=None):
+        """
+        ``CubeSlice`` for days in ``[start, end]`` (inclusive) and the given countries/categories (None = all).
+        """
+        return CubeSlice(self, start, end, countries, categories)
+
+    def period(self, start=None, end=None, countries=None):
+        """
+        ``SeriesPeriod`` for KPIs of ``[start, end]`` without category filter.
+        """
+        return SeriesPeriod(self, start, end, countries)
+
+    def distinct(self, column, start=None, end=None, countries=None, categories=None):
+        """
+        Approximate distinct ``orders``/``customers``: union of the day x country HLL
+        sketches, or of the KMV sketches when filtering by category.
+        """
+        if categories is None:
+            rows = _select(self.tables[f'hll_{column}'], start, end, countries)
+            return hll_count(rows['register'].to_numpy(), rows['rho'].to_numpy(), self.p)
+        rows = _select(self.tables[column], start, end, countries, categories)
+        return kmv_count(rows['hash'].to_numpy(), rows['tau'].to_numpy())
+
+    def top(self, summary, n, start=None, end=None, countries=None, categories=None):
+        """
+        Top ``n`` items of the ``hh_<summary>`` heavy-hitter table for the filters.
+
+        Returns ``(top, max_error, guaranteed)`` (see ``sketches.heavy_hitters``), or
+        None when ``n`` exceeds the items tracked per cell and an exact count is needed.
+        Customer order counts are only exact without a category filter or with a
+        single category (an order can span categories), so several categories also return None.
+        """
+        if n > self.capacity:
+            return None
+        table = self.tables[f'hh_{summary}']
+        per_cell = 'cell_orders' in table.columns
+        if per_cell and categories is not None and len(categories) > 1:
+            return None
+        rank_by = 'quantity' if summary.endswith('quantity') else 'revenue'
+        rows = _select(table, start, end, countries, categories)
+        top, max_error, guaranteed = heavy_hitters(rows, SKETCH_DIMENSIONS, rank_by, n)
+        if per_cell:
+            top = top.drop(columns='cell_orders') if categories is None else \
+                top.drop(columns='orders').rename(columns={'cell_orders': 'orders'})
+        return top, max_error, guaranteed
+
+    def price_values(self, exact=True, start=None, end=None, countries=None, categories=None):
+        """
+        ``(values, weights)`` of unit_price for the filters: merged price histograms
+        (exact counts), or quantile summaries when ``exact`` is False.
+        """
+        rows = _select(self.tables['price_histogram' if exact else 'price_quantiles'],
+                       start, end, countries, categories)
+        return rows['value'].to_numpy(), rows['weight'].to_numpy()
+
+    def price_stats(self, exact=True, start=None, end=None, countries=None, categories=None):
+        """
+        ``describe()`` of unit_price for the filters. Count, mean, std, min and max
+        always come from the price histograms (exact); with ``exact`` False the
+        quartiles are read from the merged quantile summaries (within ``price_error()`` rank).
+        """
+        histogram = self.price_values(True, start, end, countries, categories)
+        summary = None if exact else self.price_values(False, start, end, countries, categories)
+        return weighted_describe(*histogram, quantiles=summary)
+
+    def price_error(self):
+        """
+        Normalized rank error bound of the approximate ``price_stats`` quartiles.
+        """
+        return quantile_error(self.quantile_k)
+
+    def distinct_error(self, categories=None):
+        """
+        Relative standard error of ``distinct`` for the given filter.
+        """
+        return hll_error(self.p) if categories is None else kmv_error(self.k)
+
+
+def _select(table, start, end, countries=None, categories=None):
+    days = table['order_day'].to_numpy()
+    lo = 0 if start is None else np.searchsorted(days, pd.Timestamp(start).normalize().to_datetime64(), "left")
+    hi = len(days) if end is None else np.searchsorted(days, pd.Timestamp(end).normalize().to_datetime64(), "right")
+    table = table.iloc[lo:hi]
+    if countries is not None:
+        table = table[table['country'].isin(list(countries))]
+    if categories is not None:
+        table = table[table['category'].isin(list(categories))]
+    return table
+
+
+class CubeSlice:
+    """
+    Rollups of a filtered part of the cube. Same interface as ``FrameAggregates``.
+    """
+
+    def __init__(self, cube, start=None, end=None, countries=None, categories=None):
+        self.cube = cube
+        self.start, self.end, self.countries, self.categories = start, end, countries, categories
+        self.facts = _select(cube.facts, start, end, countries, categories)
+
+    @property
+    def empty(self):
+        return self.facts.empty
+
+    def date_span(self):
+        return self.facts['order_day'].min(), self.facts['order_day'].max()
+
+    def _distinct(self, column, countries):
+        return self.cube.distinct(column, self.start, self.end, countries, self.categories)
+
+    def totals(self):
+        return {
+            'revenue': self.facts['revenue'].sum(),
+            'quantity': int(self.facts['quantity'].sum()),
+            'orders': self._distinct('orders', self.countries),
+            'customers': self._distinct('customers', self.countries),
+        }
+
+    def daily_revenue(self):
+        return self.facts.groupby('order_day')['revenue'].sum().rename_axis('order_date')
+
+    def monthly_revenue(self):
+        monthly = self.facts.groupby(self.facts['order_day'].dt.to_period('M'))['revenue'].sum()
+        return pd.DataFrame({'order_date': monthly.index.to_timestamp(), 'total_price': monthly.to_numpy()})
+
+    def dow_revenue(self):
+        daily = self.facts.groupby('order_day')['revenue'].sum()
+        return daily.groupby(daily.index.day_name()).sum().reindex(DAY_NAMES)
+
+    def product_summary(self):
+        return self.facts.groupby('product_name', observed=True).agg(
+            total_price=('revenue', 'sum'), quantity=('quantity', 'sum')
+        ).reset_index()
+
+    def top(self, summary, n):
+        return self.cube.top(summary, n, self.start, self.end, self.countries, self.categories)
+
+    def price_stats(self, exact=True):
+        return self.cube.price_stats(exact, self.start, self.end, self.countries, self.categories)
+
+    def country_summary(self):
+        summary = self.facts.groupby('country', observed=True)['revenue'].sum().rename('revenue').reset_index()
+        summary['orders'] = [self._distinct('orders', [c]) for c in summary['country']]
+        summary['customers'] = [self._distinct('customers', [c]) for c in summary['country']]
+        return summary.sort_values('revenue', ascending=False)
+
+
+class SeriesPeriod:
+    """
+    KPI totals of a date range: revenue and quantity from the prefix-sum
+    series, distinct orders and customers from the HLL sketches.
+    """
+
+    def __init__(self, cube, start, end, countries=None):
+        self.cube = cube
+        self.start, self.end, self.countries = start, end, countries
+
+    def date_span(self):
+        return self.cube.series.span(self.start, self.end, self.countries)
+
+    def totals(self):
+        totals = self.cube.series.totals(self.start, self.end, self.countries)
+        totals['orders'] = self.cube.distinct('orders', self.start, self.end, self.countries)
+        totals['customers'] = self.cube.distinct('customers', self.start, self.end, self.countries)
+        return totals
+
+
+class FrameAggregates:
+    """
+    The ``CubeSlice`` rollups computed from raw rows: exact distinct counts, and
+    the filters the cube has no dimension for.
+    """
+
+    def __init__(self, df):
+        self.df = df
+
+    @property
+    def empty(self):
+        return self.df.empty
+
+    def date_span(self):
+        return self.df['order_date'].min(), self.df['order_date'].max()
+
+    def totals(self):
+        return {
+            'revenue': self.df['total_price'].sum(),
+            'quantity': int(self.df['quantity'].sum()),
+            'orders': self.df['order_id'].nunique(),
+            'customers': self.df['customer_id'].nunique(),
+        }
+
+    def daily_revenue(self):
+        return self.df.groupby(self.df['order_date'].dt.normalize())['total_price'].sum().rename('revenue')
+
+    def monthly_revenue(self):
+        monthly = self.df.groupby(self.df['order_date'].dt.to_period('M'))['total_price'].sum().reset_index()
+        monthly['order_date'] = monthly['order_date'].dt.to_timestamp()
+        return monthly
+
+    def dow_revenue(self):
+        return self.df.groupby(self.df['order_date'].dt.day_name())['total_price'].sum().reindex(DAY_NAMES)
+
+    def product_summary(self):
+        return self.df.groupby('product_name').agg({'total_price': 'sum', 'quantity': 'sum'}).reset_index()
+
+    def price_stats(self, exact=True):
+        return self.df['unit_price'].astype('float64').describe()
+
+    def country_summary(self):
+        summary = self.df.groupby('country', observed=True).agg({
+            'total_price': 'sum', 'order_id': 'nunique', 'customer_id': 'nunique'
+        }).reset_index()
+        summary.columns = ['country', 'revenue', 'orders', 'customers']
+        return summary.sort_values('revenue', ascending=False)
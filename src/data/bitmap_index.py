@@ -0,0 +1,95 @@
+# src/data/bitmap_index.py
+"""
+Bitmap indexes for the low-cardinality columns of the dashboard frame.
+
+Each distinct value gets a bitmap with one bit per row, packed 8 rows per byte
+(``np.packbits``), so a 10M-row column with 10 values costs ~12 MB instead of
+the 100 MB of boolean masks. Filters combine bitmaps with bitwise AND/OR and
+only the bytes covering the requested row range are touched before the
+matching row positions are materialized.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Columnas indexadas por defecto (cardinalidad baja en el dataset limpio)
+BITMAP_COLUMNS = ['country', 'category', 'payment_method', 'order_status', 'rating']
+
+
+class BitmapIndex:
+    """
+    Packed bitmaps ``{column: {value: uint8 array}}`` built once per dataset version.
+
+    Args:
+        df: Frame to index (row order must not change afterwards).
+        columns: Columns to index; missing columns are skipped. NA values get no bitmap.
+    """
+
+    def __init__(self, df, columns=BITMAP_COLUMNS):
+        self.n_rows = len(df)
+        self._bitmaps = {}
+        for column in columns:
+            if column not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[column], sort=True)
+            self._bitmaps[column] = {
+                _plain(value): np.packbits(codes == code)
+                for code, value in enumerate(uniques)
+            }
+
+    @property
+    def columns(self):
+        return list(self._bitmaps)
+
+    def values(self, column):
+        """
+        Indexed values of ``column`` (sorted).
+        """
+        return list(self._bitmaps.get(column, {}))
+
+    def nbytes(self):
+        return sum(b.nbytes for bitmaps in self._bitmaps.values() for b in bitmaps.values())
+
+    def bitmap(self, column, values, byte_lo=0, byte_hi=None):
+        """
+        OR of the bitmaps of ``values`` in ``column``, restricted to bytes ``[byte_lo, byte_hi)``.
+        """
+        bitmaps = self._bitmaps[column]
+        byte_hi = len(next(iter(bitmaps.values()), b"")) if byte_hi is None else byte_hi
+        result = np.zeros(max(byte_hi - byte_lo, 0), dtype=np.uint8)
+        for value in values:
+            packed = bitmaps.get(_plain(value))
+            if packed is not None:
+                np.bitwise_or(result, packed[byte_lo:byte_hi], out=result)
+        return result
+
+    def query(self, filters, lo=0, hi=None):
+        """
+        Sorted row positions in ``[lo, hi)`` matching ``filters``.
+
+        ``filters`` is ``{column: [values]}`` (OR inside a column, AND across columns)
+        or a list of such dicts, which are OR-ed together, e.g.
+        ``[{"country": ["Spain"], "rating": [5]}, {"order_status": ["Returned"]}]``.
+        """
+        hi = self.n_rows if hi is None else hi
+        if hi <= lo:
+            return np.empty(0, dtype=np.int64)
+        byte_lo, byte_hi = lo // 8, (hi + 7) // 8
+
+        clauses = [filters] if isinstance(filters, dict) else list(filters)
+        combined = None
+        for clause in clauses:
+            packed = np.full(byte_hi - byte_lo, 0xFF, dtype=np.uint8)
+            for column, values in clause.items():
+                np.bitwise_and(packed, self.bitmap(column, values, byte_lo, byte_hi), out=packed)
+            combined = packed if combined is None else np.bitwise_or(combined, packed, out=combined)
+
+        # Sólo se desempaqueta el rango pedido
+        offset = lo - byte_lo * 8
+        bits = np.unpackbits(combined)[offset:offset + (hi - lo)]
+        return np.flatnonzero(bits) + lo
+
+
+def _plain(value):
+    # Claves nativas de Python: 5 (int) y np.int8(5) deben encontrar el mismo bitmap
+    return value.item() if isinstance(value, np.generic) else value
@@ -0,0 +1,89 @@
+# src/data/daily_series.py
+"""
+Daily revenue / quantity / order series per country with prefix sums.
+
+The series covers every calendar day between the first and last order, so a
+day maps to an array offset by date arithmetic. With cumulative sums per
+country, the total of any ``[start, end]`` range is ``cum[hi] - cum[lo]``:
+two lookups per selected country, independent of the number of rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+SERIES_MEASURES = ['revenue', 'quantity', 'orders', 'lines']
+
+
+def build_daily_series(df):
+    """
+    ``order_day x country`` table of revenue, quantity, distinct orders and lines.
+
+    Orders are counted per day and country, so they stay additive across days
+    as long as an order has a single date and country.
+    """
+    keys = [pd.to_datetime(df['order_date']).dt.normalize().rename('order_day'), df['country']]
+    return df.groupby(keys, observed=True, sort=True).agg(
+        revenue=('total_price', 'sum'),
+        quantity=('quantity', 'sum'),
+        orders=('order_id', 'nunique'),
+        lines=('total_price', 'size'),
+    ).reset_index()
+
+
+class DailySeries:
+    """
+    Prefix sums ``cum[measure][country, day]`` (shape ``countries x (days + 1)``).
+
+    Args:
+        daily: Table from ``build_daily_series``.
+    """
+
+    def __init__(self, daily):
+        self.day0 = pd.Timestamp(daily['order_day'].min()) if len(daily) else pd.Timestamp(0)
+        self.n_days = (pd.Timestamp(daily['order_day'].max()) - self.day0).days + 1 if len(daily) else 0
+        self.countries = sorted(daily['country'].dropna().unique().tolist())
+        self._rows = {country: i for i, country in enumerate(self.countries)}
+
+        day_idx = ((daily['order_day'] - self.day0).dt.days).to_numpy()
+        country_idx = daily['country'].map(self._rows).to_numpy(dtype=np.int64)
+        self.cum = {}
+        for measure in SERIES_MEASURES:
+            grid = np.zeros((len(self.countries), self.n_days + 1))
+            grid[country_idx, day_idx + 1] = daily[measure].to_numpy(dtype=np.float64)
+            self.cum[measure] = np.cumsum(grid, axis=1)
+
+    def _bounds(self, start=None, end=None):
+        # Offsets [lo, hi) en el calendario diario, recortados al rango de datos
+        lo = 0 if start is None else (pd.Timestamp(start).normalize() - self.day0).days
+        hi = self.n_days if end is None else (pd.Timestamp(end).normalize() - self.day0).days + 1
+        lo, hi = min(max(lo, 0), self.n_days), min(max(hi, 0), self.n_days)
+        return lo, max(lo, hi)
+
+    def _select(self, countries):
+        if countries is None:
+            return slice(None)
+        return [self._rows[c] for c in countries if c in self._rows]
+
+    def totals(self, start=None, end=None, countries=None):
+        """
+        ``{measure: total}`` for days in ``[start, end]`` and ``countries`` (None = all).
+        """
+        lo, hi = self._bounds(start, end)
+        rows = self._select(countries)
+        totals = {measure: cum[rows, hi].sum() - cum[rows, lo].sum() for measure, cum in self.cum.items()}
+        for measure in ('quantity', 'orders', 'lines'):
+            totals[measure] = int(round(totals[measure]))
+        return totals
+
+    def span(self, start=None, end=None, countries=None):
+        """
+        First and last day with orders inside ``[start, end]``, or ``(None, None)``.
+        """
+        lo, hi = self._bounds(start, end)
+        lines = self.cum['lines'][self._select(countries)].sum(axis=0)
+        if lines[hi] == lines[lo]:
+            return None, None
+        # Primer día cuyo acumulado sube, último día antes de alcanzar el total del rango
+        first = int(np.searchsorted(lines, lines[lo], side='right')) - 1
+        last = int(np.searchsorted(lines, lines[hi], side='left')) - 1
+        return self.day0 + pd.Timedelta(days=first), self.day0 + pd.Timedelta(days=last)
@@ -0,0 +1,184 @@
+# src/data/export.py
+"""
+Streaming exports of dashboard frames.
+
+``write_export`` writes a frame to a binary file object in chunks of
+``EXPORT_CHUNK_ROWS`` rows, so no full-size string copy of the data is built:
+CSV (plain or gzip) is encoded chunk by chunk, Parquet (zstd) gets one row
+group per chunk and Arrow IPC one record batch per chunk. ``export_bytes``
+does it in memory for small tables; ``ExportJob`` runs it on a worker thread
+into a temporary file and reports progress, for large exports.
+"""
+
+import gzip
+import io
+import os
+import tempfile
+import threading
+import weakref
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+EXPORT_CHUNK_ROWS = 65_536
+# A partir de este número de filas la exportación se hace en segundo plano
+BACKGROUND_ROWS = 250_000
+
+# Formato -> (etiqueta, extensión, tipo MIME)
+EXPORT_FORMATS = {
+    'csv': ('CSV', 'csv', 'text/csv'),
+    'csv.gz': ('CSV (gzip)', 'csv.gz', 'application/gzip'),
+    'parquet': ('Parquet (zstd)', 'parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('Arrow IPC', 'arrow', 'application/vnd.apache.arrow.file'),
+}
+
+
+def iter_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Consecutive row slices of ``df`` (views, no copy); an empty frame yields itself once.
+    """
+    if df.empty:
+        yield df
+        return
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def write_export(df, fmt, sink, chunk_rows=EXPORT_CHUNK_ROWS, progress=None):
+    """
+    Write ``df`` (without index) to the binary file object ``sink`` in ``fmt``.
+
+    Args:
+        df: Frame to export.
+        fmt: Key of ``EXPORT_FORMATS``.
+        sink: Writable binary file object; left open.
+        chunk_rows: Rows encoded per chunk.
+        progress: Optional ``progress(rows_written, total_rows)`` called after each chunk.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt!r}")
+    total = len(df)
+    done = 0
+
+    def advance(chunk):
+        nonlocal done
+        done += len(chunk)
+        if progress is not None:
+            progress(done, total)
+
+    if fmt in ('csv', 'csv.gz'):
+        out = gzip.GzipFile(fileobj=sink, mode='wb') if fmt == 'csv.gz' else sink
+        try:
+            for i, chunk in enumerate(iter_chunks(df, chunk_rows)):
+                out.write(chunk.to_csv(index=False, header=i == 0).encode('utf-8'))
+                advance(chunk)
+        finally:
+            if out is not sink:
+                out.close()
+        return
+
+    # Esquema fijado por el frame completo para que todos los bloques coincidan
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    writer = pq.ParquetWriter(sink, schema, compression='zstd') if fmt == 'parquet' \
+        else pa.ipc.new_file(sink, schema)
+    try:
+        for chunk in iter_chunks(df, chunk_rows):
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            if fmt == 'parquet':
+                writer.write_table(table)
+            else:
+                writer.write_table(table, max_chunksize=chunk_rows)
+            advance(chunk)
+    finally:
+        writer.close()
+
+
+def export_bytes(df, fmt, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    ``df`` exported in ``fmt`` as bytes.
+    """
+    buffer = io.BytesIO()
+    write_export(df, fmt, buffer, chunk_rows)
+    return buffer.getvalue()
+
+
+def export_file_name(stem, fmt, stamp):
+    return f"{stem}_{stamp}.{EXPORT_FORMATS[fmt][1]}"
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def _remove(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class ExportJob:
+    """
+    Export of ``df`` running on a daemon thread into a temporary file.
+
+    The file is deleted by ``discard`` or when the job is garbage collected
+    (e.g. with the session that started it).
+
+    Args:
+        df: Frame to export (read-only for the duration of the job).
+        fmt: Key of ``EXPORT_FORMATS``.
+        key: Anything identifying the request (e.g. filters and format), used by
+            the caller to tell whether the job still matches the current view.
+    """
+
+    def __init__(self, df, fmt, key=None, chunk_rows=EXPORT_CHUNK_ROWS):
+        self.fmt = fmt
+        self.key = key
+        self.total = len(df)
+        self.rows_written = 0
+        self.error = None
+        fd, self.path = tempfile.mkstemp(suffix=f".{EXPORT_FORMATS[fmt][1]}")
+        os.close(fd)
+        self._finalizer = weakref.finalize(self, _remove, self.path)
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(df, chunk_rows), daemon=True,
+                                        name=f"export-{fmt}")
+        self._thread.start()
+
+    def _run(self, df, chunk_rows):
+        try:
+            with open(self.path, 'wb') as f:
+                write_export(df, self.fmt, f, chunk_rows, self._advance)
+        except Exception as exc:  # se muestra en la UI en lugar de perderse en el hilo
+            self.error = exc
+
+    def _advance(self, rows_written, total):
+        self.rows_written = rows_written
+        if self._cancelled.is_set():
+            raise ExportCancelled()
+
+    @property
+    def done(self):
+        return not self._thread.is_alive()
+
+    @property
+    def progress(self):
+        if self.done:
+            return 1.0
+        return self.rows_written / self.total if self.total else 0.0
+
+    def read(self):
+        """
+        Contents of the finished export.
+        """
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def discard(self):
+        """
+        Stop the export at the next chunk and delete its file (idempotent).
+        """
+        self._cancelled.set()
+        self._thread.join()
+        self._finalizer()
@@ -0,0 +1,105 @@
+# src/data/filter_engine.py
+"""
+Date/country filtering over a frame sorted by ``order_date``.
+
+Date ranges are resolved with ``searchsorted`` into a contiguous ``[lo, hi)``
+row slice, so no full-length boolean mask is built. Countries are resolved
+through per-country row positions computed once: each position array is
+sliced to ``[lo, hi)`` with another binary search and only those rows are
+gathered. When every country is selected the result is a plain slice view.
+Filters on the other categorical columns go through a ``BitmapIndex`` limited
+to the same ``[lo, hi)`` range.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.data.bitmap_index import BitmapIndex, BITMAP_COLUMNS
+
+
+def sort_by_date(df, date_column="order_date"):
+    """
+    ``df`` sorted by ``date_column`` (stable), returned as-is when it already is.
+    """
+    if df[date_column].is_monotonic_increasing:
+        return df
+    return df.sort_values(date_column, kind="stable", ignore_index=True)
+
+
+class FilterEngine:
+    """
+    Read-only filter index over one dataset version.
+
+    Args:
+        df: Dashboard frame; sorted by ``date_column`` here if needed.
+        date_column: Datetime column used for range filters.
+        group_column: Low-cardinality column with precomputed row positions.
+        bitmap_columns: Columns indexed with bitmaps for ``filters``.
+    """
+
+    def __init__(self, df, date_column="order_date", group_column="country", bitmap_columns=BITMAP_COLUMNS):
+        self.df = sort_by_date(df, date_column)
+        self.date_column = date_column
+        self.group_column = group_column
+        self._dates = self.df[date_column].to_numpy()
+        index_dtype = np.int32 if len(self.df) < np.iinfo(np.int32).max else np.int64
+        self._positions = {
+            key: rows.astype(index_dtype)
+            for key, rows in self.df.groupby(group_column, observed=True, sort=True).indices.items()
+        }
+        self.bitmaps = BitmapIndex(self.df, bitmap_columns)
+
+    @property
+    def groups(self):
+        return list(self._positions)
+
+    def date_bounds(self, start=None, end=None, end_inclusive=True):
+        """
+        ``(lo, hi)`` row bounds of ``start <= date <= end`` (``< end`` if not ``end_inclusive``).
+        """
+        lo = 0 if start is None else int(np.searchsorted(self._dates, pd.Timestamp(start).to_datetime64(), "left"))
+        if end is None:
+            hi = len(self._dates)
+        else:
+            side = "right" if end_inclusive else "left"
+            hi = int(np.searchsorted(self._dates, pd.Timestamp(end).to_datetime64(), side))
+        return lo, max(lo, hi)
+
+    def positions(self, groups, lo=0, hi=None):
+        """
+        Sorted row positions of ``groups`` inside ``[lo, hi)``.
+        """
+        hi = len(self._dates) if hi is None else hi
+        parts = []
+        for key in groups:
+            rows = self._positions.get(key)
+            if rows is None:
+                continue
+            a, b = np.searchsorted(rows, [lo, hi])
+            if b > a:
+                parts.append(rows[a:b])
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        # Cada array ya está ordenado: concatenar + ordenar mantiene el orden por fecha
+        return parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts), kind="stable")
+
+    def covers_all(self, groups):
+        return groups is None or set(self._positions) <= set(groups)
+
+    def filter(self, start=None, end=None, groups=None, filters=None, end_inclusive=True):
+        """
+        Rows with ``start <= date <= end``, ``group_column`` in ``groups`` and
+        matching ``filters`` (``{column: [values]}``, see ``BitmapIndex.query``).
+
+        The date-only case (``groups`` is None or selects every value, no filters)
+        returns an ``iloc`` slice view; otherwise only the matching rows are gathered.
+        """
+        lo, hi = self.date_bounds(start, end, end_inclusive)
+        filters = {column: values for column, values in (filters or {}).items() if values is not None}
+        if filters:
+            if not self.covers_all(groups):
+                filters[self.group_column] = groups
+            return self.df.take(self.bitmaps.query(filters, lo, hi))
+        if self.covers_all(groups):
+            return self.df.iloc[lo:hi]
+        return self.df.take(self.positions(groups, lo, hi))
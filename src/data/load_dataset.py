@@ -1,10 +1,158 @@
+import os
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
 
-def load_dataset(path="data/processed/ecommerce_dataset_10000_cleaned.parquet"):
+PROCESSED_PARQUET = "data/processed/ecommerce_dataset_10000_cleaned.parquet"
+PROCESSED_DATASET_DIR = "data/processed/ecommerce_dataset_10000_cleaned"
+PROCESSED_CSV = "data/processed/ecommerce_dataset_10000_cleaned.csv"
+
+# Particiones Hive escritas por create_features.py --partition (mismos tipos que DTYPE_PLAN)
+PARTITIONING = ds.partitioning(pa.schema([("year", pa.int16()), ("month", pa.int8())]), flavor="hive")
+
+
+def default_dataset_path():
     """
-    Load the cleaned parquet dataset.
+    Incremental dataset directory if it exists, otherwise the single parquet file.
+
+    A single-file run of ``create_features.py`` removes the directory, so this is
+    always the output of the latest pipeline run.
+    """
+    return PROCESSED_DATASET_DIR if os.path.isdir(PROCESSED_DATASET_DIR) else PROCESSED_PARQUET
+
+
+def dataset_exists():
     """
-    df = pd.read_parquet(path)
+    True when there is processed data to load (parquet or the CSV fallback).
+    """
+    return os.path.exists(default_dataset_path()) or os.path.exists(PROCESSED_CSV)
+
+
+def dataset_source_path():
+    """
+    Path ``load_dataset()`` reads by default: the parquet output, or the CSV fallback.
+    """
+    path = default_dataset_path()
+    return path if os.path.exists(path) or not os.path.exists(PROCESSED_CSV) else PROCESSED_CSV
+
+
+def is_partitioned(path):
+    """
+    True when ``path`` is a directory laid out as ``year=YYYY/month=M``.
+    """
+    return os.path.isdir(path) and any(name.startswith("year=") for name in os.listdir(path))
+
+
+def open_dataset(path=None):
+    """
+    Open the processed data (single file, flat directory or partitioned directory) as a pyarrow dataset.
+    """
+    path = path or default_dataset_path()
+    if is_partitioned(path):
+        return ds.dataset(path, format="parquet", partitioning=PARTITIONING)
+    return ds.dataset(path, format="parquet")
+
+
+def dataset_columns(path=None):
+    """
+    Column names of the processed dataset, read from the schema (or CSV header) only.
+    """
+    if path is None and not os.path.exists(default_dataset_path()) and os.path.exists(PROCESSED_CSV):
+        return list(pd.read_csv(PROCESSED_CSV, nrows=0).columns)
+    return open_dataset(path).schema.names
+
+
+def date_range_filter(order_date_type, start_date=None, end_date=None, partitioned=False):
+    """
+    Build an ``order_date`` filter; on partitioned data it also bounds ``year``/``month``
+    so that only the overlapping partitions are opened.
+    """
+    expr = None
+
+    if start_date is not None:
+        start = pd.Timestamp(start_date)
+        expr = ds.field("order_date") >= pa.scalar(start, type=order_date_type)
+        if partitioned:
+            expr &= (ds.field("year") > start.year) | \
+                ((ds.field("year") == start.year) & (ds.field("month") >= start.month))
+
+    if end_date is not None:
+        end = pd.Timestamp(end_date)
+        end_expr = ds.field("order_date") <= pa.scalar(end, type=order_date_type)
+        if partitioned:
+            end_expr &= (ds.field("year") < end.year) | \
+                ((ds.field("year") == end.year) & (ds.field("month") <= end.month))
+        expr = end_expr if expr is None else expr & end_expr
+
+    return expr
+
+
+def _is_multi(value):
+    return isinstance(value, (list, tuple, set, frozenset, pd.Index))
+
+
+def value_filter(filters):
+    """
+    Translate ``{"country": "Spain", "category": ["Books", "Toys"]}`` into a pyarrow
+    expression: scalars become equality, lists/tuples/sets become ``isin``.
+    """
+    expr = None
+    for column, value in (filters or {}).items():
+        column_expr = ds.field(column).isin(list(value)) if _is_multi(value) else ds.field(column) == value
+        expr = column_expr if expr is None else expr & column_expr
+    return expr
+
+
+def _filter_frame(df, start_date=None, end_date=None, filters=None):
+    """
+    Same filters as the pushdown path, applied in pandas (CSV fallback).
+    """
+    mask = pd.Series(True, index=df.index)
+    if start_date is not None:
+        mask &= df["order_date"] >= pd.Timestamp(start_date)
+    if end_date is not None:
+        mask &= df["order_date"] <= pd.Timestamp(end_date)
+    for column, value in (filters or {}).items():
+        mask &= df[column].isin(list(value)) if _is_multi(value) else df[column] == value
+    return df[mask].reset_index(drop=True)
+
+
+def load_dataset(path=None, columns=None, start_date=None, end_date=None, filters=None):
+    """
+    Load the cleaned dataset (single parquet file, directory of parts or
+    ``year=/month=`` partitioned directory).
+
+    Args:
+        path: Dataset location; defaults to ``default_dataset_path()``.
+        columns: Columns to return; the other columns are never decoded.
+        start_date, end_date: Keep rows with ``start_date <= order_date <= end_date``.
+            On a partitioned dataset the partitions outside the range are not opened.
+        filters: Equality/``isin`` filters such as ``{"country": ["Spain", "Italy"],
+            "order_status": "Delivered"}``. They are pushed down to the Parquet
+            reader, so row groups whose statistics rule them out are skipped.
+
+    Without any parquet output it falls back to the processed CSV, filtered in pandas.
+    """
+    if path is None and not os.path.exists(default_dataset_path()) and os.path.exists(PROCESSED_CSV):
+        read_columns = None
+        if columns is not None:
+            needed = list(filters or {}) + (["order_date"] if start_date is not None or end_date is not None else [])
+            read_columns = list(dict.fromkeys(list(columns) + needed))
+        parse_dates = ["order_date"] if read_columns is None or "order_date" in read_columns else None
+        df = pd.read_csv(PROCESSED_CSV, usecols=read_columns, parse_dates=parse_dates)
+        df = _filter_frame(df, start_date, end_date, filters)
+        return df if columns is None else df[list(columns)]
+
+    path = path or default_dataset_path()
+    dataset = open_dataset(path)
+    row_filter = date_range_filter(dataset.schema.field("order_date").type, start_date, end_date,
+                                   partitioned=is_partitioned(path))
+    extra = value_filter(filters)
+    if extra is not None:
+        row_filter = extra if row_filter is None else row_filter & extra
+
+    table = dataset.to_table(columns=list(columns) if columns is not None else None, filter=row_filter)
+    df = table.to_pandas()
     return df
 
 if __name__ == "__main__":
@@ -0,0 +1,85 @@
+# src/data/prepared_cache.py
+"""
+Prepared-dataset cache stored as uncompressed Arrow IPC (Feather v2) files.
+
+The dashboard frame (projected columns + derived columns) is written once per
+source version to ``data/interim/prepared_<key>.arrow`` and memory-mapped on
+every later cold start. Numeric and datetime columns come back as zero-copy
+views over the mapping, so several worker processes share the same page-cache
+pages instead of each parsing Parquet into a private copy.
+"""
+
+import glob
+import hashlib
+import os
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from src.data.load_dataset import load_dataset, dataset_source_path
+from src.data.versioning import data_version
+
+CACHE_DIR = "data/interim"
+
+
+def cache_name(source, columns=None, prepare=None):
+    """
+    ``prepared_<source>_<variant>.arrow``: the source data version plus a hash of
+    the projected columns and of the prepare function's code.
+    """
+    variant = hashlib.sha256(repr(list(columns) if columns is not None else None).encode())
+    if prepare is not None:
+        code = prepare.__code__
+        variant.update(code.co_code)
+        variant.update(repr(code.co_consts).encode())
+    return f"prepared_{data_version(source)}_{variant.hexdigest()[:8]}.arrow"
+
+
+def write_prepared(df, path):
+    """
+    Write ``df`` as an uncompressed Arrow IPC file (temp file + rename, safe for concurrent readers).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    feather.write_feather(df, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+
+def read_prepared(path):
+    """
+    Memory-map an Arrow IPC file and convert it without consolidating blocks,
+    so primitive columns stay zero-copy views over the mapped file.
+    """
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def remove_stale(keep, cache_dir=CACHE_DIR):
+    """
+    Delete prepared files built from older source versions (processes still
+    mapping them keep their view until they remap).
+    """
+    source_prefix = os.path.basename(keep).split("_")[1]
+    for path in glob.glob(os.path.join(cache_dir, "prepared_*.arrow")):
+        if os.path.basename(path).split("_")[1] != source_prefix:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def load_prepared(prepare, columns=None, cache_dir=CACHE_DIR):
+    """
+    Return ``prepare(load_dataset(columns=columns))``, memory-mapped from the
+    Arrow IPC cache when the source data has not changed since it was written.
+    """
+    source = dataset_source_path()
+    path = os.path.join(cache_dir, cache_name(source, columns, prepare))
+    if not os.path.exists(path):
+        df = prepare(load_dataset(columns=columns))
+        try:
+            write_prepared(df, path)
+        except OSError:
+            return df  # Sin permisos de escritura: se usa el frame en memoria
+        remove_stale(path, cache_dir)
+    return read_prepared(path)
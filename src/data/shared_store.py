@@ -0,0 +1,162 @@
+# src/data/shared_store.py
+"""
+Process-wide, read-only dataset registry shared by every dashboard session.
+
+``st.cache_data`` pickles a frame and hands a deep copy to each caller, so
+memory grows with the number of connected analysts. The registry keeps one
+frame per data version and gives every session a ``Lease`` on the same
+object. Versions are reference counted: publishing a new version swaps it in
+atomically, and an old version is dropped once its last lease is released
+(explicitly, or when the owning session is garbage collected). Objects derived
+from a version (indexes, cubes, models) are attached to its entry with
+``derived`` and dropped together with it.
+"""
+
+import threading
+import weakref
+
+import numpy as np
+
+
+def freeze_frame(df):
+    """
+    Mark the numpy buffers behind ``df`` read-only so no session can modify the shared data in place.
+    """
+    for column in df.columns:
+        values = df[column].array
+        array = getattr(values, "_ndarray", None)
+        if array is None and isinstance(values, np.ndarray):
+            array = values
+        if isinstance(array, np.ndarray):
+            try:
+                array.flags.writeable = False
+            except ValueError:
+                pass  # Vista de un buffer que no es nuestro (p.ej. memoria mapeada): ya es de solo lectura
+    return df
+
+
+class Lease:
+    """
+    A session's reference to one dataset version; releasing it is idempotent.
+    """
+
+    def __init__(self, registry, version, frame):
+        self.version = version
+        self.frame = frame
+        self._registry = registry
+        self._finalizer = weakref.finalize(self, registry._release, version)
+
+    def release(self):
+        self._finalizer()
+
+    def derived(self, name, build):
+        """
+        Object ``name`` derived from this version (see ``DatasetRegistry.derived``).
+        """
+        if not self.active:
+            raise RuntimeError(f"Lease on dataset version {self.version!r} was released")
+        return self._registry.derived(self.version, name, build)
+
+    @property
+    def active(self):
+        return self._finalizer.alive
+
+    def __enter__(self):
+        return self.frame
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class DatasetRegistry:
+    """
+    Thread-safe registry of immutable dataset versions with reference counting.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._frames = {}
+        self._refs = {}
+        self._derived = {}
+        self._current = None
+
+    @property
+    def current_version(self):
+        return self._current
+
+    def publish(self, version, frame):
+        """
+        Register ``frame`` as ``version`` and make it current (atomic swap).
+        """
+        with self._lock:
+            if version not in self._frames:
+                self._frames[version] = freeze_frame(frame)
+                self._refs[version] = 0
+                self._derived[version] = {}
+            self._current = version
+            self._collect()
+
+    def lease(self, version, loader):
+        """
+        Lease ``version``, making it current; ``loader()`` runs only if no session loaded it yet.
+
+        Loading, publishing and acquiring happen under one lock, so concurrent
+        sessions never load the same version twice and a version cannot be
+        collected between being published and being leased.
+        """
+        with self._lock:
+            if version not in self._frames:
+                frame = loader()
+                if frame is None:
+                    return None
+                self.publish(version, frame)
+            elif self._current != version:
+                self._current = version
+                self._collect()
+            return self.acquire(version)
+
+    def acquire(self, version=None):
+        """
+        Lease ``version`` (default: the current one) for a session.
+        """
+        with self._lock:
+            version = self._current if version is None else version
+            if version not in self._frames:
+                raise KeyError(f"Dataset version {version!r} is not registered")
+            self._refs[version] += 1
+            return Lease(self, version, self._frames[version])
+
+    def derived(self, version, name, build):
+        """
+        ``build()`` result cached on the entry of ``version`` under ``name``.
+
+        It lives exactly as long as the version's frame: when the version is
+        collected its derived objects are dropped with it.
+        """
+        with self._lock:
+            if version not in self._frames:
+                raise KeyError(f"Dataset version {version!r} is not registered")
+            objects = self._derived[version]
+            if name not in objects:
+                objects[name] = build()
+            return objects[name]
+
+    def _release(self, version):
+        with self._lock:
+            if version in self._refs:
+                self._refs[version] -= 1
+                self._collect()
+
+    def _collect(self):
+        # Versiones antiguas sin sesiones activas
+        for version in [v for v, refs in self._refs.items() if refs <= 0 and v != self._current]:
+            del self._frames[version]
+            del self._refs[version]
+            del self._derived[version]
+
+    def stats(self):
+        """
+        ``{version: active leases}`` for the versions currently held in memory.
+        """
+        with self._lock:
+            return dict(self._refs)
@@ -0,0 +1,333 @@
+# src/data/sketches.py
+"""
+Mergeable distinct-count sketches for the aggregate tables.
+
+K-Minimum-Values (KMV): every id is hashed to 64 bits and each cell keeps only
+its ``k`` smallest distinct hashes. Cells with at most ``k`` distinct ids are
+stored exactly, so unions over them are exact; otherwise the union is
+estimated from the hashes below the smallest truncation threshold, with a
+relative standard error of about ``1 / sqrt(k - 2)``.
+
+HyperLogLog (HLL): ``2**p`` registers per cell keep the maximum leading-zero
+rank of the hashes routed to them; unions are register-wise maxima and the
+relative standard error is ``1.04 / sqrt(2**p)`` (1.6% for ``p = 12``) at any
+cardinality. Registers are stored sparsely, one row per non-empty register.
+
+Heavy hitters: each cell keeps its top items with exact weights and the
+largest weight it evicted, in the spirit of Space-Saving. Merged over a date
+range, every item gets a ``[lower, upper]`` weight interval and the Top-N is
+flagged as guaranteed when no unseen item could outrank it.
+
+Quantiles: each cell keeps at most ``k`` values of its sorted data, every one
+weighted by the block of ranks it stands for; merged summaries answer any
+quantile with a rank error below ``1 / k``. Discrete values (integer prices)
+can be stored as exact histograms instead.
+"""
+
+import numpy as np
+import pandas as pd
+
+KMV_K = 1024
+# Umbral de las celdas exactas (no truncadas)
+EXACT_TAU = np.iinfo(np.uint64).max
+
+
+def hash_values(values):
+    """
+    Stable 64-bit hashes of ``values`` (same id -> same hash in every process).
+    """
+    return pd.util.hash_pandas_object(pd.Series(values), index=False, categorize=True).to_numpy()
+
+
+def kmv_table(keys, ids, k=KMV_K):
+    """
+    Long-format KMV sketches: one row per ``(cell, hash)`` kept.
+
+    Args:
+        keys: Frame with the cell columns, aligned with ``ids``.
+        ids: Values to count (NA ids are ignored).
+        k: Hashes kept per cell.
+
+    Returns:
+        ``keys`` columns + ``hash`` + ``tau`` (largest kept hash of a truncated
+        cell, ``EXACT_TAU`` for cells stored exactly).
+    """
+    cells = list(keys.columns)
+    valid = pd.notna(np.asarray(ids))
+    table = keys[valid].reset_index(drop=True)
+    table["hash"] = hash_values(np.asarray(ids)[valid])
+    table = table.drop_duplicates().sort_values(cells + ["hash"], ignore_index=True)
+
+    grouped = table.groupby(cells, observed=True, sort=False)
+    rank = grouped.cumcount().to_numpy()
+    size = grouped["hash"].transform("size").to_numpy()
+    table = table[rank < k].reset_index(drop=True)
+    size = size[rank < k]
+
+    tau = table.groupby(cells, observed=True, sort=False)["hash"].transform("max").to_numpy()
+    table["tau"] = np.where(size > k, tau, EXACT_TAU).astype(np.uint64)
+    return table
+
+
+def kmv_count(hashes, taus):
+    """
+    Distinct count of the union of the KMV cells whose rows are ``hashes``/``taus``.
+
+    Exact when none of the cells was truncated.
+    """
+    if len(hashes) == 0:
+        return 0
+    tau = np.min(taus)
+    if tau == EXACT_TAU:
+        return int(len(np.unique(hashes)))
+    # Todos los hashes <= tau se conocen en cada celda: estimador KMV (m - 1) / tau
+    m = len(np.unique(hashes[hashes <= tau]))
+    return int(round((m - 1) / (float(tau) / 2.0 ** 64)))
+
+
+def kmv_error(k=KMV_K):
+    """
+    Relative standard error of a KMV estimate.
+    """
+    return 1.0 / np.sqrt(max(k - 2, 1))
+
+
+# -----------------------
+# HyperLogLog
+# -----------------------
+HLL_P = 12
+
+
+def hll_table(keys, ids, p=HLL_P):
+    """
+    Sparse HyperLogLog sketches: one row per ``(cell, register)`` with its maximum rank.
+
+    Args:
+        keys: Frame with the cell columns, aligned with ``ids``.
+        ids: Values to count (NA ids are ignored).
+        p: Precision; ``2**p`` registers per cell.
+
+    Returns:
+        ``keys`` columns + ``register`` (uint16) + ``rho`` (uint8), sorted by the cell columns.
+    """
+    cells = list(keys.columns)
+    valid = pd.notna(np.asarray(ids))
+    table = keys[valid].reset_index(drop=True)
+    hashes = hash_values(np.asarray(ids)[valid])
+    table["register"] = (hashes >> np.uint64(64 - p)).astype(np.uint16)
+    table["rho"] = _rho(hashes & np.uint64((1 << (64 - p)) - 1), 64 - p)
+    return table.groupby(cells + ["register"], observed=True, sort=True)["rho"].max().reset_index()
+
+
+def _rho(remainder, bits):
+    # Posición del primer bit a 1 (desde la izquierda) en los ``bits`` bajos; frexp es exacto hasta 2**53
+    _, exponent = np.frexp(remainder.astype(np.float64))
+    return np.where(remainder == 0, bits + 1, bits - exponent + 1).astype(np.uint8)
+
+
+def hll_count(registers, rhos, p=HLL_P):
+    """
+    Cardinality estimate of the union of the sparse HLL rows ``registers``/``rhos``.
+    """
+    dense = np.zeros(1 << p, dtype=np.uint8)
+    np.maximum.at(dense, np.asarray(registers, dtype=np.int64), np.asarray(rhos, dtype=np.uint8))
+    return int(hll_estimate(dense))
+
+
+def hll_estimate(dense):
+    """
+    Cardinality estimates of dense HLL sketches (registers on the last axis, one estimate per leading index).
+    """
+    m = dense.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.ldexp(1.0, -dense.astype(np.int64)), axis=-1)
+    zeros = np.count_nonzero(dense == 0, axis=-1)
+    # Linear counting en rango pequeño
+    linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.rint(np.where((estimate <= 2.5 * m) & (zeros > 0), linear, estimate)).astype(np.int64)
+
+
+def hll_error(p=HLL_P):
+    """
+    Relative standard error of an HLL estimate (1.04 / sqrt(2**p)).
+    """
+    return 1.04 / np.sqrt(1 << p)
+
+
+# -----------------------
+# Heavy hitters
+# -----------------------
+HH_CAPACITY = 32
+
+
+def heavy_hitter_table(keys, items, measures, rank_by, capacity=HH_CAPACITY):
+    """
+    Mergeable heavy-hitter summaries: the ``capacity`` largest items of each cell.
+
+    Every cell keeps the exact weights of its top items plus ``threshold``, the
+    weight of the largest item it dropped (0 when nothing was dropped), so an
+    item's weight in a cell is either stored or at most ``threshold``.
+
+    Args:
+        keys: Frame with the cell columns, aligned with ``items``.
+        items: Item ids (customer_id, product_name...).
+        measures: ``{name: values}`` summed per item; ``rank_by`` must be one of them.
+        capacity: Items kept per cell.
+    """
+    cells = list(keys.columns)
+    table = keys.assign(item=np.asarray(items), **{name: np.asarray(v) for name, v in measures.items()})
+    table = table[pd.notna(table['item'])]
+    table = table.groupby(cells + ['item'], observed=True, sort=False)[list(measures)].sum().reset_index()
+    table = table.sort_values(cells + [rank_by, 'item'], ascending=[True] * len(cells) + [False, True],
+                              ignore_index=True, kind='stable')
+
+    rank = table.groupby(cells, observed=True, sort=False).cumcount().to_numpy()
+    dropped = table.loc[rank == capacity, cells + [rank_by]].rename(columns={rank_by: 'threshold'})
+    kept = table[rank < capacity].merge(dropped, on=cells, how='left')
+    kept['threshold'] = kept['threshold'].fillna(0)
+    return kept
+
+
+def heavy_hitters(rows, cells, rank_by, n):
+    """
+    Top ``n`` items of the union of the summary ``rows`` (selected cells).
+
+    Returns:
+        ``(top, max_error, guaranteed)``: ``top`` has the summed measures (lower
+        bounds) plus ``upper``; every true weight lies in ``[rank_by, upper]``.
+        ``guaranteed`` is True when no item outside ``top`` can outrank it.
+    """
+    measures = [c for c in rows.columns if c not in cells + ['item', 'threshold']]
+    if rows.empty:
+        return pd.DataFrame(columns=['item'] + measures + ['upper']), 0.0, True
+
+    total_threshold = rows.drop_duplicates(cells)['threshold'].sum()
+    per_item = rows.groupby('item', observed=True, sort=True).agg(
+        **{m: (m, 'sum') for m in measures}, covered=('threshold', 'sum')
+    ).reset_index()
+    # Cota superior: peso visto + umbral de cada celda donde el item no está guardado
+    per_item['upper'] = per_item[rank_by] + total_threshold - per_item['covered']
+    per_item = per_item.sort_values([rank_by, 'item'], ascending=[False, True], ignore_index=True, kind='stable')
+
+    top, rest = per_item.head(n), per_item.iloc[n:]
+    challenger = max(rest['upper'].max() if len(rest) else 0, total_threshold)
+    guaranteed = len(top) == 0 or top[rank_by].iloc[-1] >= challenger
+    max_error = float((top['upper'] - top[rank_by]).max()) if len(top) else 0.0
+    return top.drop(columns='covered').reset_index(drop=True), max_error, bool(guaranteed)
+
+
+# -----------------------
+# Quantiles
+# -----------------------
+QUANTILE_K = 256
+
+
+def quantile_table(keys, values, k=QUANTILE_K):
+    """
+    Mergeable quantile summaries: at most ``k`` weighted values per cell.
+
+    Each cell's values are sorted and split in blocks of ``2**h`` consecutive
+    ranks (the smallest power of two that leaves ``k`` blocks or fewer); the
+    middle value of every block is kept with the block size as weight. The rank
+    of any value in a cell is then off by at most half a block (< n / k), so a
+    union of cells answers any quantile with a rank error below ``1 / k``.
+
+    Args:
+        keys: Frame with the cell columns, aligned with ``values``.
+        values: Values to summarize (NA values are ignored).
+        k: Values kept per cell.
+
+    Returns:
+        ``keys`` columns + ``value`` + ``weight`` (int64), sorted by the cell columns.
+    """
+    cells = list(keys.columns)
+    table = keys.assign(value=np.asarray(values))
+    table = table[pd.notna(table['value'])].sort_values(cells + ['value'], ignore_index=True, kind='stable')
+
+    grouped = table.groupby(cells, observed=True, sort=False)
+    rank = grouped.cumcount().to_numpy()
+    size = grouped['value'].transform('size').to_numpy()
+    levels = np.ceil(np.log2(np.maximum(size / k, 1))).astype(np.int64)
+    block = np.left_shift(1, levels)
+    start = rank - rank % block
+    # Representante: el elemento central del bloque (el último bloque puede estar incompleto)
+    width = np.minimum(block, size - start)
+    keep = rank == start + width // 2
+    table = table[keep].reset_index(drop=True)
+    table['weight'] = width[keep].astype(np.int64)
+    return table
+
+
+def histogram_table(keys, values):
+    """
+    Exact histograms: one row per ``(cell, value)`` with its count as ``weight``.
+    Compact for discrete values such as integer prices.
+    """
+    cells = list(keys.columns)
+    table = keys.assign(value=np.asarray(values))
+    table = table[pd.notna(table['value'])]
+    return table.groupby(cells + ['value'], observed=True, sort=True).size().rename('weight').reset_index()
+
+
+def weighted_quantiles(values, weights, qs):
+    """
+    Quantiles ``qs`` of ``values`` repeated ``weights`` times, with the linear
+    interpolation of ``numpy.quantile``/``Series.quantile``.
+    """
+    values, weights = np.asarray(values, dtype=np.float64), np.asarray(weights, dtype=np.int64)
+    qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+    if len(values) == 0 or weights.sum() == 0:
+        return np.full(len(qs), np.nan)
+    order = np.argsort(values, kind='stable')
+    values, cum = values[order], np.cumsum(weights[order])
+    position = qs * (cum[-1] - 1)
+    lower, upper = np.floor(position), np.ceil(position)
+    # Rango r (base 0) -> primer valor cuyo acumulado supera r
+    lo = values[np.searchsorted(cum, lower, side='right')]
+    hi = values[np.searchsorted(cum, upper, side='right')]
+    return lo + (hi - lo) * (position - lower)
+
+
+def weighted_describe(values, weights, quantiles=None):
+    """
+    ``Series.describe()`` fields (count, mean, std, min, quartiles, max) of weighted values.
+
+    Args:
+        values, weights: Exact weighted values (e.g. merged histograms).
+        quantiles: Optional ``(values, weights)`` summary the quartiles are read from
+            instead; count, mean, std, min and max always come from ``values``.
+    """
+    values, weights = np.asarray(values, dtype=np.float64), np.asarray(weights, dtype=np.int64)
+    count = int(weights.sum())
+    if count == 0:
+        return pd.Series({'count': 0, 'mean': np.nan, 'std': np.nan, 'min': np.nan,
+                          '25%': np.nan, '50%': np.nan, '75%': np.nan, 'max': np.nan})
+    mean = float(np.dot(values, weights) / count)
+    var = float(np.dot((values - mean) ** 2, weights) / (count - 1)) if count > 1 else np.nan
+    q25, q50, q75 = weighted_quantiles(*(quantiles or (values, weights)), [0.25, 0.5, 0.75])
+    return pd.Series({'count': count, 'mean': mean, 'std': np.sqrt(var), 'min': values.min(),
+                      '25%': q25, '50%': q50, '75%': q75, 'max': values.max()})
+
+
+def integer_quantiles(values, qs, max_range=1 << 20):
+    """
+    Exact quantiles of integer-valued ``values`` from a ``bincount`` histogram
+    (linear time, no sort). None when the values are not integral or span more
+    than ``max_range``.
+    """
+    values = np.asarray(values)
+    if len(values) == 0:
+        return np.full(len(np.atleast_1d(qs)), np.nan)
+    low, high = values.min(), values.max()
+    if high - low > max_range or not np.all(np.mod(values, 1) == 0):
+        return None
+    counts = np.bincount((values - low).astype(np.int64))
+    present = np.flatnonzero(counts)
+    return weighted_quantiles(present + low, counts[present], qs)
+
+
+def quantile_error(k=QUANTILE_K):
+    """
+    Maximum normalized rank error of a quantile read from ``quantile_table`` summaries.
+    """
+    return 1.0 / k
@@ -0,0 +1,157 @@
+# src/data/versioning.py
+"""
+Content fingerprints and data-version tokens of the processed dataset.
+
+Hashing every byte on each cold start would cost as much as reading the data,
+so the SHA-256 of each file is memoized against its (size, mtime) and only
+recomputed when that file changes. The dataset hash combines the per-file
+digests, so a new incremental part costs one file hash, not the history. The
+feature pipeline also writes a manifest next to its output, so a fresh
+checkout or server can read the version without hashing at all.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+from src.data.load_dataset import dataset_source_path
+
+FINGERPRINT_INDEX = "data/interim/.fingerprints.json"
+MANIFEST_FILE = "_manifest.json"
+VERSION_LENGTH = 16
+
+
+def data_files(path):
+    """
+    Data files behind ``path``: the file itself, or every visible file of a
+    dataset directory (``_``/``.`` prefixed metadata files are skipped).
+    """
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for root, dirs, names in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(('.', '_')))
+        files.extend(os.path.join(root, n) for n in sorted(names) if not n.startswith(('.', '_')))
+    return files
+
+
+def stat_signature(path):
+    """
+    Cheap signature built from file names, sizes and modification times.
+    """
+    digest = hashlib.sha256()
+    for f in data_files(path):
+        st = os.stat(f)
+        digest.update(f"{os.path.relpath(f, path)}|{st.st_size}|{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_index(index_path):
+    if not os.path.exists(index_path):
+        return {}
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def content_fingerprint(path, index_path=FINGERPRINT_INDEX):
+    """
+    SHA-256 of the dataset contents: the per-file digests combined in sorted name order.
+
+    Each file's digest is reused from ``index_path`` while its size and mtime are
+    unchanged, so appending a part to a dataset directory only hashes the new part.
+    """
+    index = _read_index(index_path)
+    combined = hashlib.sha256()
+    changed = False
+    for f in data_files(path):
+        key = os.path.abspath(f)
+        st = os.stat(f)
+        entry = index.get(key)
+        if not entry or entry.get("size") != st.st_size or entry.get("mtime_ns") != st.st_mtime_ns:
+            entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": _hash_file(f)}
+            index[key] = entry
+            changed = True
+        combined.update(f"{os.path.relpath(f, path) if os.path.isdir(path) else os.path.basename(f)}|"
+                        f"{entry['sha256']}\n".encode())
+
+    # Olvidar ficheros borrados (p.ej. tras reconstruir el directorio) y entradas del formato anterior
+    stale = [k for k, entry in index.items() if not os.path.isfile(k) or "size" not in entry]
+    for k in stale:
+        del index[k]
+    if changed or stale:
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            tmp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, indent=2)
+            os.replace(tmp_path, index_path)
+        except OSError:
+            pass  # Read-only checkout: the hashes are just recomputed next time
+    return combined.hexdigest()
+
+
+def manifest_path(path):
+    """
+    ``<dir>/_manifest.json`` for a dataset directory, ``<file>.manifest.json`` for a single file.
+    """
+    return os.path.join(path, MANIFEST_FILE) if os.path.isdir(path) else f"{path}.manifest.json"
+
+
+def read_manifest(path):
+    manifest_file = manifest_path(path)
+    if not os.path.exists(manifest_file):
+        return None
+    try:
+        with open(manifest_file, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(path):
+    """
+    Record the content hash of ``path`` (called by the pipeline after each write).
+    """
+    sha256 = content_fingerprint(path)
+    manifest = {
+        "version": sha256[:VERSION_LENGTH],
+        "sha256": sha256,
+        "signature": stat_signature(path),
+        "files": [os.path.relpath(f, path) if os.path.isdir(path) else os.path.basename(f) for f in data_files(path)],
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    manifest_file = manifest_path(path)
+    tmp_path = f"{manifest_file}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_file)
+    return manifest
+
+
+def data_version(path=None):
+    """
+    Version token of the processed dataset: the first 16 hex digits of its content SHA-256.
+
+    The manifest is trusted while the files' stat signature matches it; after a
+    checkout (new mtimes) or a manual edit the hash is recomputed, and the token
+    only changes if the bytes did.
+    """
+    path = path or dataset_source_path()
+    if not os.path.exists(path):
+        return None
+    manifest = read_manifest(path)
+    if manifest and manifest.get("signature") == stat_signature(path):
+        return manifest["version"]
+    return content_fingerprint(path)[:VERSION_LENGTH]
@@ -0,0 +1,164 @@
+# src/data/yoy_matrix.py
+"""
+Year x month x country matrix for the year-over-year comparison.
+
+Dense arrays indexed ``[year, month, country]`` hold revenue, distinct orders
+(an order has a single date and country, so counts add across cells) and a
+HyperLogLog sketch of the customers (``2**p`` registers per cell). Comparing
+any set of years over any subset of countries is an index and a sum over the
+arrays, or a register-wise maximum for the customers; the raw rows are never
+touched. The pipeline writes the matrix next to the cube.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from src.data.aggregates import AGGREGATES_DIR
+from src.data.sketches import HLL_P, _rho, hash_values, hll_error, hll_estimate
+
+YOY_FILE = "yoy_matrix.npz"
+YOY_META = "_yoy_matrix.json"
+YOY_SOURCE_COLUMNS = ['order_date', 'country', 'order_id', 'customer_id', 'total_price']
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def build_yoy_arrays(df, p=HLL_P):
+    """
+    ``{years, countries, revenue, orders, registers}`` from order lines.
+
+    ``revenue``/``orders`` are ``years x 12 x countries``; ``registers`` adds
+    the ``2**p`` HLL registers of the customers as the last axis (uint8).
+    """
+    df = df.dropna(subset=['order_date', 'country'])
+    year = df['order_date'].dt.year.to_numpy()
+    years = np.unique(year)
+    countries = np.array(sorted(df['country'].astype(str).unique()), dtype=object)
+    shape = (len(years), 12, len(countries))
+    cell = np.ravel_multi_index(
+        (np.searchsorted(years, year), df['order_date'].dt.month.to_numpy() - 1,
+         np.searchsorted(countries, df['country'].astype(str).to_numpy())), shape)
+    size = int(np.prod(shape))
+
+    revenue = np.bincount(cell, weights=df['total_price'].to_numpy(dtype=np.float64), minlength=size)
+    orders = pd.DataFrame({'cell': cell, 'order': hash_values(df['order_id'].to_numpy())}).drop_duplicates()
+    order_counts = np.bincount(orders['cell'].to_numpy(), minlength=size)
+
+    valid = pd.notna(df['customer_id']).to_numpy()
+    hashes = hash_values(df['customer_id'].to_numpy()[valid])
+    registers = np.zeros((size, 1 << p), dtype=np.uint8)
+    np.maximum.at(registers, (cell[valid], (hashes >> np.uint64(64 - p)).astype(np.int64)),
+                  _rho(hashes & np.uint64((1 << (64 - p)) - 1), 64 - p))
+    return {
+        'years': years,
+        'countries': countries,
+        'revenue': revenue.reshape(shape),
+        'orders': order_counts.reshape(shape),
+        'registers': registers.reshape(shape + (1 << p,)),
+    }
+
+
+def write_yoy_matrix(arrays, source_version, p=HLL_P, out_dir=AGGREGATES_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    np.savez_compressed(os.path.join(out_dir, YOY_FILE), **{
+        **arrays, 'countries': arrays['countries'].astype(str)})
+    meta = {
+        "source_version": source_version,
+        "hll_p": p,
+        "years": [int(y) for y in arrays['years']],
+        "built_at": datetime.now(timezone.utc).isoformat(),
+    }
+    # Metadatos al final, como en el cubo
+    with open(os.path.join(out_dir, YOY_META), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def read_yoy_meta(out_dir=AGGREGATES_DIR):
+    path = os.path.join(out_dir, YOY_META)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class YoyMatrix:
+    """
+    Year x month x country revenue, orders and customer sketches of one dataset version.
+    """
+
+    def __init__(self, arrays, p=HLL_P, source_version=None):
+        self.years = [int(y) for y in arrays['years']]
+        self.countries = [str(c) for c in arrays['countries']]
+        self.revenue = arrays['revenue']
+        self.orders = arrays['orders']
+        self.registers = arrays['registers']
+        self.p = p
+        self.source_version = source_version
+
+    @classmethod
+    def load(cls, version, out_dir=AGGREGATES_DIR):
+        """
+        Matrix written by the pipeline for ``version``, or None if missing or stale.
+        """
+        meta = read_yoy_meta(out_dir)
+        path = os.path.join(out_dir, YOY_FILE)
+        if not meta or meta.get("source_version") != version or not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+        return cls(arrays, meta.get("hll_p", HLL_P), version)
+
+    @classmethod
+    def from_frame(cls, df, version=None, p=HLL_P):
+        return cls(build_yoy_arrays(df, p), p, version)
+
+    def customer_error(self):
+        return hll_error(self.p)
+
+    def _index(self, years, countries):
+        year_idx = [self.years.index(y) for y in years]
+        if countries is None:
+            country_idx = slice(None)
+        else:
+            wanted = set(map(str, countries))
+            country_idx = [i for i, c in enumerate(self.countries) if c in wanted]
+        return year_idx, country_idx
+
+    def monthly(self, years, countries=None):
+        """
+        ``year, month, month_name, revenue, orders, customers`` for ``years`` and ``countries`` (None = all).
+        """
+        year_idx, country_idx = self._index(years, countries)
+        revenue = self.revenue[year_idx][:, :, country_idx].sum(axis=2)
+        orders = self.orders[year_idx][:, :, country_idx].sum(axis=2)
+        customers = hll_estimate(self.registers[year_idx][:, :, country_idx].max(axis=2, initial=0))
+        return pd.DataFrame({
+            'year': np.repeat(years, 12),
+            'month': np.tile(np.arange(1, 13), len(years)),
+            'month_name': np.tile(MONTH_NAMES, len(years)),
+            'revenue': revenue.ravel(),
+            'orders': orders.ravel(),
+            'customers': customers.ravel(),
+        })
+
+    def totals(self, years, countries=None):
+        """
+        ``year, revenue, orders, customers, aov`` per year, with the change vs. the previous listed year.
+        """
+        year_idx, country_idx = self._index(years, countries)
+        revenue = self.revenue[year_idx][:, :, country_idx].sum(axis=(1, 2))
+        orders = self.orders[year_idx][:, :, country_idx].sum(axis=(1, 2))
+        customers = hll_estimate(self.registers[year_idx][:, :, country_idx].max(axis=(1, 2), initial=0))
+        table = pd.DataFrame({'year': list(years), 'revenue': revenue, 'orders': orders, 'customers': customers})
+        table['aov'] = np.divide(revenue, orders, out=np.zeros(len(years)), where=orders > 0)
+        for column in ['revenue', 'orders', 'customers', 'aov']:
+            previous = table[column].shift(1)
+            table[f'{column}_yoy'] = np.where(previous > 0, (table[column] - previous) / previous * 100, np.nan)
+        return table
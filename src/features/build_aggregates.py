@@ -0,0 +1,120 @@
+# src/features/build_aggregates.py
+"""
+Rebuild the aggregate cube (data/processed/aggregates) from the processed dataset,
+update the RFM state with the new dataset parts and refresh the batch forecasts and the
+year x month x country YoY matrix. Run after create_features.py; the cube, forecasts and
+matrix are skipped when they already match the data version.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Raíz del proyecto en el path para importar src/ al ejecutarse como script
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.data.load_dataset import load_dataset, dataset_columns, dataset_source_path
+from src.data.versioning import data_version
+from src.data.aggregates import (AGGREGATES_DIR, CUBE_SOURCE_COLUMNS, build_cube, write_cube,
+                                 read_cube_meta)
+from src.data.sketches import KMV_K, HLL_P, HH_CAPACITY, QUANTILE_K
+from src.data.yoy_matrix import YOY_SOURCE_COLUMNS, build_yoy_arrays, read_yoy_meta, write_yoy_matrix
+from src.models.rfm import RfmState, refresh_state
+from src.models.forecasting import (FORECAST_HORIZON, FORECAST_SOURCE_COLUMNS, TOP_PRODUCTS, read_forecast_meta,
+                                    run_forecasts, write_forecasts)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--kmv-k", type=int, default=KMV_K,
+                        help="Hashes kept per distinct-count sketch cell (default: %(default)s)")
+    parser.add_argument("--hll-p", type=int, default=HLL_P,
+                        help="HyperLogLog precision, 2**p registers per day x country and per YoY "
+                             "year x month x country cell (default: %(default)s)")
+    parser.add_argument("--hh-capacity", type=int, default=HH_CAPACITY,
+                        help="Items kept per cell by the Top-N heavy-hitter summaries (default: %(default)s)")
+    parser.add_argument("--quantile-k", type=int, default=QUANTILE_K,
+                        help="Values kept per cell by the unit-price quantile summaries (default: %(default)s)")
+    parser.add_argument("--horizon", type=int, default=FORECAST_HORIZON,
+                        help="Months forecast per series (default: %(default)s)")
+    parser.add_argument("--top-products", type=int, default=TOP_PRODUCTS,
+                        help="Products with their own forecast, by revenue (default: %(default)s)")
+    parser.add_argument("--forecast-workers", type=int, default=None,
+                        help="Processes for the rolling-origin backtests (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the cube, forecasts and YoY matrix are up to date")
+    return parser.parse_args()
+
+
+def update_rfm_state(version):
+    """
+    Fold only the new dataset parts into the RFM state (full rebuild for a CSV source).
+    """
+    source = dataset_source_path()
+    if source.endswith(".csv"):
+        RfmState.from_frame(load_dataset(columns=['order_date', 'country', 'customer_id', 'order_id', 'total_price']),
+                            version).save()
+        print("✅ RFM state rebuilt from CSV")
+        return
+    state, rows = refresh_state(source, version)
+    print(f"✅ RFM state for data version {version}: {rows} new rows folded in, "
+          f"{len(state.activity)} customer-day rows")
+
+
+def update_forecasts(version, args):
+    """
+    Forecast and backtest every series; skipped when already built for this version and settings.
+    """
+    meta = read_forecast_meta()
+    if not args.force and meta and meta.get("source_version") == version \
+            and meta.get("horizon") == args.horizon and meta.get("top_products") == args.top_products:
+        print(f"ℹ️ Forecasts already built for data version {version}")
+        return
+    df = load_dataset(columns=FORECAST_SOURCE_COLUMNS)
+    tables = run_forecasts(df, args.horizon, top_products=args.top_products, workers=args.forecast_workers)
+    meta = write_forecasts(tables, version, args.horizon, args.top_products)
+    print(f"✅ Forecasts for data version {version}: {meta['series']} series, {args.horizon} months ahead, "
+          f"{int(tables['metrics']['origins'].max())} backtest origins")
+
+
+def update_yoy_matrix(version, args):
+    """
+    Year x month x country revenue, orders and customer HLL sketches (same precision as the cube).
+    """
+    meta = read_yoy_meta()
+    if not args.force and meta and meta.get("source_version") == version and meta.get("hll_p") == args.hll_p:
+        print(f"ℹ️ YoY matrix already built for data version {version}")
+        return
+    arrays = build_yoy_arrays(load_dataset(columns=YOY_SOURCE_COLUMNS), args.hll_p)
+    write_yoy_matrix(arrays, version, args.hll_p)
+    print(f"✅ YoY matrix for data version {version}: {len(arrays['years'])} years x 12 months x "
+          f"{len(arrays['countries'])} countries")
+
+
+def main():
+    args = parse_args()
+    version = data_version()
+    update_rfm_state(version)
+    update_forecasts(version, args)
+    update_yoy_matrix(version, args)
+
+    meta = read_cube_meta()
+    if not args.force and meta and meta.get("source_version") == version \
+            and meta.get("kmv_k") == args.kmv_k and meta.get("hll_p") == args.hll_p \
+            and meta.get("hh_capacity") == args.hh_capacity and meta.get("quantile_k") == args.quantile_k:
+        print(f"ℹ️ Aggregate cube already built for data version {version}")
+        return
+
+    available = dataset_columns()
+    missing = [c for c in CUBE_SOURCE_COLUMNS if c not in available]
+    if missing:
+        raise ValueError(f"Processed dataset is missing columns for the cube: {missing}")
+
+    df = load_dataset(columns=CUBE_SOURCE_COLUMNS)
+    tables = build_cube(df, args.kmv_k, args.hll_p, args.hh_capacity, args.quantile_k)
+    write_cube(tables, version, args.kmv_k, args.hll_p, args.hh_capacity, args.quantile_k)
+    print(f"✅ Aggregate cube for data version {version}: {len(df)} rows -> {len(tables['facts'])} cells "
+          f"in {AGGREGATES_DIR}")
+    for name, table in tables.items():
+        print(f"   {name:<14} {len(table):>10} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,37 @@
 # src/features/create_features.py
-import pandas as pd
+import argparse
+import json
 import os
+import shutil
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Raíz del proyecto en el path para importar src/ al ejecutarse como script
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.data.load_dataset import default_dataset_path
+from src.data.versioning import write_manifest
 
 # Archivos de entrada y salida
 RAW_CSV = "data/raw/ecommerce_dataset_10000.csv"
 PROCESSED_CSV = "data/processed/ecommerce_dataset_10000_cleaned.csv"
 PROCESSED_PARQUET = "data/processed/ecommerce_dataset_10000_cleaned.parquet"
-
-# Crear carpeta processed si no existe
-os.makedirs("data/processed", exist_ok=True)
-
-# Leer dataset raw
-df = pd.read_csv(RAW_CSV)
+# Dataset incremental (un part-*.parquet por ejecución) y su watermark
+PROCESSED_DATASET_DIR = "data/processed/ecommerce_dataset_10000_cleaned"
+WATERMARK_FILE = "_watermark.json"
+LINE_KEYS_FILE = "_line_keys.parquet"
+# Una línea de pedido se identifica por (order_id, product_id): un pedido puede tener varias líneas
+LINE_KEY_COLUMNS = ['order_id', 'product_id']
+# Ventana de llegadas tardías: solo se guardan (y comparan) las claves de los últimos N días
+LATE_ARRIVAL_DAYS = 35
+DEFAULT_CHUNKSIZE = 200_000
+# Columnas usadas como particiones Hive (year=/month=)
+PARTITION_COLUMNS = ['year', 'month']
 
 # -----------------------
 # Seleccionar columnas principales
@@ -22,35 +42,505 @@ columns_needed = [
     'rating', 'review_text', 'review_date'
 ]
 
-# Mantener solo columnas existentes
-columns_present = [c for c in columns_needed if c in df.columns]
-df = df[columns_present]
+# Columnas que no pueden ser nulas
+critical_columns = ['country', 'order_date', 'customer_id', 'product_name', 'unit_price', 'quantity']
 
 # -----------------------
-# Limpieza de datos
+# Plan de tipos del dataset procesado (se conserva en el esquema Parquet)
 # -----------------------
-# Convertir tipos
-df['order_date'] = pd.to_datetime(df['order_date'], errors='coerce')
-df['review_date'] = pd.to_datetime(df['review_date'], errors='coerce') if 'review_date' in df.columns else None
-df['unit_price'] = pd.to_numeric(df['unit_price'], errors='coerce')
-df['quantity'] = pd.to_numeric(df['quantity'], errors='coerce')
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
 
-# Eliminar filas críticas con valores nulos
-df = df.dropna(subset=['country', 'order_date', 'customer_id', 'product_name', 'unit_price', 'quantity'])
+DTYPE_PLAN = {
+    # Baja cardinalidad -> categorical / dictionary
+    'country': 'category',
+    'category': 'category',
+    'order_status': 'category',
+    'payment_method': 'category',
+    'day_of_week': pd.CategoricalDtype(DAY_NAMES, ordered=True),
+    # Enteros con el ancho mínimo
+    'quantity': 'int16',
+    'rating': 'Int8',
+    'year': 'int16',
+    'month': 'int8',
+    'week_of_year': 'int8',
+    # Precio unitario por fila: float32 es exacto hasta 7 cifras significativas.
+    # total_price se mantiene en float64 porque se suma en todos los dashboards.
+    'unit_price': 'float32',
+}
 
-# -----------------------
-# Feature Engineering
-# -----------------------
-df['total_price'] = df['unit_price'] * df['quantity']
-df['year'] = df['order_date'].dt.year
-df['month'] = df['order_date'].dt.month
-df['day_of_week'] = df['order_date'].dt.day_name()
-df['week_of_year'] = df['order_date'].dt.isocalendar().week
 
-# -----------------------
-# Guardar dataset procesado
-# -----------------------
-df.to_csv(PROCESSED_CSV, index=False)
-df.to_parquet(PROCESSED_PARQUET, index=False)
+def clean_and_engineer(df):
+    """
+    Apply the cleaning and feature engineering steps to a raw frame (or chunk).
+
+    Numeric columns get a fixed dtype so every chunk produces the same schema.
+    """
+    # Mantener solo columnas existentes
+    columns_present = [c for c in columns_needed if c in df.columns]
+    df = df[columns_present]
+
+    # -----------------------
+    # Limpieza de datos
+    # -----------------------
+    # Convertir tipos
+    df['order_date'] = pd.to_datetime(df['order_date'], errors='coerce')
+    df['review_date'] = pd.to_datetime(df['review_date'], errors='coerce') if 'review_date' in df.columns else None
+    df['unit_price'] = pd.to_numeric(df['unit_price'], errors='coerce').astype('float64')
+    df['quantity'] = pd.to_numeric(df['quantity'], errors='coerce')
+    if 'rating' in df.columns:
+        df['rating'] = pd.to_numeric(df['rating'], errors='coerce').astype('Int64')
+
+    # Eliminar filas críticas con valores nulos
+    df = df.dropna(subset=critical_columns)
+    df['quantity'] = df['quantity'].astype('int64')
+
+    # -----------------------
+    # Feature Engineering
+    # -----------------------
+    df['total_price'] = df['unit_price'] * df['quantity']
+    df['year'] = df['order_date'].dt.year
+    df['month'] = df['order_date'].dt.month
+    df['day_of_week'] = df['order_date'].dt.day_name()
+    df['week_of_year'] = df['order_date'].dt.isocalendar().week
+
+    return df
+
+
+def apply_dtype_plan(df):
+    """
+    Cast the columns listed in ``DTYPE_PLAN``. Integer casts are range-checked,
+    so an out-of-range value raises instead of silently wrapping around.
+    """
+    df = df.copy()
+    for column, dtype in DTYPE_PLAN.items():
+        if column not in df.columns:
+            continue
+        target = pd.api.types.pandas_dtype(dtype)
+        if pd.api.types.is_integer_dtype(target) and len(df):
+            info = np.iinfo(target.numpy_dtype if hasattr(target, 'numpy_dtype') else target)
+            low, high = df[column].min(), df[column].max()
+            if pd.notna(low) and (low < info.min or high > info.max):
+                raise ValueError(f"{column} values [{low}, {high}] do not fit the planned dtype {dtype}")
+        df[column] = df[column].astype(target)
+    return df
+
+
+class MemoryReport:
+    """
+    Accumulate per-column memory before and after the dtype plan (across chunks).
+    """
+
+    def __init__(self):
+        self.before = pd.Series(dtype='int64')
+        self.after = pd.Series(dtype='int64')
+        self.dtypes = {}
+
+    def add(self, before_df, after_df):
+        self.before = self.before.add(before_df.memory_usage(deep=True, index=False), fill_value=0)
+        self.after = self.after.add(after_df.memory_usage(deep=True, index=False), fill_value=0)
+        self.dtypes = {c: (str(before_df[c].dtype), str(after_df[c].dtype)) for c in after_df.columns}
+
+    def print(self):
+        if self.before.empty:
+            return
+        print("📦 Memory report (dtype plan)")
+        for column in self.dtypes:
+            old, new = self.dtypes.get(column, ('', ''))
+            print(f"   {column:<15} {old:>15} -> {new:<28} "
+                  f"{self.before[column] / 1e6:8.2f} MB -> {self.after[column] / 1e6:8.2f} MB")
+        total_before, total_after = self.before.sum() / 1e6, self.after.sum() / 1e6
+        print(f"   {'TOTAL':<15} {total_before:.2f} MB -> {total_after:.2f} MB "
+              f"({total_before / total_after:.1f}x smaller)")
+
+
+def prepare(df, report=None):
+    """
+    Clean, engineer features and apply the dtype plan, recording memory use in ``report``.
+    """
+    df = clean_and_engineer(df)
+    planned = apply_dtype_plan(df)
+    if report is not None:
+        report.add(df, planned)
+    return planned
+
+
+def to_arrow(df):
+    """
+    Convert to an Arrow table with int32 dictionary indices, so chunks with a
+    different number of categories still share one schema.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    fields = [
+        pa.field(f.name, pa.dictionary(pa.int32(), f.type.value_type, f.type.ordered), f.nullable)
+        if pa.types.is_dictionary(f.type) else f
+        for f in table.schema
+    ]
+    return table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+
+def read_raw(path=RAW_CSV, chunksize=None):
+    """
+    Read only the needed raw columns; with ``chunksize`` an iterator of frames is returned.
+    """
+    return pd.read_csv(path, usecols=lambda c: c in columns_needed, chunksize=chunksize)
+
+
+def process_full(raw_csv=RAW_CSV, out_csv=PROCESSED_CSV, out_parquet=PROCESSED_PARQUET, report=None):
+    """
+    Load the whole raw file in memory and write the processed outputs.
+    """
+    df = prepare(read_raw(raw_csv), report)
+    df.to_csv(out_csv, index=False)
+    pq.write_table(to_arrow(df), out_parquet)
+    return len(df)
+
+
+def process_streaming(chunksize, raw_csv=RAW_CSV, out_csv=PROCESSED_CSV, out_parquet=PROCESSED_PARQUET,
+                      report=None):
+    """
+    Process the raw file chunk by chunk, appending each chunk to the CSV and to a
+    Parquet writer (one row group per chunk). Peak memory depends on ``chunksize``,
+    not on the size of the raw file.
+    """
+    writer = None
+    rows = 0
+    try:
+        for i, chunk in enumerate(read_raw(raw_csv, chunksize=chunksize)):
+            chunk = prepare(chunk, report)
+            table = to_arrow(chunk)
+            if writer is None:
+                writer = pq.ParquetWriter(out_parquet, table.schema)
+            else:
+                # Mismo esquema en todos los chunks (p.ej. columnas vacías en un chunk)
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            chunk.to_csv(out_csv, index=False, mode='w' if i == 0 else 'a', header=(i == 0))
+            rows += len(chunk)
+            print(f"   chunk {i + 1}: {len(chunk)} rows")
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def line_keys(df):
+    """
+    Line-level key ``order_id|product_id`` per row (``<NA>`` when ``order_id`` is missing).
+    """
+    columns = [c for c in LINE_KEY_COLUMNS if c in df.columns]
+    keys = df[columns[0]].astype('string')
+    for column in columns[1:]:
+        keys = keys + '|' + df[column].astype('string').fillna('')
+    return keys
+
+
+def key_frame(df):
+    """
+    ``line_key, order_date`` of the rows of ``df`` with a line key.
+    """
+    return pd.DataFrame({'line_key': line_keys(df), 'order_date': df['order_date']}).dropna()
+
+
+def empty_key_frame():
+    return pd.DataFrame({'line_key': pd.Series(dtype='string'), 'order_date': pd.Series(dtype='datetime64[ns]')})
+
+
+def late_cutoff(max_order_date, late_days=LATE_ARRIVAL_DAYS):
+    """
+    Oldest ``order_date`` still accepted as a late arrival (None without a watermark).
+    """
+    return None if max_order_date is None else max_order_date - pd.Timedelta(days=late_days)
+
+
+def load_watermark(dataset_dir=PROCESSED_DATASET_DIR, late_days=LATE_ARRIVAL_DAYS):
+    """
+    Return ``(max_order_date, line_keys_in_window, partitioned)``; the keys are a ``key_frame``.
+
+    Only the line keys of the late-arrival window (``late_days`` before the
+    watermark) are loaded, so memory does not grow with the whole history.
+    On the first run there is no watermark: ``(None, no keys, None)``.
+    """
+    watermark_path = os.path.join(dataset_dir, WATERMARK_FILE)
+    keys_path = os.path.join(dataset_dir, LINE_KEYS_FILE)
+    if not os.path.exists(watermark_path):
+        return None, empty_key_frame(), None
+
+    with open(watermark_path, encoding="utf-8") as f:
+        watermark = json.load(f)
+    max_order_date = pd.Timestamp(watermark["max_order_date"]) if watermark.get("max_order_date") else None
+    keys = empty_key_frame()
+    if os.path.exists(keys_path) and max_order_date is not None:
+        keys = pd.read_parquet(keys_path, columns=["line_key", "order_date"],
+                               filters=[("order_date", ">=", late_cutoff(max_order_date, late_days))])
+    return max_order_date, keys, watermark.get("partitioned", False)
+
+
+def save_watermark(max_order_date, keys, rows_added, partitioned=False, dataset_dir=PROCESSED_DATASET_DIR,
+                   late_days=LATE_ARRIVAL_DAYS):
+    """
+    Persist the watermark atomically (temp file + rename) next to the dataset parts.
+
+    ``keys`` is a list of ``key_frame`` parts; only the keys inside the late-arrival window are kept.
+    """
+    keys = pd.concat([empty_key_frame(), *keys], ignore_index=True)
+    cutoff = late_cutoff(max_order_date, late_days)
+    if cutoff is not None:
+        keys = keys[keys['order_date'] >= cutoff]
+    keys = keys.drop_duplicates('line_key').sort_values('line_key', ignore_index=True)
+    keys_path = os.path.join(dataset_dir, LINE_KEYS_FILE)
+    pq.write_table(pa.Table.from_pandas(keys.astype({'line_key': 'string'}), preserve_index=False),
+                   keys_path + ".tmp")
+    os.replace(keys_path + ".tmp", keys_path)
+
+    watermark_path = os.path.join(dataset_dir, WATERMARK_FILE)
+    watermark = {
+        "max_order_date": max_order_date.isoformat() if max_order_date is not None else None,
+        "line_keys": len(keys),
+        "late_days": late_days,
+        "rows_added": rows_added,
+        "partitioned": partitioned,
+        "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    with open(watermark_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(watermark, f, indent=2)
+    os.replace(watermark_path + ".tmp", watermark_path)
+
+
+def list_parts(dataset_dir=PROCESSED_DATASET_DIR):
+    """
+    All part files of the dataset directory, flat or ``year=/month=`` partitioned.
+    """
+    parts = []
+    for root, _, files in os.walk(dataset_dir):
+        parts.extend(os.path.join(root, f) for f in files if f.startswith("part-") and f.endswith(".parquet"))
+    return sorted(parts)
+
+
+def existing_schema(dataset_dir=PROCESSED_DATASET_DIR):
+    """
+    Schema of the parts already written, so new parts stay compatible.
+    """
+    parts = list_parts(dataset_dir)
+    return pq.read_schema(parts[0]) if parts else None
+
+
+class DatasetPartWriter:
+    """
+    Write one run's rows as ``part-<timestamp>.parquet`` files in the dataset directory.
+
+    With ``partitioned=True`` rows are routed to Hive-style ``year=YYYY/month=M``
+    sub-directories (one writer per partition touched); ``year``/``month`` are
+    encoded in the path and dropped from the file contents. Files are written
+    under a hidden temp name and only renamed on ``commit()``, so readers never
+    see a half-written part.
+    """
+
+    def __init__(self, dataset_dir=PROCESSED_DATASET_DIR, partitioned=False, schema=None):
+        self.dataset_dir = dataset_dir
+        self.partitioned = partitioned
+        self.schema = schema
+        self.part_name = f"part-{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}.parquet"
+        self.writers = {}
+
+    def _writer(self, subdir):
+        if subdir not in self.writers:
+            folder = os.path.join(self.dataset_dir, subdir)
+            os.makedirs(folder, exist_ok=True)
+            tmp_path = os.path.join(folder, f".{self.part_name}.tmp")
+            self.writers[subdir] = pq.ParquetWriter(tmp_path, self.schema)
+        return self.writers[subdir]
+
+    def write(self, df):
+        table = to_arrow(df)
+        if not self.partitioned:
+            self.schema = self.schema or table.schema
+            self._writer("").write_table(table.cast(self.schema))
+            return
+
+        groups = df.groupby(['year', 'month'], sort=True).indices
+        table = table.drop_columns(PARTITION_COLUMNS)
+        self.schema = self.schema or table.schema
+        for (year, month), rows in groups.items():
+            self._writer(f"year={year}/month={month}").write_table(table.take(rows).cast(self.schema))
+
+    def close(self, commit=True):
+        for subdir, writer in self.writers.items():
+            writer.close()
+            folder = os.path.join(self.dataset_dir, subdir)
+            tmp_path = os.path.join(folder, f".{self.part_name}.tmp")
+            if commit:
+                os.replace(tmp_path, os.path.join(folder, self.part_name))
+            else:
+                os.remove(tmp_path)
+        self.writers = {}
+
+
+def reset_dataset_dir(dataset_dir=PROCESSED_DATASET_DIR):
+    """
+    Remove previous parts and watermark before a full rebuild of the dataset directory.
+    """
+    if os.path.isdir(dataset_dir):
+        shutil.rmtree(dataset_dir)
+    os.makedirs(dataset_dir, exist_ok=True)
+
+
+def remove_dataset_dir(dataset_dir=PROCESSED_DATASET_DIR):
+    """
+    Drop the dataset directory after a single-file run: readers prefer the
+    directory, so a leftover one would shadow the fresh parquet file.
+    """
+    if os.path.isdir(dataset_dir):
+        shutil.rmtree(dataset_dir)
+        print(f"🧹 Removed {dataset_dir}: {PROCESSED_PARQUET} is now the processed dataset")
+
+
+def process_partitioned(chunksize=None, raw_csv=RAW_CSV, out_csv=PROCESSED_CSV, dataset_dir=PROCESSED_DATASET_DIR,
+                        report=None):
+    """
+    Full rebuild of the dataset directory as a ``year=/month=`` partitioned dataset.
+
+    Works in memory (``chunksize=None``) or streaming. The watermark is written
+    as well, so later ``--incremental`` runs append to the same layout.
+    """
+    reset_dataset_dir(dataset_dir)
+    chunks = read_raw(raw_csv, chunksize=chunksize) if chunksize else [read_raw(raw_csv)]
+    writer = DatasetPartWriter(dataset_dir, partitioned=True)
+    keys = []
+    max_order_date = None
+    rows = 0
+    wrote_csv = False
+    try:
+        for chunk in chunks:
+            chunk = prepare(chunk, report)
+            if chunk.empty:
+                continue
+            writer.write(chunk)
+            # Cabecera y sobrescritura con el primer chunk escrito (los vacíos se saltan)
+            chunk.to_csv(out_csv, index=False, mode='a' if wrote_csv else 'w', header=not wrote_csv)
+            wrote_csv = True
+            keys.append(key_frame(chunk))
+            chunk_max = chunk['order_date'].max()
+            max_order_date = chunk_max if max_order_date is None else max(max_order_date, chunk_max)
+            rows += len(chunk)
+    except BaseException:
+        writer.close(commit=False)
+        raise
+    writer.close()
+
+    save_watermark(max_order_date, keys, rows, partitioned=True, dataset_dir=dataset_dir)
+    return rows
+
+
+def process_incremental(chunksize=DEFAULT_CHUNKSIZE, raw_csv=RAW_CSV, dataset_dir=PROCESSED_DATASET_DIR,
+                        partitioned=False, report=None, late_days=LATE_ARRIVAL_DAYS):
+    """
+    Append only new or late-arriving rows to the dataset directory as new part files.
+
+    A row is new when its ``order_date`` is past the watermark, or when it falls
+    in the late-arrival window (``late_days`` before the watermark) and its line
+    key (``order_id``, ``product_id``) has not been processed. Both are compared
+    against the watermark as loaded before the run, so the lines of one order
+    split across chunks are all kept; the watermark is only saved once the new
+    part is committed. Rows older than the window are skipped.
+    """
+    os.makedirs(dataset_dir, exist_ok=True)
+    max_order_date, seen_keys, layout = load_watermark(dataset_dir, late_days)
+    if layout is not None and layout != partitioned:
+        raise ValueError(
+            f"{dataset_dir} was written {'with' if layout else 'without'} --partition; "
+            "use the same layout or rebuild it with --partition"
+        )
+    cutoff = late_cutoff(max_order_date, late_days)
+
+    writer = DatasetPartWriter(dataset_dir, partitioned=partitioned, schema=existing_schema(dataset_dir))
+    added_keys = []
+    new_max = max_order_date
+    rows = 0
+    too_late = 0
+    try:
+        for chunk in read_raw(raw_csv, chunksize=chunksize):
+            if max_order_date is None:
+                is_new = pd.Series(True, index=chunk.index)
+            else:
+                # Pedidos posteriores al watermark o líneas tardías (dentro de la ventana) aún no procesadas
+                order_dates = pd.to_datetime(chunk['order_date'], errors='coerce')
+                keys = line_keys(chunk)
+                late = (order_dates >= cutoff) & (order_dates <= max_order_date)
+                is_new = (order_dates > max_order_date) | (late & keys.notna() & ~keys.isin(seen_keys['line_key']))
+                too_late += int((order_dates < cutoff).sum())
+            if not is_new.any():
+                continue
+
+            chunk = prepare(chunk[is_new.to_numpy()], report)
+            if chunk.empty:
+                continue
+            writer.write(chunk)
+
+            added_keys.append(key_frame(chunk))
+            chunk_max = chunk['order_date'].max()
+            new_max = chunk_max if new_max is None else max(new_max, chunk_max)
+            rows += len(chunk)
+    except BaseException:
+        writer.close(commit=False)
+        raise
+    writer.close()
+
+    if too_late:
+        print(f"   {too_late} rows before the late-arrival window ({cutoff:%Y-%m-%d}) were skipped")
+    if rows:
+        # Claves previas de la ventana + las nuevas; save_watermark recorta a la nueva ventana
+        save_watermark(new_max, [seen_keys, *added_keys], rows, partitioned=partitioned,
+                       dataset_dir=dataset_dir, late_days=late_days)
+    return rows
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Clean the raw dataset and engineer features.")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Stream the raw CSV in chunks of this many rows (bounded memory).")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"Append only new rows to {PROCESSED_DATASET_DIR} using the order_date watermark.")
+    parser.add_argument("--late-days", type=int, default=LATE_ARRIVAL_DAYS,
+                        help="With --incremental, accept late rows up to this many days before the watermark.")
+    parser.add_argument("--partition", action="store_true",
+                        help=f"Write {PROCESSED_DATASET_DIR} as a year=/month= partitioned dataset.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = MemoryReport()
+
+    # Crear carpeta processed si no existe
+    os.makedirs("data/processed", exist_ok=True)
+
+    if args.incremental:
+        print(f"🔄 Incremental run against {PROCESSED_DATASET_DIR}...")
+        rows = process_incremental(args.chunksize or DEFAULT_CHUNKSIZE, partitioned=args.partition, report=report,
+                                   late_days=args.late_days)
+        if rows:
+            print(f"✅ Appended {rows} new rows to {PROCESSED_DATASET_DIR}")
+        else:
+            print("ℹ️ No new rows since the last run.")
+    elif args.partition:
+        rows = process_partitioned(args.chunksize, report=report)
+        print(f"✅ Processed dataset saved with {rows} rows: {PROCESSED_CSV} & {PROCESSED_DATASET_DIR}/year=*/month=*")
+    else:
+        if args.chunksize:
+            print(f"🔄 Streaming {RAW_CSV} in chunks of {args.chunksize} rows...")
+            rows = process_streaming(args.chunksize, report=report)
+        else:
+            rows = process_full(report=report)
+        print(f"✅ Processed dataset saved with {rows} rows: {PROCESSED_CSV} & {PROCESSED_PARQUET}")
+        remove_dataset_dir()
+
+    # Manifiesto con el hash de contenido: token de versión que usan las cachés del dashboard.
+    # Describe la misma ruta que lee load_dataset() (y que versiona data_version())
+    manifest = write_manifest(default_dataset_path())
+    print(f"🔖 Data version: {manifest['version']}")
+
+    report.print()
+
 
-print(f"✅ Processed dataset saved with {len(df)} rows: {PROCESSED_CSV} & {PROCESSED_PARQUET}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+# src/models/forecasting.py
+"""
+Batch monthly revenue forecasts for the total, every country, every category
+and the top products.
+
+All series share the same months, so they form one ``T x S`` matrix and a
+single least-squares solve fits every series at once against a shared design
+(intercept, linear trend and, with two full years of history, calendar-month
+dummies). A seasonal naive forecast (same month last year) is the baseline.
+Rolling-origin backtests refit both models at each origin, on a process pool,
+and the model with the lower backtest MAE is kept per series; its per-horizon
+backtest RMSE gives the 95% band. ``run_forecasts`` returns the tables the
+pipeline stores next to the cube, so the dashboard only reads them.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from src.data.aggregates import AGGREGATES_DIR
+
+FORECAST_HORIZON = 3
+SEASON = 12
+MIN_TRAIN = 12
+TOP_PRODUCTS = 200
+Z_95 = 1.96
+MODELS = ['trend_seasonal', 'seasonal_naive']
+FORECAST_DIMENSIONS = ['total', 'country', 'category', 'product_name']
+FORECAST_SOURCE_COLUMNS = ['order_date', 'country', 'category', 'product_name', 'total_price']
+FORECAST_META = "_forecasts.json"
+FORECAST_TABLES = {
+    'series': "forecast_series.parquet",
+    'metrics': "forecast_metrics.parquet",
+}
+TOTAL_KEY = 'All'
+
+
+# -----------------------
+# Panel de series
+# -----------------------
+def monthly_panel(df, top_products=TOP_PRODUCTS):
+    """
+    Monthly revenue of every series.
+
+    Returns:
+        ``(keys, months, values)``: frame of ``dimension, key`` (one row per
+        series), the contiguous month starts and the ``T x S`` revenue matrix
+        (months without orders count as 0).
+    """
+    month = df['order_date'].dt.to_period('M').dt.to_timestamp()
+    months = pd.date_range(month.min(), month.max(), freq='MS')
+    frame = df[FORECAST_SOURCE_COLUMNS[1:]].assign(month=month)
+    blocks = [pd.DataFrame([frame.groupby('month')['total_price'].sum().reindex(months, fill_value=0).to_numpy()],
+                           index=[TOTAL_KEY], columns=months)]
+    dims = ['total']
+    for dimension in FORECAST_DIMENSIONS[1:]:
+        rows = frame
+        if dimension == 'product_name':
+            top = frame.groupby('product_name', observed=True)['total_price'].sum().nlargest(top_products).index
+            rows = frame[frame['product_name'].isin(top)]
+        table = rows.groupby([dimension, 'month'], observed=True)['total_price'].sum() \
+            .unstack(fill_value=0).reindex(columns=months, fill_value=0)
+        blocks.append(table)
+        dims += [dimension] * len(table)
+    values = pd.concat(blocks)
+    keys = pd.DataFrame({'dimension': dims, 'key': values.index.astype(str)})
+    return keys, months, values.to_numpy(dtype=np.float64).T
+
+
+# -----------------------
+# Modelos (todas las series a la vez)
+# -----------------------
+def design_matrix(t, phase, seasonal):
+    """
+    ``[1, t, month dummies]`` for month indices ``t`` and calendar phases 0-11 (January dropped).
+    """
+    columns = [np.ones(len(t)), np.asarray(t, dtype=np.float64)]
+    if seasonal:
+        columns.append(np.eye(SEASON)[phase][:, 1:])
+    return np.column_stack(columns)
+
+
+def forecast_batch(train, phase, future_phase, model):
+    """
+    ``horizon x S`` forecasts of every column of ``train`` (``T x S``).
+
+    Args:
+        train: History, one column per series.
+        phase: Calendar month (0-11) of each training row.
+        future_phase: Calendar month of each forecast step.
+        model: 'trend_seasonal' (one least-squares solve for all series) or
+            'seasonal_naive' (same month one season earlier, last value if shorter).
+    """
+    T, horizon = len(train), len(future_phase)
+    if model == 'seasonal_naive':
+        if T < SEASON:
+            return np.repeat(train[-1:], horizon, axis=0)
+        return train[T - SEASON + np.arange(horizon) % SEASON]
+    seasonal = T >= 2 * SEASON
+    coef = np.linalg.lstsq(design_matrix(np.arange(T), phase, seasonal), train, rcond=None)[0]
+    return design_matrix(np.arange(T, T + horizon), future_phase, seasonal) @ coef
+
+
+# -----------------------
+# Backtesting
+# -----------------------
+_PANEL = None
+
+
+def _init_worker(values, phase):
+    # El panel se envía una sola vez a cada proceso, no con cada origen
+    global _PANEL
+    _PANEL = (values, phase)
+
+
+def _backtest_origin(origin, horizon):
+    values, phase = _PANEL
+    actual = values[origin:origin + horizon]
+    return np.stack([forecast_batch(values[:origin], phase[:origin], phase[origin:origin + horizon], model) - actual
+                     for model in MODELS]), actual
+
+
+def backtest(values, phase, horizon=FORECAST_HORIZON, min_train=MIN_TRAIN, workers=None):
+    """
+    Rolling-origin errors of every model.
+
+    Args:
+        values: ``T x S`` panel.
+        phase: Calendar month (0-11) of each row.
+        horizon: Steps forecast from each origin.
+        min_train: Months of history of the first origin.
+        workers: Process pool size (None = CPU count, 1 = run in-process).
+
+    Returns:
+        ``(errors, actuals)`` shaped ``origins x models x horizon x S`` and
+        ``origins x horizon x S`` (no origins if the history is too short).
+    """
+    origins = list(range(min_train, len(values) - horizon + 1))
+    if not origins:
+        return np.empty((0, len(MODELS), horizon, values.shape[1])), np.empty((0, horizon, values.shape[1]))
+    if workers == 1 or len(origins) == 1:
+        _init_worker(values, phase)
+        results = [_backtest_origin(origin, horizon) for origin in origins]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(values, phase)) as pool:
+            results = list(pool.map(_backtest_origin, origins, [horizon] * len(origins)))
+    return np.stack([e for e, _ in results]), np.stack([a for _, a in results])
+
+
+def error_metrics(errors, actuals):
+    """
+    ``{metric: models x S}``: MAE, RMSE and sMAPE over all origins and steps,
+    plus ``rmse_h`` (``models x horizon x S``) for the forecast bands.
+    """
+    forecasts = errors + actuals[:, None]
+    denominator = np.abs(actuals[:, None]) + np.abs(forecasts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        smape = np.where(denominator > 0, 2 * np.abs(errors) / denominator, 0.0)
+    return {
+        'mae': np.abs(errors).mean(axis=(0, 2)),
+        'rmse': np.sqrt((errors ** 2).mean(axis=(0, 2))),
+        'smape': smape.mean(axis=(0, 2)),
+        'rmse_h': np.sqrt((errors ** 2).mean(axis=0)),
+    }
+
+
+# -----------------------
+# Ejecución completa
+# -----------------------
+def run_forecasts(df, horizon=FORECAST_HORIZON, min_train=MIN_TRAIN, top_products=TOP_PRODUCTS, workers=None):
+    """
+    Forecast and backtest every series of ``monthly_panel(df)``.
+
+    Returns:
+        ``{'series': ..., 'metrics': ...}``: ``dimension, key, order_date, actual,
+        forecast, lower, upper`` (history rows carry ``actual``, future rows the
+        selected model's forecast and 95% band) and ``dimension, key, model, mae,
+        rmse, smape, origins, selected``.
+    """
+    keys, months, values = monthly_panel(df, top_products)
+    T, S = values.shape
+    phase = (months.month - 1).to_numpy()
+    future = pd.date_range(months[-1] + pd.DateOffset(months=1), periods=horizon, freq='MS')
+    future_phase = (future.month - 1).to_numpy()
+
+    errors, actuals = backtest(values, phase, horizon, min_train, workers)
+    forecasts = np.stack([forecast_batch(values, phase, future_phase, model) for model in MODELS])
+    if len(errors):
+        metrics = error_metrics(errors, actuals)
+        best = np.argmin(metrics['mae'], axis=0)
+        spread = metrics['rmse_h'][best, :, np.arange(S)].T
+    else:
+        # Sin orígenes de backtest: modelo de tendencia y dispersión de los residuos
+        metrics = {name: np.full((len(MODELS), S), np.nan) for name in ('mae', 'rmse', 'smape')}
+        best = np.zeros(S, dtype=np.int64)
+        spread = np.repeat(values.std(axis=0, ddof=1, keepdims=True) if T > 1 else np.zeros((1, S)), horizon, axis=0)
+    chosen = np.clip(forecasts[best, :, np.arange(S)].T, 0, None)
+
+    history = pd.DataFrame({
+        'dimension': np.repeat(keys['dimension'].to_numpy(), T),
+        'key': np.repeat(keys['key'].to_numpy(), T),
+        'order_date': np.tile(months, S),
+        'actual': values.T.ravel(),
+    })
+    ahead = pd.DataFrame({
+        'dimension': np.repeat(keys['dimension'].to_numpy(), horizon),
+        'key': np.repeat(keys['key'].to_numpy(), horizon),
+        'order_date': np.tile(future, S),
+        'forecast': chosen.T.ravel(),
+        'lower': np.clip(chosen - Z_95 * spread, 0, None).T.ravel(),
+        'upper': (chosen + Z_95 * spread).T.ravel(),
+    })
+    series = pd.concat([history, ahead], ignore_index=True)
+
+    metric_rows = pd.DataFrame({
+        'dimension': np.tile(keys['dimension'].to_numpy(), len(MODELS)),
+        'key': np.tile(keys['key'].to_numpy(), len(MODELS)),
+        'model': np.repeat(MODELS, S),
+        'mae': metrics['mae'].ravel(),
+        'rmse': metrics['rmse'].ravel(),
+        'smape': metrics['smape'].ravel(),
+        'origins': len(errors),
+        'selected': (np.arange(len(MODELS))[:, None] == best[None, :]).ravel(),
+    })
+    return {'series': series, 'metrics': metric_rows}
+
+
+# -----------------------
+# Persistencia y lectura
+# -----------------------
+def write_forecasts(tables, source_version, horizon=FORECAST_HORIZON, top_products=TOP_PRODUCTS,
+                    out_dir=AGGREGATES_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    for name, filename in FORECAST_TABLES.items():
+        tables[name].to_parquet(os.path.join(out_dir, filename), index=False)
+    meta = {
+        "source_version": source_version,
+        "horizon": horizon,
+        "top_products": top_products,
+        "series": len(tables['metrics']) // len(MODELS),
+        "built_at": datetime.now(timezone.utc).isoformat(),
+    }
+    # Metadatos al final, como en el cubo
+    with open(os.path.join(out_dir, FORECAST_META), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def read_forecast_meta(out_dir=AGGREGATES_DIR):
+    path = os.path.join(out_dir, FORECAST_META)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class ForecastStore:
+    """
+    Precomputed forecasts and backtest metrics of one dataset version.
+    """
+
+    def __init__(self, tables, horizon=FORECAST_HORIZON, source_version=None):
+        self.series_table = tables['series']
+        self.metrics_table = tables['metrics']
+        self.horizon = horizon
+        self.source_version = source_version
+
+    @classmethod
+    def load(cls, version, out_dir=AGGREGATES_DIR):
+        """
+        Forecasts written by the pipeline for ``version``, or None if missing or stale.
+        """
+        meta = read_forecast_meta(out_dir)
+        if not meta or meta.get("source_version") != version:
+            return None
+        paths = {name: os.path.join(out_dir, filename) for name, filename in FORECAST_TABLES.items()}
+        if not all(os.path.exists(path) for path in paths.values()):
+            return None
+        return cls({name: pd.read_parquet(path) for name, path in paths.items()},
+                   meta.get("horizon", FORECAST_HORIZON), version)
+
+    @classmethod
+    def from_frame(cls, df, version=None, horizon=FORECAST_HORIZON, workers=1):
+        return cls(run_forecasts(df, horizon, workers=workers), horizon, version)
+
+    def keys(self, dimension):
+        """
+        Series of ``dimension``, sorted by name.
+        """
+        rows = self.metrics_table[(self.metrics_table['dimension'] == dimension) & self.metrics_table['selected']]
+        return sorted(rows['key'].tolist())
+
+    def series(self, dimension, key):
+        """
+        History and forecast rows of one series.
+        """
+        table = self.series_table
+        return table[(table['dimension'] == dimension) & (table['key'] == key)].reset_index(drop=True)
+
+    def metrics(self, dimension, key):
+        table = self.metrics_table
+        return table[(table['dimension'] == dimension) & (table['key'] == key)].reset_index(drop=True)
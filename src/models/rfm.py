@@ -0,0 +1,236 @@
+# src/models/rfm.py
+"""
+Vectorized RFM (recency, frequency, monetary) segmentation.
+
+``compute_rfm`` uses native groupby reductions only (no per-customer Python
+lambda) and ``assign_segments`` resolves the four segments in a single
+``np.select``, with the quartile cutoffs read from integer histograms. ``RfmState`` keeps a customer x day x country activity table
+(orders, spend) that the pipeline updates incrementally with the new dataset
+parts only; RFM for any date window is then a slice plus one groupby over
+that table instead of a pass over the raw rows.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.data.aggregates import AGGREGATES_DIR
+from src.data.sketches import integer_quantiles
+from src.data.versioning import data_files
+
+RFM_STATE_FILE = "rfm_state.parquet"
+RFM_STATE_META = "_rfm_state.json"
+RFM_SOURCE_COLUMNS = ['order_date', 'country', 'customer_id', 'order_id', 'total_price']
+
+# Orden de prioridad: cada segmento sobrescribe a los anteriores en la versión original
+SEGMENTS = ['⚠️ At Risk', '⚡ Active', '💎 VIP']
+DEFAULT_SEGMENT = 'Regular'
+
+
+def compute_rfm(df, snapshot_date=None):
+    """
+    ``customer_id, recency, frequency, monetary`` from order lines.
+
+    Args:
+        df: Rows with order_date, customer_id, order_id and total_price.
+        snapshot_date: Reference date; defaults to the last order date + 1 day.
+    """
+    grouped = df.groupby('customer_id', observed=True, sort=True)
+    last_order = grouped['order_date'].max()
+    snapshot = _snapshot(df['order_date'].max(), snapshot_date)
+    return pd.DataFrame({
+        'customer_id': last_order.index,
+        'recency': (snapshot - last_order).dt.days.to_numpy(),
+        'frequency': grouped['order_id'].nunique().to_numpy(),
+        'monetary': grouped['total_price'].sum().to_numpy(),
+    })
+
+
+def _snapshot(last_date, snapshot_date):
+    if snapshot_date is not None:
+        return pd.Timestamp(snapshot_date)
+    return pd.Timestamp(last_date).normalize() + pd.Timedelta(days=1)
+
+
+def segment_thresholds(rfm):
+    """
+    ``{column: {quantile: cutoff}}`` used by ``assign_segments``.
+
+    Recency (days), frequency (orders) and monetary (integer prices x units) are
+    integers, so the cutoffs come exactly from a ``bincount`` histogram in linear
+    time; non-integral or very spread columns fall back to ``Series.quantile``.
+    """
+    wanted = {'recency': [0.25, 0.75], 'frequency': [0.5, 0.75], 'monetary': [0.75]}
+    thresholds = {}
+    for column, qs in wanted.items():
+        cutoffs = integer_quantiles(rfm[column].to_numpy(), qs)
+        if cutoffs is None:
+            cutoffs = rfm[column].quantile(qs).to_numpy()
+        thresholds[column] = dict(zip(qs, cutoffs))
+    return thresholds
+
+
+def assign_segments(rfm, thresholds=None):
+    """
+    Add ``segment``: VIP (top frequency and monetary quartile), Active (recent and
+    frequent), At Risk (least recent quartile), Regular otherwise.
+
+    Args:
+        rfm: Table from ``compute_rfm`` / ``RfmState.window``.
+        thresholds: Cutoffs from ``segment_thresholds`` (computed from ``rfm`` if None).
+    """
+    cut = thresholds or segment_thresholds(rfm)
+    recency, frequency, monetary = rfm['recency'], rfm['frequency'], rfm['monetary']
+    conditions = [
+        recency >= cut['recency'][0.75],
+        (recency <= cut['recency'][0.25]) & (frequency >= cut['frequency'][0.5]),
+        (frequency >= cut['frequency'][0.75]) & (monetary >= cut['monetary'][0.75]),
+    ]
+    rfm = rfm.copy()
+    rfm['segment'] = np.select(conditions, SEGMENTS, default=DEFAULT_SEGMENT)
+    return rfm
+
+
+def segment_summary(rfm):
+    """
+    Customers and revenue per segment.
+    """
+    summary = rfm.groupby('segment').agg({'customer_id': 'count', 'monetary': 'sum'}).reset_index()
+    summary.columns = ['segment', 'customer_count', 'total_revenue']
+    return summary
+
+
+def activity_table(df):
+    """
+    ``order_day, country, customer_id, orders, spend`` aggregated from order lines.
+    Orders are counted per day, so they stay additive across days.
+    """
+    keys = [pd.to_datetime(df['order_date']).dt.normalize().rename('order_day'), df['country'], df['customer_id']]
+    return df.groupby(keys, observed=True, sort=False).agg(
+        orders=('order_id', 'nunique'), spend=('total_price', 'sum')
+    ).reset_index()
+
+
+class RfmState:
+    """
+    Incrementally maintained RFM activity of every customer.
+
+    Args:
+        activity: Table from ``activity_table`` (any order; sorted by day here).
+        consumed: ``{data file: size}`` already folded into the state.
+        source_version: ``data_version()`` the state corresponds to.
+    """
+
+    def __init__(self, activity, consumed=None, source_version=None):
+        self.activity = activity.sort_values('order_day', kind='stable', ignore_index=True)
+        self.consumed = dict(consumed or {})
+        self.source_version = source_version
+
+    @classmethod
+    def from_frame(cls, df, source_version=None):
+        return cls(activity_table(df), source_version=source_version)
+
+    def update(self, new_rows, consumed=None, source_version=None):
+        """
+        New state with ``new_rows`` (order lines) folded in; only those rows are aggregated.
+        """
+        combined = pd.concat([self.activity, activity_table(new_rows)], ignore_index=True)
+        # Un mismo cliente/día/país puede llegar en dos lotes
+        combined = combined.groupby(['order_day', 'country', 'customer_id'], observed=True, sort=False).sum().reset_index()
+        return RfmState(combined, {**self.consumed, **(consumed or {})}, source_version)
+
+    def customers(self):
+        """
+        Per-customer state: last order date, order count and spend over the full history.
+        """
+        return self.activity.groupby('customer_id', observed=True, sort=True).agg(
+            last_order=('order_day', 'max'), orders=('orders', 'sum'), spend=('spend', 'sum')
+        ).reset_index()
+
+    def window(self, start=None, end=None, countries=None, snapshot_date=None):
+        """
+        ``compute_rfm`` for orders in ``[start, end]`` and ``countries`` (None = all).
+        """
+        days = self.activity['order_day'].to_numpy()
+        lo = 0 if start is None else np.searchsorted(days, pd.Timestamp(start).normalize().to_datetime64(), 'left')
+        hi = len(days) if end is None else np.searchsorted(days, pd.Timestamp(end).normalize().to_datetime64(), 'right')
+        rows = self.activity.iloc[lo:hi]
+        if countries is not None:
+            rows = rows[rows['country'].isin(list(countries))]
+
+        grouped = rows.groupby('customer_id', observed=True, sort=True)
+        last_order = grouped['order_day'].max()
+        snapshot = _snapshot(rows['order_day'].max(), snapshot_date)
+        return pd.DataFrame({
+            'customer_id': last_order.index,
+            'recency': (snapshot - last_order).dt.days.to_numpy(),
+            'frequency': grouped['orders'].sum().to_numpy(),
+            'monetary': grouped['spend'].sum().to_numpy(),
+        })
+
+    def save(self, out_dir=AGGREGATES_DIR):
+        os.makedirs(out_dir, exist_ok=True)
+        self.activity.to_parquet(os.path.join(out_dir, RFM_STATE_FILE), index=False)
+        with open(os.path.join(out_dir, RFM_STATE_META), "w", encoding="utf-8") as f:
+            json.dump({"source_version": self.source_version, "consumed": self.consumed}, f, indent=2)
+
+    @classmethod
+    def load(cls, out_dir=AGGREGATES_DIR):
+        meta_path = os.path.join(out_dir, RFM_STATE_META)
+        state_path = os.path.join(out_dir, RFM_STATE_FILE)
+        if not (os.path.exists(meta_path) and os.path.exists(state_path)):
+            return None
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return cls(pd.read_parquet(state_path), meta.get("consumed"), meta.get("source_version"))
+
+
+def file_sizes(path):
+    """
+    ``{relative path: size}`` of the data files behind ``path``.
+    """
+    root = path if os.path.isdir(path) else os.path.dirname(path)
+    return {os.path.relpath(f, root): os.path.getsize(f) for f in data_files(path)}
+
+
+def refresh_state(path, source_version, out_dir=AGGREGATES_DIR):
+    """
+    Bring the saved state up to date with the dataset at ``path``.
+
+    Incremental runs of create_features only add part files, so only files not
+    yet consumed are read. If a consumed file changed or disappeared (full
+    rebuild), or the dataset is a single file, the state is rebuilt from scratch.
+
+    Returns:
+        ``(state, rows_read)``.
+    """
+    state = RfmState.load(out_dir)
+    if state is not None and state.source_version == source_version:
+        return state, 0
+
+    files = file_sizes(path)
+    root = path if os.path.isdir(path) else os.path.dirname(path)
+    # Las partes incrementales son inmutables; un fichero único reescrito obliga a reconstruir
+    if state is not None and (not os.path.isdir(path)
+                              or any(files.get(f) != size for f, size in state.consumed.items())):
+        state = None
+
+    consumed = state.consumed if state is not None else {}
+    new_files = {f: size for f, size in files.items() if f not in consumed}
+    new_rows = pd.concat(
+        [pq.read_table(os.path.join(root, f), columns=RFM_SOURCE_COLUMNS).to_pandas() for f in new_files],
+        ignore_index=True,
+    ) if new_files else pd.DataFrame(columns=RFM_SOURCE_COLUMNS)
+
+    if state is None:
+        state = RfmState(activity_table(new_rows), new_files, source_version)
+    else:
+        state = state.update(new_rows, new_files, source_version)
+    state.save(out_dir)
+    return state, len(new_rows)
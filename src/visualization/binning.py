@@ -0,0 +1,51 @@
+# src/visualization/binning.py
+"""
+Server-side histogram binning for the dashboards.
+
+Counts are computed with NumPy, either from raw values or by merging
+precomputed value counts (the cube's per-cell price histograms), and drawn
+as a bar chart of the bins. The figure carries ``nbins`` bars whatever the
+number of rows, instead of every value as with ``go.Histogram``/``px.histogram``.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+DEFAULT_BINS = 50
+
+
+def histogram_bins(values, nbins=DEFAULT_BINS, weights=None, value_range=None):
+    """
+    Equal-width histogram of ``values`` (NA values are ignored).
+
+    Args:
+        values: Raw values, or distinct values when ``weights`` holds their counts.
+        nbins: Number of bins.
+        weights: Optional count of each value (precomputed histograms).
+        value_range: ``(low, high)`` of the bins; defaults to the data range.
+
+    Returns:
+        Frame with ``bin_start``, ``bin_end`` and ``count``, one row per bin.
+    """
+    values = pd.Series(values).to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(values)
+    if weights is not None:
+        weights = np.asarray(weights, dtype=np.float64)[valid]
+    counts, edges = np.histogram(values[valid], bins=nbins, range=value_range, weights=weights)
+    return pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:], 'count': counts.astype(np.int64)})
+
+
+def histogram_figure(bins, title=None, color='rgb(126, 87, 194)', name='Distribution', x_title=None):
+    """
+    Bar chart of the bins from ``histogram_bins`` (contiguous bars, one per bin).
+    """
+    fig = go.Figure(go.Bar(
+        x=(bins['bin_start'] + bins['bin_end']) / 2, y=bins['count'],
+        width=bins['bin_end'] - bins['bin_start'],
+        customdata=bins[['bin_start', 'bin_end']].to_numpy(),
+        hovertemplate="%{customdata[0]:,.2f} – %{customdata[1]:,.2f}<br>%{y:,}<extra></extra>",
+        marker=dict(color=color), name=name,
+    ))
+    fig.update_layout(bargap=0, title=title, xaxis_title=x_title, yaxis_title="count")
+    return fig
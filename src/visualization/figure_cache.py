@@ -0,0 +1,112 @@
+# src/visualization/figure_cache.py
+"""
+LRU cache of serialized Plotly figures with a byte budget.
+
+Figures are stored as their JSON spec under a ``fingerprint`` of the data
+they were built from plus the chart spec (name, title, theme...). The cache
+is shared by every session of the process; entries are evicted least
+recently used first once the total JSON size exceeds ``max_bytes``.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+FIGURE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def fingerprint(*parts):
+    """
+    Stable hex digest of frames, series, arrays, containers and plain values.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _update(digest, parts)
+    return digest.hexdigest()
+
+
+def _update(digest, part):
+    if isinstance(part, (pd.DataFrame, pd.Series)):
+        digest.update(repr((type(part).__name__, part.shape,
+                            list(part.columns) if isinstance(part, pd.DataFrame) else part.name)).encode())
+        digest.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+    elif isinstance(part, np.ndarray):
+        digest.update(repr((part.dtype.str, part.shape)).encode())
+        digest.update(np.ascontiguousarray(part).tobytes() if part.dtype != object else repr(part.tolist()).encode())
+    elif isinstance(part, (tuple, list)):
+        digest.update(f"{type(part).__name__}{len(part)}(".encode())
+        for item in part:
+            _update(digest, item)
+        digest.update(b")")
+    else:
+        digest.update(repr(part).encode())
+    digest.update(b"\x00")
+
+
+class FigureCache:
+    """
+    Thread-safe LRU of figure JSON specs bounded by ``max_bytes``.
+
+    Args:
+        max_bytes: Budget for the total size of the stored specs.
+    """
+
+    def __init__(self, max_bytes=FIGURE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._specs = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        JSON spec stored under ``key`` (marked as recently used), or None.
+        """
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is None:
+                self.misses += 1
+                return None
+            self._specs.move_to_end(key)
+            self.hits += 1
+            return spec
+
+    def put(self, key, spec):
+        """
+        Store ``spec``, evicting least recently used entries to stay within budget.
+        Specs larger than the whole budget are not stored.
+        """
+        size = len(spec)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._specs.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            while self._specs and self._bytes + size > self.max_bytes:
+                _, evicted = self._specs.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+            self._specs[key] = spec
+            self._bytes += size
+
+    def figure(self, key, build):
+        """
+        Figure for ``key``: rebuilt from the cached spec, or ``build()`` and stored.
+        """
+        spec = self.get(key)
+        if spec is not None:
+            return pio.from_json(spec)
+        fig = build()
+        self.put(key, fig.to_json())
+        return fig
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._specs), 'bytes': self._bytes, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
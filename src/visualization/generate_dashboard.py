@@ -1,9 +1,10 @@
 import pandas as pd
 import plotly.express as px
 import streamlit as st
+from src.data.load_dataset import load_dataset
 
 # Load dataset
-df = pd.read_parquet("data/processed/ecommerce_dataset_10000_cleaned.parquet")
+df = load_dataset()
 
 # --- Dashboard Title ---
 st.title("E-commerce Sales Dashboard")
@@ -0,0 +1,338 @@
+# src/visualization/report.py
+"""
+Executive report engine: HTML and PDF from the dashboard aggregates.
+
+The report is rendered from ``REPORT_TEMPLATE`` with tables formatted column
+by column (no row loops) and charts drawn with Matplotlib's object API, which
+needs no GUI backend or global pyplot state, so the charts are rasterized in
+parallel on a thread pool. The PDF is written with ``PdfPages`` using the same
+drawing functions (vector charts) and table pages. ``ReportEngine`` builds
+reports on a background worker and keeps the finished files per key (data
+version + filter signature), so repeat requests are served from memory.
+"""
+
+import base64
+import html
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from string import Template
+
+import pandas as pd
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+REPORT_WORKERS = 1
+CHART_WORKERS = 4
+REPORT_CACHE_ENTRIES = 16
+CHART_DPI = 110
+PURPLE = '#5e35b1'
+BLUE = '#4fc3f7'
+
+# Tablas del informe: (clave de entrada, título, [(columna, cabecera, formato)]); {n} = filas de la tabla
+REPORT_TABLES = [
+    ('top_customers', 'Top {n} Customers',
+     [('customer_id', 'Customer ID', '{}'), ('total_revenue', 'Revenue', '${:,.0f}'), ('order_count', 'Orders', '{:,.0f}')]),
+    ('top_products', 'Top {n} Products',
+     [('product_name', 'Product', '{}'), ('total_price', 'Revenue', '${:,.0f}'), ('quantity', 'Quantity', '{:,.0f}')]),
+    ('countries', 'Geographic Distribution',
+     [('country', 'Country', '{}'), ('revenue', 'Revenue', '${:,.0f}'), ('orders', 'Orders', '{:,.0f}'),
+      ('customers', 'Customers', '{:,.0f}')]),
+    ('segments', 'Customer Segmentation (RFM)',
+     [('segment', 'Segment', '{}'), ('customer_count', 'Customers', '{:,.0f}'), ('total_revenue', 'Revenue', '${:,.0f}')]),
+]
+
+REPORT_TEMPLATE = Template("""<html>
+<head>
+    <meta charset="utf-8">
+    <style>
+        body { font-family: Arial; margin: 40px; background: rgb(245, 245, 245); }
+        .header { background: linear-gradient(135deg, rgb(94, 53, 177), rgb(81, 45, 168)); color: white; padding: 30px; border-radius: 10px; text-align: center; }
+        .metric-card { background: white; padding: 20px; margin: 15px 0; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+        .charts img { width: 49%; background: white; border-radius: 8px; margin: 0.5%; }
+        table { width: 100%; border-collapse: collapse; margin: 20px 0; background: white; }
+        th { background: rgb(94, 53, 177); color: white; padding: 12px; }
+        td { padding: 10px; border-bottom: 1px solid rgb(221, 221, 221); }
+        h2 { color: rgb(94, 53, 177); border-bottom: 2px solid rgb(79, 195, 247); padding-bottom: 10px; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>📊 EXECUTIVE E-COMMERCE DASHBOARD</h1>
+        <p>Period: $period</p>
+        <p>Generated: $generated</p>
+    </div>
+
+    <h2>📈 Executive Summary</h2>
+    <div class="metric-card">
+        $summary
+    </div>
+
+    <h2>📉 Performance Charts</h2>
+    <div class="charts">
+        $charts
+    </div>
+
+    $tables
+
+    <div style="margin-top: 40px; text-align: center; color: rgb(102, 102, 102); border-top: 1px solid rgb(221, 221, 221); padding-top: 20px;">
+        <p>Automated report - Executive E-commerce Dashboard</p>
+        <p>© 2025 - Confidential Business Intelligence Report</p>
+    </div>
+</body>
+</html>
+""")
+
+
+# -----------------------
+# Contenido
+# -----------------------
+def summary_lines(metrics):
+    """
+    ``(label, value)`` pairs of the executive summary.
+    """
+    return [
+        ('Total Revenue', f"${metrics['total_revenue']:,.0f} ({metrics['revenue_delta']:+.1f}%)"),
+        ('Total Orders', f"{metrics['total_orders']:,} ({metrics['orders_delta']:+.1f}%)"),
+        ('Unique Customers', f"{metrics['unique_customers']:,} ({metrics['customers_delta']:+.1f}%)"),
+        ('Average Order Value', f"${metrics['avg_order_value']:,.2f}"),
+    ]
+
+
+def format_table(df, columns, rows=10):
+    """
+    First ``rows`` rows of ``df`` as strings, one ``Series.map`` per column.
+
+    Args:
+        df: Source table.
+        columns: ``[(column, header, format string)]`` as in ``REPORT_TABLES``.
+    """
+    head = df.head(rows)
+    return pd.DataFrame({header: head[column].map(fmt.format) for column, header, fmt in columns})
+
+
+def _plain(labels):
+    # Las fuentes de Matplotlib no tienen emojis (p.ej. en los segmentos)
+    return [str(label).encode('ascii', 'ignore').decode().strip() for label in labels]
+
+
+# -----------------------
+# Gráficos
+# -----------------------
+def _money(x, _pos=None):
+    if abs(x) >= 1e6:
+        return f"${x / 1e6:.1f}M"
+    return f"${x / 1e3:.0f}k" if abs(x) >= 1e3 else f"${x:.0f}"
+
+
+def report_tables(inputs):
+    """
+    ``(title, formatted table)`` per ``REPORT_TABLES`` entry; ``{n}`` in a title is the number of rows shown.
+    """
+    for key, title, columns in REPORT_TABLES:
+        table = format_table(inputs[key], columns)
+        yield title.format(n=len(table)), table
+
+
+def draw_revenue(ax, inputs):
+    monthly = inputs['monthly']
+    ax.plot(monthly['order_date'], monthly['total_price'], color=PURPLE, linewidth=2, marker='o', markersize=3)
+    ax.fill_between(monthly['order_date'], monthly['total_price'], color=PURPLE, alpha=0.1)
+    ax.set_title('Monthly Revenue')
+    ax.yaxis.set_major_formatter(_money)
+    ax.tick_params(axis='x', labelrotation=30)
+
+
+def draw_products(ax, inputs):
+    top = inputs['top_products'].head(10).iloc[::-1]
+    ax.barh(_plain(top['product_name']), top['total_price'], color=PURPLE)
+    ax.set_title(f'Top {len(top)} Products by Revenue')
+    ax.xaxis.set_major_formatter(_money)
+
+
+def draw_countries(ax, inputs):
+    countries = inputs['countries'].head(10)
+    ax.bar(_plain(countries['country']), countries['revenue'], color=BLUE)
+    ax.set_title('Revenue by Country')
+    ax.yaxis.set_major_formatter(_money)
+    ax.tick_params(axis='x', labelrotation=30)
+
+
+def draw_segments(ax, inputs):
+    segments = inputs['segments']
+    ax.bar(_plain(segments['segment']), segments['total_revenue'], color=[PURPLE, BLUE, '#ec407a', '#ffa726'][:len(segments)])
+    ax.set_title('Revenue by Segment')
+    ax.yaxis.set_major_formatter(_money)
+
+
+# Nombre -> función de dibujo; el orden es el del informe
+REPORT_CHARTS = {
+    'revenue': draw_revenue,
+    'products': draw_products,
+    'countries': draw_countries,
+    'segments': draw_segments,
+}
+
+
+def _new_figure(size=(7, 4)):
+    fig = Figure(figsize=size, layout='constrained')
+    ax = fig.add_subplot()
+    ax.grid(alpha=0.3)
+    ax.spines[['top', 'right']].set_visible(False)
+    return fig, ax
+
+
+def rasterize_chart(draw, inputs, dpi=CHART_DPI):
+    """
+    PNG bytes of one chart (no pyplot state involved, safe on worker threads).
+    """
+    fig, ax = _new_figure()
+    draw(ax, inputs)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi)
+    return buffer.getvalue()
+
+
+def rasterize_charts(inputs, workers=CHART_WORKERS):
+    """
+    ``{name: png bytes}`` for every chart in ``REPORT_CHARTS``, drawn in parallel.
+    """
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report-chart') as pool:
+        futures = {name: pool.submit(rasterize_chart, draw, inputs) for name, draw in REPORT_CHARTS.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+# -----------------------
+# Salidas
+# -----------------------
+def render_html(inputs, charts):
+    """
+    HTML report with the charts embedded as base64 PNGs.
+    """
+    summary = "\n        ".join(f"<p><strong>{html.escape(label)}:</strong> {html.escape(value)}</p>"
+                               for label, value in summary_lines(inputs['metrics']))
+    images = "\n        ".join(f'<img alt="{name}" src="data:image/png;base64,{base64.b64encode(png).decode()}">'
+                               for name, png in charts.items())
+    tables = "\n\n    ".join(
+        f"<h2>{html.escape(title)}</h2>\n    " + table.to_html(index=False, border=0)
+        for title, table in report_tables(inputs)
+    )
+    return REPORT_TEMPLATE.substitute(
+        period=html.escape(inputs['period']),
+        generated=inputs['generated'].strftime('%B %d, %Y at %H:%M'),
+        summary=summary,
+        charts=images,
+        tables=tables,
+    )
+
+
+def render_pdf(inputs):
+    """
+    PDF report: summary and charts (vector) on A4 pages, then one page per table.
+    """
+    a4 = (8.27, 11.69)
+    buffer = io.BytesIO()
+    with PdfPages(buffer, metadata={'Title': 'Executive E-commerce Report'}) as pdf:
+        fig = Figure(figsize=a4)
+        fig.text(0.5, 0.95, 'EXECUTIVE E-COMMERCE DASHBOARD', ha='center', fontsize=18, weight='bold', color=PURPLE)
+        fig.text(0.5, 0.925, f"Period: {inputs['period']}", ha='center', fontsize=10)
+        fig.text(0.5, 0.905, f"Generated: {inputs['generated'].strftime('%B %d, %Y at %H:%M')}", ha='center',
+                 fontsize=9, color='gray')
+        for i, (label, value) in enumerate(summary_lines(inputs['metrics'])):
+            fig.text(0.1, 0.86 - i * 0.022, f"{label}: {value}", fontsize=11)
+        # Cuatro gráficos en una rejilla 2x2 bajo el resumen
+        grid = fig.add_gridspec(2, 2, left=0.1, right=0.95, bottom=0.06, top=0.74, hspace=0.45, wspace=0.45)
+        for cell, draw in zip(grid, REPORT_CHARTS.values()):
+            ax = fig.add_subplot(cell)
+            ax.grid(alpha=0.3)
+            draw(ax, inputs)
+            ax.title.set_fontsize(10)
+            ax.tick_params(labelsize=7)
+        pdf.savefig(fig)
+
+        for title, table in report_tables(inputs):
+            fig = Figure(figsize=a4)
+            fig.text(0.5, 0.95, title, ha='center', fontsize=16, weight='bold', color=PURPLE)
+            ax = fig.add_axes((0.08, 0.3, 0.84, 0.6))
+            ax.axis('off')
+            cells = ax.table(cellText=[_plain(row) for row in table.to_numpy()], colLabels=list(table.columns),
+                             loc='upper center', cellLoc='left')
+            cells.scale(1, 1.6)
+            for (row, _), cell in cells.get_celld().items():
+                if row == 0:
+                    cell.set_facecolor(PURPLE)
+                    cell.get_text().set_color('white')
+            pdf.savefig(fig)
+    return buffer.getvalue()
+
+
+def build_report(inputs, chart_workers=CHART_WORKERS):
+    """
+    ``{'html': bytes, 'pdf': bytes}`` for the report described by ``inputs``.
+
+    Args:
+        inputs: ``period`` (text), ``metrics`` (KPI dict), ``monthly`` (order_date,
+            total_price), ``top_customers``, ``top_products``, ``countries`` and
+            ``segments`` tables; ``generated`` defaults to now.
+    """
+    inputs = {'generated': datetime.now(), **inputs}
+    charts = rasterize_charts(inputs, chart_workers)
+    return {'html': render_html(inputs, charts).encode('utf-8'), 'pdf': render_pdf(inputs)}
+
+
+def _failed(future):
+    return future.done() and future.exception() is not None
+
+
+class ReportEngine:
+    """
+    Builds reports on a background worker and keeps the last ``max_entries`` per key.
+
+    ``submit`` returns the same future for a key already requested, so a repeat
+    request is answered from the finished result. A failed build stays cached
+    until the caller has shown its error and calls ``discard``; ``submit``
+    replaces it, so it can be retried.
+    """
+
+    def __init__(self, workers=REPORT_WORKERS, max_entries=REPORT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report')
+        self._futures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Future for ``key`` if it was submitted (finished, running or failed), else None.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                self._futures.move_to_end(key)
+            return future
+
+    def discard(self, key):
+        """
+        Forget the future for ``key`` (e.g. once its error has been shown).
+        """
+        with self._lock:
+            self._futures.pop(key, None)
+
+    def submit(self, key, make_inputs):
+        """
+        Future with ``build_report(make_inputs())``; ``make_inputs`` is called (in
+        the caller's thread) only when ``key`` is not cached or its build failed.
+        """
+        future = self.get(key)
+        if future is not None and not _failed(future):
+            return future
+        inputs = make_inputs()
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None or _failed(future):
+                future = self._executor.submit(build_report, inputs)
+                self._futures[key] = future
+                while len(self._futures) > self.max_entries:
+                    self._futures.popitem(last=False)
+            return future
@@ -0,0 +1,110 @@
+# src/visualization/timeseries.py
+"""
+Time-series rendering helpers for the trend charts.
+
+``choose_grain`` picks day, week or month from the length of the selected
+range so a trend has at most ``GRAIN_TARGET`` points; ``resample_series``
+rolls a daily series up to that grain. Any trace still above ``POINT_BUDGET``
+points (e.g. a daily view of several years) is reduced with
+Largest-Triangle-Three-Buckets, which keeps the first and last points and, per
+bucket, the point forming the largest triangle with its neighbours, so peaks
+and troughs survive while the figure JSON stays bounded.
+"""
+
+import numpy as np
+import pandas as pd
+
+GRAIN_TARGET = 180
+POINT_BUDGET = 500
+# Grano -> (regla de pandas, etiqueta)
+GRAINS = {
+    'day': ('D', 'Daily'),
+    'week': ('W-MON', 'Weekly'),
+    'month': ('MS', 'Monthly'),
+}
+
+
+def choose_grain(start, end, target=GRAIN_TARGET):
+    """
+    Finest grain (day, week, month) with at most ``target`` points in ``[start, end]``.
+    """
+    days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    if days <= target:
+        return 'day'
+    if days / 7 <= target:
+        return 'week'
+    return 'month'
+
+
+def resample_series(daily, grain):
+    """
+    Sum a daily series (DatetimeIndex) per ``grain``; weeks start on Monday, months on day 1.
+    Periods without data inside the range count as 0.
+    """
+    if daily.empty:
+        return daily
+    rule = GRAINS[grain][0]
+    if grain == 'week':
+        return daily.resample(rule, label='left', closed='left').sum()
+    return daily.resample(rule).sum()
+
+
+def lttb(x, y, threshold=POINT_BUDGET):
+    """
+    Indices of the ``threshold`` points kept by Largest-Triangle-Three-Buckets.
+
+    Args:
+        x: Increasing x values (numbers or datetimes).
+        y: Values aligned with ``x``.
+        threshold: Points to keep; series at or below it are returned whole.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x).astype('datetime64[ns]').astype(np.float64) if np.issubdtype(np.asarray(x).dtype, np.datetime64) \
+        else np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Buckets entre el primer y el último punto, que se conservan siempre
+    edges = np.floor(np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Tercer vértice: media del bucket siguiente (el último punto para el último bucket)
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def downsample(frame, x, y, threshold=POINT_BUDGET):
+    """
+    Rows of ``frame`` kept by ``lttb`` on columns ``x``/``y`` (the frame itself if small enough).
+    """
+    if len(frame) <= threshold:
+        return frame
+    return frame.iloc[lttb(frame[x].to_numpy(), frame[y].to_numpy(), threshold)]
+
+
+def trend_series(daily, start, end, grain=None, threshold=POINT_BUDGET):
+    """
+    Trend frame ``order_date, total_price`` for a daily revenue series.
+
+    Args:
+        daily: Revenue per day (DatetimeIndex).
+        start, end: Selected range, used to pick the grain when ``grain`` is None.
+        grain: 'day', 'week' or 'month' (None = ``choose_grain``).
+        threshold: Point budget applied with LTTB after resampling.
+
+    Returns:
+        ``(frame, grain)``.
+    """
+    grain = grain or choose_grain(start, end)
+    series = resample_series(daily, grain)
+    frame = pd.DataFrame({'order_date': series.index, 'total_price': series.to_numpy()})
+    return downsample(frame, 'order_date', 'total_price', threshold).reset_index(drop=True), grain
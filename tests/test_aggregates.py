@@ -0,0 +1,84 @@
+# tests/test_aggregates.py
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.aggregates import OlapCube
+
+
+@pytest.fixture
+def lines():
+    """
+    Order lines where most orders have several lines, often in different categories.
+    """
+    rng = np.random.default_rng(7)
+    rows = []
+    for i in range(400):
+        customer = f"C{rng.integers(0, 12):02d}"
+        day = pd.Timestamp('2024-01-01') + pd.Timedelta(days=int(rng.integers(0, 20)))
+        country = rng.choice(['UK', 'Spain'])
+        for _ in range(int(rng.integers(1, 4))):
+            quantity = int(rng.integers(1, 4))
+            price = float(rng.integers(5, 500))
+            rows.append({
+                'order_date': day, 'country': country, 'category': rng.choice(['Toys', 'Books', 'Home']),
+                'product_name': f"Product {rng.integers(0, 30)}", 'unit_price': price,
+                'total_price': price * quantity, 'quantity': quantity, 'order_id': f"O{i:04d}",
+                'customer_id': customer,
+            })
+    return pd.DataFrame(rows)
+
+
+def exact_top_customers(df, n):
+    top = df.groupby('customer_id').agg(revenue=('total_price', 'sum'), orders=('order_id', 'nunique'))
+    return top.sort_values(['revenue'], ascending=False).head(n)
+
+
+@pytest.mark.parametrize('categories', [None, ['Toys']])
+def test_top_customers_matches_pandas(lines, categories):
+    cube = OlapCube.from_frame(lines)
+    top, max_error, guaranteed = cube.top('customers', 10, categories=categories)
+    subset = lines if categories is None else lines[lines['category'].isin(categories)]
+    expected = exact_top_customers(subset, 10)
+
+    assert guaranteed and max_error == 0
+    assert list(top['item']) == list(expected.index)
+    np.testing.assert_allclose(top['revenue'], expected['revenue'])
+    assert list(top['orders']) == list(expected['orders'])
+
+
+def test_top_customers_needs_exact_path_for_several_categories(lines):
+    cube = OlapCube.from_frame(lines)
+    assert cube.top('customers', 10, categories=['Toys', 'Books']) is None
+    assert cube.top('products_revenue', 10, categories=['Toys', 'Books']) is not None
+
+
+def test_top_products_matches_pandas(lines):
+    cube = OlapCube.from_frame(lines)
+    top, _, guaranteed = cube.top('products_quantity', 5, countries=['UK'])
+    expected = lines[lines['country'] == 'UK'].groupby('product_name')['quantity'].sum()
+
+    assert guaranteed
+    assert list(top['quantity']) == list(expected.sort_values(ascending=False).head(5))
+
+
+@pytest.mark.parametrize('exact', [True, False])
+def test_price_stats_matches_pandas(lines, exact):
+    cube = OlapCube.from_frame(lines, quantile_k=8)
+    stats = cube.price_stats(exact, categories=['Toys'])
+    expected = lines.loc[lines['category'] == 'Toys', 'unit_price'].describe()
+
+    # Momentos, mínimo y máximo exactos en ambos modos
+    for field in ['count', 'mean', 'std', 'min', 'max']:
+        assert stats[field] == pytest.approx(expected[field])
+    if exact:
+        np.testing.assert_allclose(stats[['25%', '50%', '75%']], expected[['25%', '50%', '75%']])
+    else:
+        prices = np.sort(lines.loc[lines['category'] == 'Toys', 'unit_price'].to_numpy())
+        for q in [0.25, 0.5, 0.75]:
+            rank = np.searchsorted(prices, stats[f'{q:.0%}'], side='right') / len(prices)
+            assert abs(rank - q) <= cube.price_error() + 1 / len(prices)
@@ -0,0 +1,57 @@
+# tests/test_bitmap_index.py
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.bitmap_index import BitmapIndex
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(3)
+    n = 1003  # no múltiplo de 8: el último byte queda incompleto
+    return pd.DataFrame({
+        'country': pd.Categorical(rng.choice(['Spain', 'UK', 'USA'], n)),
+        'rating': pd.array(rng.choice([1, 3, 5, None], n), dtype='Int8'),
+        'order_status': rng.choice(['Delivered', 'Returned', 'Cancelled'], n),
+    })
+
+
+def expected_rows(df, filters, lo=0, hi=None):
+    clauses = [filters] if isinstance(filters, dict) else filters
+    mask = np.zeros(len(df), dtype=bool)
+    for clause in clauses:
+        clause_mask = np.ones(len(df), dtype=bool)
+        for column, values in clause.items():
+            clause_mask &= df[column].isin(values).fillna(False).to_numpy(dtype=bool)
+        mask |= clause_mask
+    rows = np.flatnonzero(mask)
+    return rows[(rows >= lo) & (rows < (len(df) if hi is None else hi))]
+
+
+@pytest.mark.parametrize('filters', [
+    {'country': ['Spain']},
+    {'country': ['Spain', 'USA'], 'rating': [5]},
+    [{'country': ['UK'], 'rating': [1, 3]}, {'order_status': ['Returned']}],
+    {'country': ['Atlantis']},
+])
+def test_query_matches_boolean_masks(frame, filters):
+    index = BitmapIndex(frame)
+    np.testing.assert_array_equal(index.query(filters), expected_rows(frame, filters))
+
+
+def test_query_row_range_and_numpy_values(frame):
+    index = BitmapIndex(frame)
+    filters = [{'rating': [np.int8(5)]}, {'order_status': ['Cancelled'], 'country': ['USA']}]
+    np.testing.assert_array_equal(index.query(filters, 13, 997), expected_rows(frame, filters, 13, 997))
+    assert len(index.query({'country': ['UK']}, 50, 50)) == 0
+
+
+def test_na_values_get_no_bitmap(frame):
+    index = BitmapIndex(frame)
+    assert index.values('rating') == [1, 3, 5]
+    assert index.nbytes() == sum(len(index.values(c)) for c in index.columns) * ((len(frame) + 7) // 8)
@@ -0,0 +1,76 @@
+# tests/test_create_features.py
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.features.create_features import list_parts, load_watermark, process_incremental
+
+
+def raw_lines(order_lines):
+    """
+    Raw CSV rows for ``[(order_id, product_id, order_date), ...]``.
+    """
+    return pd.DataFrame([
+        {
+            'customer_id': f"C{i:03d}", 'country': 'UK', 'product_id': product_id,
+            'product_name': f"Product {product_id}", 'category': 'Toys', 'quantity': 1, 'unit_price': 10,
+            'order_id': order_id, 'order_date': order_date, 'order_status': 'Delivered',
+            'payment_method': 'PayPal', 'rating': 5, 'review_text': 'ok', 'review_date': order_date,
+        }
+        for i, (order_id, product_id, order_date) in enumerate(order_lines)
+    ])
+
+
+def dataset_rows(dataset_dir):
+    return sum(pq.read_metadata(part).num_rows for part in list_parts(dataset_dir))
+
+
+def test_incremental_keeps_order_split_across_chunks(tmp_path):
+    raw_csv = tmp_path / "raw.csv"
+    dataset_dir = str(tmp_path / "dataset")
+    # O2 tiene tres líneas repartidas entre el primer y el segundo chunk (chunksize=3)
+    lines = [
+        ('O1', 'P1', '2024-01-05'),
+        ('O2', 'P1', '2024-01-01'),
+        ('O2', 'P2', '2024-01-01'),
+        ('O2', 'P3', '2024-01-01'),
+        ('O3', 'P1', '2024-01-02'),
+        ('O4', 'P2', '2024-01-03'),
+    ]
+    raw_lines(lines).to_csv(raw_csv, index=False)
+
+    assert process_incremental(3, raw_csv=raw_csv, dataset_dir=dataset_dir) == len(lines)
+    assert dataset_rows(dataset_dir) == len(lines)
+    max_order_date, keys, _ = load_watermark(dataset_dir)
+    assert max_order_date == pd.Timestamp('2024-01-05')
+    assert set(keys['line_key']) == {f"{order_id}|{product_id}" for order_id, product_id, _ in lines}
+
+    # Sin filas nuevas no se añade nada
+    assert process_incremental(3, raw_csv=raw_csv, dataset_dir=dataset_dir) == 0
+
+    # Una línea tardía de un pedido ya procesado y un pedido nuevo de varias líneas
+    lines += [('O2', 'P4', '2024-01-01'), ('O5', 'P1', '2024-02-01'), ('O5', 'P2', '2024-02-01')]
+    raw_lines(lines).to_csv(raw_csv, index=False)
+    assert process_incremental(3, raw_csv=raw_csv, dataset_dir=dataset_dir) == 3
+    assert dataset_rows(dataset_dir) == len(lines)
+
+
+def test_incremental_keeps_only_keys_of_late_arrival_window(tmp_path):
+    raw_csv = tmp_path / "raw.csv"
+    dataset_dir = str(tmp_path / "dataset")
+    lines = [('O1', 'P1', '2024-01-01'), ('O2', 'P1', '2024-03-01'), ('O3', 'P1', '2024-03-10')]
+    raw_lines(lines).to_csv(raw_csv, index=False)
+    assert process_incremental(2, raw_csv=raw_csv, dataset_dir=dataset_dir, late_days=30) == 3
+
+    # Solo se guardan las claves de los 30 días anteriores al watermark
+    _, keys, _ = load_watermark(dataset_dir, late_days=30)
+    assert sorted(keys['line_key']) == ['O2|P1', 'O3|P1']
+
+    # Una línea tardía dentro de la ventana se añade; una anterior a la ventana no
+    lines += [('O2', 'P2', '2024-03-01'), ('O1', 'P2', '2024-01-01')]
+    raw_lines(lines).to_csv(raw_csv, index=False)
+    assert process_incremental(2, raw_csv=raw_csv, dataset_dir=dataset_dir, late_days=30) == 1
+    assert dataset_rows(dataset_dir) == 4
@@ -0,0 +1,56 @@
+# tests/test_daily_series.py
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.daily_series import DailySeries, build_daily_series
+
+
+@pytest.fixture
+def orders():
+    rng = np.random.default_rng(11)
+    n = 3_000
+    order_day = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 400, n // 2), unit='D')
+    lines = pd.DataFrame({
+        'order_id': rng.integers(0, n // 2, n),
+        'quantity': rng.integers(1, 5, n),
+        'total_price': rng.uniform(5, 500, n).round(2),
+    })
+    # Cada pedido tiene una sola fecha y país
+    lines['order_date'] = order_day[lines['order_id']] + pd.to_timedelta(rng.integers(0, 86_000, n), unit='s')
+    lines['country'] = np.array(['Spain', 'UK', 'USA'])[lines['order_id'] % 3]
+    return lines
+
+
+@pytest.mark.parametrize('start, end, countries', [
+    (None, None, None),
+    ('2023-02-10', '2023-06-30', None),
+    ('2023-03-05', '2023-03-05', ['UK']),
+    ('2022-06-01', '2023-01-15', ['Spain', 'USA', 'Atlantis']),
+    ('2024-06-01', '2024-07-01', None),
+])
+def test_totals_match_pandas(orders, start, end, countries):
+    series = DailySeries(build_daily_series(orders))
+    day = orders['order_date'].dt.normalize()
+    mask = pd.Series(True, index=orders.index)
+    if start is not None:
+        mask &= (day >= start) & (day <= end)
+    if countries is not None:
+        mask &= orders['country'].isin(countries)
+    rows = orders[mask]
+
+    totals = series.totals(start, end, countries)
+    assert totals['revenue'] == pytest.approx(rows['total_price'].sum())
+    assert totals['quantity'] == rows['quantity'].sum()
+    assert totals['orders'] == rows['order_id'].nunique()
+    assert totals['lines'] == len(rows)
+
+    first, last = series.span(start, end, countries)
+    if rows.empty:
+        assert (first, last) == (None, None)
+    else:
+        assert (first, last) == (day[mask].min(), day[mask].max())
@@ -0,0 +1,37 @@
+# tests/test_report.py
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.visualization.report import build_report
+
+
+def report_inputs(top_n):
+    return {
+        'period': "January 01, 2024 - December 31, 2024",
+        'metrics': {'total_revenue': 1234.0, 'revenue_delta': 1.5, 'total_orders': 10, 'orders_delta': -2.0,
+                    'unique_customers': 7, 'customers_delta': 0.0, 'avg_order_value': 123.4},
+        'monthly': pd.DataFrame({'order_date': pd.date_range('2024-01-01', periods=12, freq='MS'),
+                                 'total_price': range(100, 1300, 100)}),
+        'top_customers': pd.DataFrame({'customer_id': [f"C{i}" for i in range(top_n)],
+                                       'total_revenue': range(top_n, 0, -1), 'order_count': [1] * top_n}),
+        'top_products': pd.DataFrame({'product_name': [f"Product {i}" for i in range(top_n)],
+                                      'total_price': range(top_n, 0, -1), 'quantity': [2] * top_n}),
+        'countries': pd.DataFrame({'country': ['Spain', 'UK'], 'revenue': [800.0, 434.0], 'orders': [6, 4],
+                                   'customers': [4, 3]}),
+        'segments': pd.DataFrame({'segment': ['💎 VIP', 'Regular'], 'customer_count': [2, 5],
+                                  'total_revenue': [900.0, 334.0]}),
+    }
+
+
+@pytest.mark.parametrize('top_n, shown', [(5, 5), (10, 10), (20, 10)])
+def test_table_titles_follow_the_rows_shown(top_n, shown):
+    files = build_report(report_inputs(top_n), chart_workers=1)
+    page = files['html'].decode('utf-8')
+    assert f"<h2>Top {shown} Customers</h2>" in page
+    assert f"<h2>Top {shown} Products</h2>" in page
+    assert "Top 10" not in page or shown == 10
+    assert files['pdf'].startswith(b"%PDF")
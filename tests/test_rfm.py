@@ -0,0 +1,78 @@
+# tests/test_rfm.py
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.models.rfm import RfmState, assign_segments, compute_rfm, refresh_state
+
+
+def order_lines(n_orders, first_order=0, seed=0):
+    rng = np.random.default_rng(seed)
+    orders = pd.DataFrame({
+        'order_id': [f"O{i:05d}" for i in range(first_order, first_order + n_orders)],
+        'customer_id': [f"C{c:03d}" for c in rng.integers(0, 80, n_orders)],
+        'country': rng.choice(['Spain', 'UK'], n_orders),
+        'order_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 300, n_orders), unit='D'),
+    })
+    lines = orders.loc[orders.index.repeat(rng.integers(1, 4, n_orders))].reset_index(drop=True)
+    lines['total_price'] = rng.integers(5, 500, len(lines)).astype(float)
+    return lines
+
+
+def sorted_rfm(rfm):
+    return rfm.sort_values('customer_id', ignore_index=True)
+
+
+def test_refresh_state_matches_full_compute_rfm(tmp_path):
+    dataset, out_dir = tmp_path / "dataset", str(tmp_path / "aggregates")
+    dataset.mkdir()
+    first = order_lines(400)
+    first.to_parquet(dataset / "part-1.parquet", index=False)
+    state, rows_read = refresh_state(str(dataset), "v1", out_dir)
+    assert rows_read == len(first)
+
+    # Solo se lee la parte nueva
+    second = order_lines(150, first_order=400, seed=1)
+    second.to_parquet(dataset / "part-2.parquet", index=False)
+    state, rows_read = refresh_state(str(dataset), "v2", out_dir)
+    assert rows_read == len(second)
+    assert refresh_state(str(dataset), "v2", out_dir)[1] == 0
+
+    full = pd.concat([first, second], ignore_index=True)
+    pd.testing.assert_frame_equal(sorted_rfm(state.window()), sorted_rfm(compute_rfm(full)), check_dtype=False)
+    pd.testing.assert_frame_equal(sorted_rfm(RfmState.load(out_dir).window()), sorted_rfm(state.window()),
+                                  check_dtype=False)
+
+
+@pytest.mark.parametrize('start, end, countries', [('2024-03-01', '2024-06-30', None), (None, '2024-05-01', ['UK'])])
+def test_window_matches_compute_rfm_on_filtered_rows(start, end, countries):
+    lines = order_lines(500, seed=2)
+    mask = pd.Series(True, index=lines.index)
+    if start is not None:
+        mask &= lines['order_date'] >= start
+    mask &= lines['order_date'] <= end
+    if countries is not None:
+        mask &= lines['country'].isin(countries)
+
+    window = RfmState.from_frame(lines).window(start, end, countries)
+    expected = compute_rfm(lines[mask])
+    pd.testing.assert_frame_equal(sorted_rfm(window), sorted_rfm(expected), check_dtype=False)
+    assert (assign_segments(window)['segment'] == assign_segments(expected)['segment']).all()
+
+
+def test_rewritten_part_rebuilds_state(tmp_path):
+    dataset, out_dir = tmp_path / "dataset", str(tmp_path / "aggregates")
+    dataset.mkdir()
+    order_lines(100).to_parquet(dataset / "part-1.parquet", index=False)
+    refresh_state(str(dataset), "v1", out_dir)
+
+    rebuilt = order_lines(60, seed=3)
+    rebuilt.to_parquet(dataset / "part-1.parquet", index=False)
+    state, rows_read = refresh_state(str(dataset), "v2", out_dir)
+    assert pq.read_metadata(dataset / "part-1.parquet").num_rows == rows_read == len(rebuilt)
+    pd.testing.assert_frame_equal(sorted_rfm(state.window()), sorted_rfm(compute_rfm(rebuilt)), check_dtype=False)
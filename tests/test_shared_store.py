@@ -0,0 +1,41 @@
+# tests/test_shared_store.py
+import gc
+import sys
+import weakref
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.shared_store import DatasetRegistry
+
+
+class Derived:
+    pass
+
+
+def test_derived_objects_are_shared_and_dropped_with_their_version():
+    registry = DatasetRegistry()
+    first = registry.lease("v1", lambda: pd.DataFrame({'x': [1, 2]}))
+    other = registry.acquire("v1")
+    builds = []
+    obj = first.derived('index', lambda: builds.append(1) or Derived())
+    assert other.derived('index', Derived) is obj
+    assert builds == [1]
+
+    ref = weakref.ref(obj)
+    del obj
+    # v2 pasa a ser la actual; v1 sigue viva mientras tenga leases
+    second = registry.lease("v2", lambda: pd.DataFrame({'x': [3]}))
+    gc.collect()
+    assert ref() is not None
+
+    first.release()
+    other.release()
+    gc.collect()
+    assert ref() is None
+    assert registry.stats() == {"v2": 1}
+    with pytest.raises(RuntimeError):
+        first.derived('index', Derived)
+    second.release()
@@ -0,0 +1,178 @@
+# tests/test_sketches.py
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.data.sketches import (heavy_hitter_table, heavy_hitters, histogram_table, hll_count, hll_error, hll_table,
+                               integer_quantiles, kmv_count, kmv_error, kmv_table, quantile_error, quantile_table,
+                               weighted_describe, weighted_quantiles)
+
+
+def cells_with_overlap(n_ids, n_cells, seed=0):
+    """
+    ``(keys, ids)`` where every id appears in several cells (as a customer buying on several days).
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.array([f"C{i:06d}" for i in rng.integers(0, n_ids, 4 * n_ids)], dtype=object)
+    keys = pd.DataFrame({'cell': rng.integers(0, n_cells, len(ids))})
+    return keys, ids
+
+
+# -----------------------
+# Distinct counts (HLL / KMV)
+# -----------------------
+@pytest.mark.parametrize('n_ids', [50, 2_000, 40_000])
+def test_hll_union_within_error_bound(n_ids):
+    keys, ids = cells_with_overlap(n_ids, 30)
+    table = hll_table(keys, ids, p=10)
+    selected = [0, 3, 7, 11, 20]
+    rows = table[table['cell'].isin(selected)]
+    exact = len(set(ids[keys['cell'].isin(selected).to_numpy()]))
+
+    estimate = hll_count(rows['register'].to_numpy(), rows['rho'].to_numpy(), p=10)
+    assert abs(estimate - exact) <= 4 * hll_error(10) * exact + 1
+
+
+def test_hll_union_equals_sketch_of_union():
+    keys, ids = cells_with_overlap(5_000, 10)
+    table = hll_table(keys, ids)
+    merged = hll_count(table['register'].to_numpy(), table['rho'].to_numpy())
+    single = hll_table(pd.DataFrame({'cell': np.zeros(len(ids), dtype=int)}), ids)
+    assert merged == hll_count(single['register'].to_numpy(), single['rho'].to_numpy())
+
+
+def test_kmv_is_exact_below_k():
+    keys, ids = cells_with_overlap(300, 5)
+    table = kmv_table(keys, ids, k=1024)
+    assert kmv_count(table['hash'].to_numpy(), table['tau'].to_numpy()) == len(set(ids))
+
+
+@pytest.mark.parametrize('selected', [[0], [0, 1, 2], list(range(8))])
+def test_kmv_union_within_error_bound(selected):
+    keys, ids = cells_with_overlap(30_000, 8, seed=1)
+    table = kmv_table(keys, ids, k=256)
+    rows = table[table['cell'].isin(selected)]
+    exact = len(set(ids[keys['cell'].isin(selected).to_numpy()]))
+
+    estimate = kmv_count(rows['hash'].to_numpy(), rows['tau'].to_numpy())
+    assert abs(estimate - exact) <= 4 * kmv_error(256) * exact
+
+
+def test_na_ids_are_ignored():
+    keys = pd.DataFrame({'cell': [0, 0, 1, 1]})
+    ids = np.array(['a', None, 'a', 'b'], dtype=object)
+    table = kmv_table(keys, ids)
+    assert kmv_count(table['hash'].to_numpy(), table['tau'].to_numpy()) == 2
+    table = hll_table(keys, ids)
+    assert hll_count(table['register'].to_numpy(), table['rho'].to_numpy()) == 2
+
+
+# -----------------------
+# Heavy hitters
+# -----------------------
+def sales(skew, seed=0):
+    """
+    Lines of 200 items over 40 cells; ``skew`` concentrates revenue on a few items.
+    """
+    rng = np.random.default_rng(seed)
+    n = 6_000
+    items = np.minimum(rng.zipf(skew, n), 200) if skew else rng.integers(1, 200, n)
+    return pd.DataFrame({
+        'cell': rng.integers(0, 40, n),
+        'item': [f"I{i:03d}" for i in items],
+        'revenue': rng.uniform(1, 100, n),
+    })
+
+
+@pytest.mark.parametrize('skew, capacity, expect_guarantee', [
+    (1.6, 8, True), (2.0, 16, True), (1.3, 8, False), (None, 8, False), (None, 200, True),
+])
+def test_heavy_hitter_bounds_and_guarantee(skew, capacity, expect_guarantee):
+    lines = sales(skew)
+    table = heavy_hitter_table(lines[['cell']], lines['item'], {'revenue': lines['revenue']}, 'revenue', capacity)
+    selected = list(range(0, 40, 3))
+    rows = table[table['cell'].isin(selected)]
+    top, max_error, guaranteed = heavy_hitters(rows, ['cell'], 'revenue', 5)
+
+    truth = lines[lines['cell'].isin(selected)].groupby('item')['revenue'].sum()
+    true_weight = truth.reindex(top['item']).to_numpy()
+    # Cada peso real está dentro de [revenue, upper]
+    assert np.all(top['revenue'].to_numpy() <= true_weight + 1e-9)
+    assert np.all(true_weight <= top['upper'].to_numpy() + 1e-9)
+    assert max_error == pytest.approx((top['upper'] - top['revenue']).max())
+    assert guaranteed == expect_guarantee
+    if guaranteed:
+        assert set(top['item']) == set(truth.nlargest(5).index)
+    if capacity >= 200:
+        assert guaranteed and max_error == 0
+        np.testing.assert_allclose(top['revenue'], truth.nlargest(5).to_numpy())
+
+
+def test_heavy_hitters_not_guaranteed_when_an_untracked_item_can_win():
+    # "B" es el más vendido en total pero nunca entra en el top-1 de una celda
+    lines = pd.DataFrame({
+        'cell': [0, 0, 1, 1, 2, 2],
+        'item': ['A', 'B', 'C', 'B', 'D', 'B'],
+        'revenue': [10.0, 9.0, 10.0, 9.0, 10.0, 9.0],
+    })
+    table = heavy_hitter_table(lines[['cell']], lines['item'], {'revenue': lines['revenue']}, 'revenue', 1)
+    top, max_error, guaranteed = heavy_hitters(table, ['cell'], 'revenue', 1)
+    assert not guaranteed
+    assert max_error == pytest.approx(18.0)
+
+
+# -----------------------
+# Quantiles
+# -----------------------
+QS = [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0]
+
+
+def test_weighted_quantiles_match_numpy():
+    rng = np.random.default_rng(5)
+    values = rng.normal(100, 30, 50).round(1)
+    weights = rng.integers(0, 6, 50)
+    np.testing.assert_allclose(weighted_quantiles(values, weights, QS), np.quantile(np.repeat(values, weights), QS))
+
+
+def test_integer_quantiles_match_numpy():
+    values = np.random.default_rng(6).integers(-20, 500, 1_001)
+    np.testing.assert_allclose(integer_quantiles(values, QS), np.quantile(values, QS))
+    assert integer_quantiles(np.array([0.5, 1.0]), QS) is None
+
+
+@pytest.mark.parametrize('k', [16, 64])
+def test_quantile_table_union_rank_error(k):
+    rng = np.random.default_rng(8)
+    values = rng.lognormal(4, 1, 20_000)
+    keys = pd.DataFrame({'cell': rng.integers(0, 25, len(values))})
+    table = quantile_table(keys, values, k)
+    assert table.groupby('cell').size().max() <= k
+
+    selected = [1, 4, 9, 16]
+    rows = table[table['cell'].isin(selected)]
+    exact = np.sort(values[keys['cell'].isin(selected).to_numpy()])
+    assert rows['weight'].sum() == len(exact)
+    for q, estimate in zip(QS[1:-1], weighted_quantiles(rows['value'], rows['weight'], QS[1:-1])):
+        rank = np.searchsorted(exact, estimate, side='right') / len(exact)
+        assert abs(rank - q) <= quantile_error(k) + 1 / len(exact)
+
+
+def test_weighted_describe_matches_series_describe():
+    rng = np.random.default_rng(9)
+    prices = pd.Series(rng.integers(5, 5_000, 3_000).astype(float))
+    keys = pd.DataFrame({'cell': rng.integers(0, 10, len(prices))})
+    histogram = histogram_table(keys, prices.to_numpy())
+    expected = prices.describe()
+
+    exact = weighted_describe(histogram['value'], histogram['weight'])
+    np.testing.assert_allclose(exact[expected.index], expected)
+
+    summary = quantile_table(keys, prices.to_numpy(), 16)
+    approx = weighted_describe(histogram['value'], histogram['weight'],
+                               quantiles=(summary['value'], summary['weight']))
+    fields = ['count', 'mean', 'std', 'min', 'max']
+    np.testing.assert_allclose(approx[fields], expected[fields])
@@ -0,0 +1,61 @@
+# tests/test_timeseries.py
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.visualization.timeseries import choose_grain, lttb, resample_series, trend_series
+
+
+def reference_lttb(x, y, threshold):
+    """
+    Plain-Python Largest-Triangle-Three-Buckets (Steinarsson, 2013).
+    """
+    n = len(y)
+    every = (n - 2) / (threshold - 2)
+    kept, a = [0], 0
+    for i in range(threshold - 2):
+        avg_lo, avg_hi = math.floor((i + 1) * every) + 1, min(math.floor((i + 2) * every) + 1, n)
+        avg_x = sum(x[avg_lo:avg_hi]) / (avg_hi - avg_lo)
+        avg_y = sum(y[avg_lo:avg_hi]) / (avg_hi - avg_lo)
+        lo, hi = math.floor(i * every) + 1, math.floor((i + 1) * every) + 1
+        areas = [abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])) for j in range(lo, hi)]
+        a = lo + areas.index(max(areas))
+        kept.append(a)
+    return kept + [n - 1]
+
+
+@pytest.mark.parametrize('n, threshold', [(1_000, 100), (1_001, 7), (731, 500), (50, 3)])
+def test_lttb_matches_reference(n, threshold):
+    rng = np.random.default_rng(n)
+    x = np.cumsum(rng.uniform(0.5, 2.0, n))
+    y = np.cumsum(rng.normal(0, 1, n))
+    kept = lttb(x, y, threshold)
+    assert list(kept) == reference_lttb(list(x), list(y), threshold)
+    assert len(kept) == threshold and np.all(np.diff(kept) > 0)
+
+
+def test_lttb_keeps_spikes_and_small_series():
+    y = np.zeros(2_000)
+    y[1_234], y[567] = 50.0, -40.0
+    kept = lttb(np.arange(2_000), y, 50)
+    assert {0, 567, 1_234, 1_999} <= set(kept)
+    np.testing.assert_array_equal(lttb(np.arange(10), np.arange(10), 10), np.arange(10))
+
+
+def test_trend_series_grain_and_budget():
+    days = pd.date_range('2020-01-01', '2024-12-31', freq='D')
+    daily = pd.Series(np.arange(len(days), dtype=float), index=days)
+    assert choose_grain(days[0], days[99]) == 'day'
+    assert choose_grain(days[0], days[-1]) == 'month'
+
+    frame, grain = trend_series(daily, days[0], days[-1], grain='day', threshold=300)
+    assert grain == 'day' and len(frame) == 300
+    assert frame['order_date'].iloc[[0, -1]].tolist() == [days[0], days[-1]]
+
+    monthly = resample_series(daily, 'month')
+    assert len(monthly) == 60 and monthly.sum() == daily.sum()
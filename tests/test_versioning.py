@@ -0,0 +1,48 @@
+# tests/test_versioning.py
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import src.data.versioning as versioning
+from src.data.versioning import content_fingerprint, data_version, write_manifest
+
+
+def test_new_part_only_hashes_the_new_file(tmp_path, monkeypatch):
+    dataset = tmp_path / "dataset"
+    dataset.mkdir()
+    (dataset / "part-1.parquet").write_bytes(b"one")
+    (dataset / "_watermark.json").write_text("{}")
+    index = str(tmp_path / "index.json")
+
+    hashed = []
+    real_hash = versioning._hash_file
+    monkeypatch.setattr(versioning, "_hash_file", lambda f: hashed.append(os.path.basename(f)) or real_hash(f))
+
+    first = content_fingerprint(str(dataset), index)
+    assert hashed == ["part-1.parquet"]
+    assert content_fingerprint(str(dataset), index) == first
+    assert hashed == ["part-1.parquet"]
+
+    (dataset / "part-2.parquet").write_bytes(b"two")
+    second = content_fingerprint(str(dataset), index)
+    assert hashed == ["part-1.parquet", "part-2.parquet"]
+    assert second != first
+
+    # Mismo contenido -> mismo hash, aunque se recalcule desde cero
+    assert content_fingerprint(str(dataset), str(tmp_path / "other.json")) == second
+    expected = hashlib.sha256(
+        b"".join(f"{n}|{hashlib.sha256(c).hexdigest()}\n".encode()
+                 for n, c in [("part-1.parquet", b"one"), ("part-2.parquet", b"two")])
+    ).hexdigest()
+    assert second == expected
+
+
+def test_manifest_version_matches_data_version(tmp_path, monkeypatch):
+    # El índice por defecto es relativo al directorio de trabajo
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "data.parquet"
+    path.write_bytes(b"rows")
+    manifest = write_manifest(str(path))
+    assert data_version(str(path)) == manifest["version"]